@@ -124,7 +124,10 @@ class BlogPostAdmin(admin.ModelAdmin):
     list_display = ('title', 'author', 'category', 'views', 'image_count', 'published', 'created_at')
     list_filter = ('category', 'published', 'created_at')
     search_fields = ('title', 'author', 'content', 'title_ge', 'content_ge')
-    readonly_fields = ('created_at', 'updated_at', 'views', 'image_count')
+    readonly_fields = (
+        'created_at', 'updated_at', 'views', 'image_count',
+        'read_time', 'read_time_ge', 'word_count', 'word_count_ge',
+    )
     
     inlines = [BlogPostImageInline]
     
@@ -144,7 +147,7 @@ class BlogPostAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
         ('Metadata', {
-            'fields': ('category', 'tags', 'read_time')
+            'fields': ('category', 'tags', ('read_time', 'read_time_ge'), ('word_count', 'word_count_ge'))
         }),
         ('Images', {
             'fields': ('featured_image',)
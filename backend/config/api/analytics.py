@@ -0,0 +1,130 @@
+from collections import Counter
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .counters import BufferedCounter
+from .models import ViewStat
+from .sketches import record_visitor
+
+
+INTERVALS = ['day', 'week', 'month']
+MAX_RANGE_DAYS = 3660
+
+
+# ==================== RECORDING ====================
+
+def upsert_counts(model, key_fields, count_field, rows):
+    """
+    Add rows of (*key values, count) onto the existing counts of a table with
+    a unique constraint on key_fields, one INSERT ... ON CONFLICT DO UPDATE
+    per row. Dates are passed as ISO strings.
+    """
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    columns = ', '.join(quote(name) for name in [*key_fields, count_field])
+    count = quote(count_field)
+    sql = (
+        f'INSERT INTO {table} ({columns}) VALUES ({", ".join(["%s"] * (len(key_fields) + 1))}) '
+        f'ON CONFLICT ({", ".join(quote(name) for name in key_fields)}) '
+        f'DO UPDATE SET {count} = {table}.{count} + excluded.{count}'
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, [
+            [value.isoformat() if isinstance(value, date) else value for value in row]
+            for row in rows
+        ])
+
+
+def upsert_view_stats(rows):
+    """Add (kind, object_id, period, start, views) rows onto existing counts"""
+    upsert_counts(ViewStat, ['kind', 'object_id', 'period', 'start'], 'views', rows)
+
+
+def write_daily_views(deltas):
+    with transaction.atomic():
+        upsert_view_stats(
+            (kind, object_id, 'day', day, views)
+            for (kind, object_id, day), views in sorted(deltas.items())
+        )
+
+
+daily_views = BufferedCounter('daily-views', write_daily_views)
+
+
+def record_view(kind, object_id, visitor=None):
+    """Count one view of an object today, and its visitor in the unique visitor sketches"""
+    daily_views.add((kind, object_id, timezone.localdate()))
+    if visitor is not None:
+        record_visitor(kind, object_id, visitor)
+
+
+# ==================== QUERYING ====================
+
+def get_bucket(day, interval):
+    if interval == 'week':
+        return day - timedelta(days=day.weekday())
+    if interval == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def iter_buckets(start, end, interval):
+    bucket = get_bucket(start, interval)
+    while bucket <= end:
+        yield bucket
+        if interval == 'month':
+            bucket = (bucket + timedelta(days=32)).replace(day=1)
+        else:
+            bucket += timedelta(days=7 if interval == 'week' else 1)
+
+
+def get_view_series(kind, object_id, start, end, interval='day'):
+    """
+    Views per day, week (starting Monday) or month between two dates, every
+    bucket present (zero when nothing was counted). One range scan of the
+    unique index; days older than the daily retention only exist as months,
+    so they are counted by the month series alone.
+    """
+    stats = ViewStat.objects.filter(
+        kind=kind, object_id=object_id,
+        start__gte=get_bucket(start, 'month'), start__lte=end,
+    )
+    if interval != 'month':
+        stats = stats.filter(period='day')
+    counts = Counter()
+    for period, day, views in stats.values_list('period', 'start', 'views'):
+        if period == 'day' and not start <= day <= end:
+            continue
+        counts[get_bucket(day, interval)] += views
+    return [{'start': bucket, 'views': counts[bucket]} for bucket in iter_buckets(start, end, interval)]
+
+
+# ==================== RETENTION ====================
+
+def downsample_view_stats(today=None):
+    """
+    Fold day rows older than VIEW_STATS_DAILY_DAYS into month rows and drop
+    month rows older than VIEW_STATS_MONTHLY_MONTHS. Returns (days folded,
+    months dropped).
+    """
+    today = today or timezone.localdate()
+    day_cutoff = today - timedelta(days=getattr(settings, 'VIEW_STATS_DAILY_DAYS', 180))
+    months = getattr(settings, 'VIEW_STATS_MONTHLY_MONTHS', 60)
+    month_index = today.year * 12 + today.month - 1 - months
+    month_cutoff = date(month_index // 12, month_index % 12 + 1, 1)
+
+    with transaction.atomic():
+        old_days = ViewStat.objects.filter(period='day', start__lt=day_cutoff)
+        months_totals = Counter()
+        for kind, object_id, day, views in old_days.values_list('kind', 'object_id', 'start', 'views').iterator():
+            months_totals[kind, object_id, get_bucket(day, 'month')] += views
+        upsert_view_stats(
+            (kind, object_id, 'month', month, views)
+            for (kind, object_id, month), views in sorted(months_totals.items())
+        )
+        folded, _ = old_days.delete()
+        dropped, _ = ViewStat.objects.filter(period='month', start__lt=month_cutoff).delete()
+    return folded, dropped
@@ -0,0 +1,58 @@
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+# ==================== GENERATION COUNTERS ====================
+
+def _generation_key(name):
+    return f'api:generation:{name}'
+
+
+# Generations nobody has bumped yet expire, so lookups of rows that were
+# deleted or never written do not pin keys in the cache forever
+GENERATION_TIMEOUT = getattr(settings, 'GENERATION_TIMEOUT', 7 * 24 * 3600)
+
+
+def get_generation(name, create=True):
+    """
+    Current change generation of a group of tables. Cache keys and ETags embed
+    it, so a bump orphans everything built from older data. Generations are
+    nanosecond timestamps of the last change, which keeps them unique even when
+    a counter is evicted and has to restart. With create=False a generation
+    that does not exist yet is not started, and None is returned.
+    """
+    key = _generation_key(name)
+    generation = cache.get(key)
+    if generation is None:
+        if not create:
+            return None
+        cache.add(key, time.time_ns(), timeout=GENERATION_TIMEOUT)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_generation(name):
+    key = _generation_key(name)
+    # Coarse clocks must still move the generation forward
+    generation = max(time.time_ns(), (cache.get(key) or 0) + 1)
+    cache.set(key, generation, timeout=None)
+    return generation
+
+
+def generation_datetime(generation):
+    """Time of the change that produced a generation, for Last-Modified"""
+    return datetime.fromtimestamp(generation / 1e9, tz=timezone.utc)
+
+
+# ==================== REQUEST KEYS ====================
+
+def normalized_query_string(request):
+    """Query parameters in a canonical order, so equivalent URLs share a key"""
+    return '&'.join(
+        f'{name}={value}'
+        for name in sorted(request.query_params)
+        for value in sorted(request.query_params.getlist(name))
+    )
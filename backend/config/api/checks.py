@@ -0,0 +1,20 @@
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Tags, Warning, register
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    ETags, Last-Modified and cached responses come from change generations
+    kept in the default cache; a per-process cache lets workers that never
+    saw a write keep validating stale content.
+    """
+    if isinstance(caches['default'], (LocMemCache, DummyCache)):
+        return [Warning(
+            'The default cache is not shared between processes.',
+            hint='Use a file, database, Redis or Memcached cache when running more than one worker.',
+            id='api.W001',
+        )]
+    return []
@@ -0,0 +1,169 @@
+import atexit
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+
+from .cache import bump_generation
+from .leaderboards import BLOG_POST_LEADERBOARDS
+from .models import BlogPost
+
+
+logger = logging.getLogger(__name__)
+
+
+# ==================== WRITE-BEHIND COUNTERS ====================
+
+class WriteBehindBuffer(ABC):
+    """
+    Updates per key, held in process memory and written in batches. add()
+    only touches a dict under a lock; every COUNTER_FLUSH_INTERVAL seconds
+    (or once COUNTER_MAX_PENDING keys are waiting) the pending values are
+    handed to write() in one go. Flushes run on a daemon thread, which add()
+    wakes once a flush is due, so no request thread takes the database write
+    lock; with COUNTER_FLUSH_BACKGROUND = False add() flushes inline instead.
+    Everything is flushed at interpreter exit. Values of a failed write are
+    put back and retried with the next flush. Subclasses say how a value
+    joins the pending one for its key.
+    """
+
+    def __init__(self, name, write):
+        self.name = name
+        self.write = write
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.pending = {}
+        self.last_flush = time.monotonic()
+        counters.append(self)
+
+    @property
+    def interval(self):
+        return getattr(settings, 'COUNTER_FLUSH_INTERVAL', 10)
+
+    @abstractmethod
+    def combine(self, key, value):
+        """Fold value into self.pending[key]; called with the lock held"""
+
+    def add(self, key, value):
+        with self.lock:
+            self.combine(key, value)
+            due = self.is_due()
+        if getattr(settings, 'COUNTER_FLUSH_BACKGROUND', True):
+            start_flusher()
+            if due:
+                flush_due.set()
+        elif due:
+            try:
+                self.flush()
+            except Exception:
+                # The batch is pending again; a failed write must not fail the request that counted
+                logger.exception('Flushing %s failed, will retry', self.name)
+
+    def is_due(self):
+        return (
+            time.monotonic() - self.last_flush >= self.interval
+            or len(self.pending) >= getattr(settings, 'COUNTER_MAX_PENDING', 10000)
+        )
+
+    def flush(self):
+        """Write everything pending; returns what was written"""
+        # One flush at a time, so a retry cannot overtake the write it retries
+        with self.flush_lock:
+            with self.lock:
+                batch, self.pending = self.pending, {}
+                self.last_flush = time.monotonic()
+            if not batch:
+                return {}
+            try:
+                self.write(batch)
+            except Exception:
+                with self.lock:
+                    for key, value in batch.items():
+                        self.combine(key, value)
+                raise
+            return batch
+
+
+class BufferedCounter(WriteBehindBuffer):
+    """Write-behind integer increments, summed per key"""
+
+    def combine(self, key, value):
+        self.pending[key] = self.pending.get(key, 0) + value
+
+    def add(self, key, amount=1):
+        super().add(key, amount)
+
+    def get_pending(self, key):
+        with self.lock:
+            return self.pending.get(key, 0)
+
+
+counters = []
+flusher = None
+flusher_lock = threading.Lock()
+# Set by add() to wake the flusher before its next round
+flush_due = threading.Event()
+
+
+def flush_counters():
+    for counter in counters:
+        counter.flush()
+
+
+def run_flusher():
+    while True:
+        flush_due.wait(min(counter.interval for counter in counters))
+        # Cleared before flushing, so an add() during the round wakes the next one
+        flush_due.clear()
+        for counter in counters:
+            if counter.is_due():
+                try:
+                    counter.flush()
+                except Exception:
+                    # Kept pending for the next round
+                    logger.exception('Flushing %s failed, will retry', counter.name)
+        # Let this thread's connection go between rounds
+        connection.close()
+
+
+def start_flusher():
+    """Start the flush thread once per process"""
+    global flusher
+    if flusher is not None or not getattr(settings, 'COUNTER_FLUSH_BACKGROUND', True):
+        return
+    with flusher_lock:
+        if flusher is None:
+            flusher = threading.Thread(target=run_flusher, name='counter-flusher', daemon=True)
+            flusher.start()
+
+
+atexit.register(flush_counters)
+
+
+# ==================== BLOG POST VIEWS ====================
+
+def write_blog_post_views(deltas):
+    """
+    One `UPDATE ... SET views = views + n` per post in a single transaction;
+    updated_at and the other columns are left alone. Leaderboards and the
+    posts' own response caches and ETags are then refreshed once for the
+    whole batch. The list generation is left alone: bumping it on every flush
+    would empty the list cache every interval, so list view counts may lag
+    until the next write to a post.
+    """
+    post_ids = sorted(deltas)
+    with transaction.atomic():
+        for post_id in post_ids:
+            BlogPost.objects.filter(pk=post_id).update(views=F('views') + deltas[post_id])
+    rows = {row['id']: row for row in BlogPost.objects.filter(pk__in=post_ids).values('id', 'views', 'published')}
+    for post_id in post_ids:
+        for board in BLOG_POST_LEADERBOARDS:
+            board.record(post_id, rows.get(post_id))
+        bump_generation(f'blog-posts:{post_id}')
+
+
+blog_post_views = BufferedCounter('blog-post-views', write_blog_post_views)
@@ -0,0 +1,91 @@
+from django.db.models import Prefetch
+from django.http import HttpRequest, QueryDict
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from .models import Tool, ToolDemo, ToolDocument
+from .serializers import ToolSerializer
+
+
+# Media URLs are rendered against this origin and swapped for the real one when served
+DOCUMENT_HOST = 'materialized.invalid'
+DOCUMENT_ORIGIN = f'http://{DOCUMENT_HOST}'
+DOCUMENT_LANGUAGES = [language for language, _ in ToolDocument.LANGUAGE_CHOICES]
+
+# Bump whenever ToolSerializer's output changes: documents rendered with an
+# older schema are treated as missing and rebuilt on their next read
+DOCUMENT_SCHEMA = 1
+
+
+class DocumentRequest(HttpRequest):
+    """Stand-in GET request used to render documents outside a real request"""
+
+    def __init__(self, language):
+        super().__init__()
+        self.method = 'GET'
+        self.GET = QueryDict(mutable=True)
+        if language != 'all':
+            self.GET['lang'] = language
+
+    def get_host(self):
+        return DOCUMENT_HOST
+
+
+def get_document_queryset():
+    return Tool.objects.prefetch_related(
+        'key_features', 'pros', 'cons', 'usage_steps',
+        Prefetch('demos', queryset=ToolDemo.objects.order_by('order', 'created_at')),
+    )
+
+
+def render_tool_document(tool, language):
+    """Render the retrieve payload of a tool exactly as ToolSerializer would"""
+    request = Request(DocumentRequest(language))
+    serializer = ToolSerializer(tool, context={'request': request})
+    return JSONRenderer().render(serializer.data).decode()
+
+
+def rebuild_tool_documents(tool_id):
+    """Re-render every language of one tool; drops its documents if the tool is gone"""
+    tool = get_document_queryset().filter(pk=tool_id).first()
+    if tool is None:
+        ToolDocument.objects.filter(tool_id=tool_id).delete()
+        return None
+    for language in DOCUMENT_LANGUAGES:
+        ToolDocument.objects.update_or_create(
+            tool=tool, language=language,
+            defaults={'body': render_tool_document(tool, language), 'schema': DOCUMENT_SCHEMA},
+        )
+    return tool
+
+
+def get_tool_document(tool_id, language, origin):
+    """
+    Stored JSON bytes for a tool, built on first access or when stored with an
+    older schema; None if the tool does not exist
+    """
+    body = ToolDocument.objects.filter(
+        tool_id=tool_id, language=language, schema=DOCUMENT_SCHEMA,
+    ).values_list('body', flat=True).first()
+    if body is None:
+        if rebuild_tool_documents(tool_id) is None:
+            return None
+        body = ToolDocument.objects.get(tool_id=tool_id, language=language).body
+    return body.replace(DOCUMENT_ORIGIN, origin).encode()
+
+
+def check_tool_documents():
+    """Compare stored documents against a fresh render; returns (tool_id, language, problem) rows"""
+    stored = {
+        (document.tool_id, document.language): (document.body, document.schema)
+        for document in ToolDocument.objects.all()
+    }
+    problems = []
+    for tool in get_document_queryset():
+        for language in DOCUMENT_LANGUAGES:
+            body, schema = stored.pop((tool.pk, language), (None, None))
+            if body is None:
+                problems.append((tool.pk, language, 'missing'))
+            elif schema != DOCUMENT_SCHEMA or body != render_tool_document(tool, language):
+                problems.append((tool.pk, language, 'stale'))
+    return problems
@@ -0,0 +1,152 @@
+import json
+import logging
+import os
+import queue
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .analytics import upsert_counts
+from .counters import BufferedCounter
+from .models import EventCount, Tool, ToolDemo
+
+
+logger = logging.getLogger(__name__)
+
+
+# Event type -> model its id refers to
+EVENT_TYPES = {
+    'tool_click': Tool,
+    'demo_play': ToolDemo,
+}
+
+
+# ==================== PARSING ====================
+
+def parse_events(payload):
+    """
+    Valid (event, id, client ts) triples of a beacon payload, a list of
+    {"type", "id", "ts"} objects or {"events": [...]}. Malformed entries are
+    dropped rather than failing the batch; returns None when the payload is
+    not a batch at all.
+    """
+    if isinstance(payload, dict):
+        payload = payload.get('events')
+    if not isinstance(payload, list):
+        return None
+    events = []
+    for item in payload[:getattr(settings, 'EVENTS_MAX_BATCH', 100)]:
+        if not isinstance(item, dict) or item.get('type') not in EVENT_TYPES:
+            continue
+        object_id = item.get('id')
+        if isinstance(object_id, str) and object_id.isdigit():
+            object_id = int(object_id)
+        if not isinstance(object_id, int) or isinstance(object_id, bool) or object_id <= 0:
+            continue
+        ts = item.get('ts')
+        events.append((item['type'], object_id, ts if isinstance(ts, (int, float, str)) else None))
+    return events
+
+
+# ==================== EVENT LOG ====================
+
+def get_event_log_path():
+    return getattr(settings, 'EVENT_LOG_PATH', os.path.join(settings.BASE_DIR, 'logs', 'events.log'))
+
+
+def append_event_log(events, received):
+    """
+    Append events as JSON lines with one write() on an O_APPEND descriptor,
+    so concurrent workers never interleave within a batch. No client
+    address or user agent is kept.
+    """
+    path = get_event_log_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    data = ''.join(
+        json.dumps({'received': received.isoformat(), 'type': event, 'id': object_id, 'ts': ts}, separators=(',', ':')) + '\n'
+        for event, object_id, ts in events
+    ).encode()
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+
+
+# ==================== AGGREGATION ====================
+
+def write_event_counts(deltas):
+    """Add counts per (event, id, day), skipping ids that do not exist (any client can post them)"""
+    known = {
+        event: set(model.objects.filter(pk__in={object_id for key_event, object_id, _ in deltas if key_event == event})
+                   .values_list('pk', flat=True))
+        for event, model in EVENT_TYPES.items()
+    }
+    with transaction.atomic():
+        upsert_counts(EventCount, ['event', 'object_id', 'day'], 'count', (
+            (event, object_id, day, count)
+            for (event, object_id, day), count in sorted(deltas.items())
+            if object_id in known[event]
+        ))
+
+
+event_counts = BufferedCounter('event-counts', write_event_counts)
+
+
+def aggregate_events(events, day):
+    """
+    Count a batch per (event, id) before handing it to the counter; a flush
+    that fails along the way is logged by the counter and its values stay
+    pending, so the rest of the batch is still counted.
+    """
+    counts = Counter((event, object_id, day) for event, object_id, _ in events)
+    for key, count in counts.items():
+        event_counts.add(key, count)
+
+
+event_queue = queue.Queue()
+aggregator = None
+aggregator_lock = threading.Lock()
+
+
+def run_aggregator():
+    while True:
+        events, day = event_queue.get()
+        try:
+            aggregate_events(events, day)
+        except Exception:
+            logger.exception('Aggregating %d events failed', len(events))
+        finally:
+            event_queue.task_done()
+            connection.close()
+
+
+def start_aggregator():
+    global aggregator
+    if aggregator is not None:
+        return
+    with aggregator_lock:
+        if aggregator is None:
+            aggregator = threading.Thread(target=run_aggregator, name='event-aggregator', daemon=True)
+            aggregator.start()
+
+
+def record_events(events):
+    """
+    Log a batch of events and hand it to the aggregator thread (inline with
+    EVENTS_BACKGROUND = False). Only the log append happens on the caller's
+    thread; counts reach the database with the counter's batched flushes.
+    """
+    if not events:
+        return
+    received = timezone.now()
+    append_event_log(events, received)
+    day = timezone.localdate(received)
+    if getattr(settings, 'EVENTS_BACKGROUND', True):
+        start_aggregator()
+        event_queue.put((events, day))
+    else:
+        aggregate_events(events, day)
@@ -0,0 +1,196 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import Http404, HttpResponseBadRequest
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import require_safe
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+
+from .media import get_media_cache_control, serve_file
+
+
+# ==================== VARIANTS ====================
+
+# Requested sizes snap up to these, so query strings cannot fill the cache
+IMAGE_SIZES = (160, 320, 480, 640, 960, 1280, 1920)
+
+# Output formats: Pillow format name, file extension, save options
+IMAGE_FORMATS = {
+    'avif': ('AVIF', 'avif', {'quality': 60}),
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+    'png': ('PNG', 'png', {'optimize': True}),
+}
+SOURCE_FORMATS = {'JPEG': 'jpeg', 'MPO': 'jpeg', 'PNG': 'png', 'WEBP': 'webp', 'AVIF': 'avif'}
+
+
+def snap_size(value):
+    """Smallest allowed size that covers the request (None when not given)"""
+    if value is None:
+        return None
+    return next((size for size in IMAGE_SIZES if size >= value), IMAGE_SIZES[-1])
+
+
+def negotiate_format(request, source_format):
+    """Best modern format the client accepts, else the source's own"""
+    accept = request.META.get('HTTP_ACCEPT', '')
+    for name in ['avif', 'webp']:
+        if f'image/{name}' in accept and features.check(name):
+            return name
+    return SOURCE_FORMATS.get(source_format, 'png')
+
+
+def render_variant(source_path, target_path, width, height, output_format):
+    """Resize (never upscale, EXIF orientation applied) and encode one variant atomically"""
+    pillow_format, _, options = IMAGE_FORMATS[output_format]
+    with Image.open(source_path) as image:
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((width or image.width, height or image.height), Image.Resampling.LANCZOS)
+        if pillow_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        elif image.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+            image = image.convert('RGBA')
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(target_path), suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as file:
+                image.save(file, pillow_format, **options)
+            os.replace(temp_path, target_path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+
+# ==================== DISK CACHE ====================
+
+class ImageCache:
+    """
+    Size-capped LRU of rendered variants on disk. A hit bumps the file's
+    access time (the modification time stays, as it backs the ETag), so
+    recency survives restarts and is shared by every process; when the
+    running total passes the cap, the directory is scanned and the least
+    recently used files are removed down to 90% of it.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.totals = {}
+
+    @property
+    def directory(self):
+        return getattr(settings, 'IMAGE_CACHE_DIR', os.path.join(settings.MEDIA_ROOT, 'cache', 'img'))
+
+    @property
+    def max_bytes(self):
+        return getattr(settings, 'IMAGE_CACHE_MAX_BYTES', 512 * 1024 * 1024)
+
+    def get_path(self, key, extension):
+        digest = hashlib.md5(key.encode()).hexdigest()
+        return os.path.join(self.directory, digest[:2], f'{digest}.{extension}')
+
+    def touch(self, path):
+        try:
+            os.utime(path, ns=(time.time_ns(), os.stat(path).st_mtime_ns))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def scan(self):
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_atime, stat.st_size, path))
+        return files
+
+    def added(self, path):
+        """Account for a new file and evict the least recently used ones when over the cap"""
+        directory = self.directory
+        with self.lock:
+            total = self.totals.get(directory)
+            if total is None:
+                total = sum(size for _, size, _ in self.scan())
+            else:
+                total += os.path.getsize(path)
+            if total > self.max_bytes:
+                # Other processes write here too, so the running total is only a trigger
+                files = sorted(self.scan())
+                total = sum(size for _, size, _ in files)
+                for _, size, victim in files:
+                    if total <= self.max_bytes * 0.9:
+                        break
+                    if victim == path:
+                        continue
+                    try:
+                        os.unlink(victim)
+                    except FileNotFoundError:
+                        pass
+                    total -= size
+            self.totals[directory] = total
+
+
+image_cache = ImageCache()
+
+
+# ==================== VIEW ====================
+
+@require_safe
+def serve_image(request, path):
+    """
+    /media/img/<path>?w=&h=&fmt= - a stored image fitted inside w x h (sizes
+    snap to IMAGE_SIZES) and re-encoded as fmt, or as AVIF/WebP when the
+    Accept header allows. Variants are keyed by the source's mtime and size,
+    rendered once into the disk cache and then served like any media file.
+    """
+    try:
+        source_path = safe_join(settings.MEDIA_ROOT, path)
+        stat = os.stat(source_path)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404('Image not found')
+    try:
+        width, height = [
+            int(request.GET[name]) if request.GET.get(name) else None for name in ['w', 'h']
+        ]
+    except ValueError:
+        return HttpResponseBadRequest('w and h must be integers')
+    if any(size is not None and size < 1 for size in [width, height]):
+        return HttpResponseBadRequest('w and h must be positive')
+    width, height = snap_size(width), snap_size(height)
+    output_format = request.GET.get('fmt')
+    if output_format is not None and (
+            output_format not in IMAGE_FORMATS
+            or output_format in ('avif', 'webp') and not features.check(output_format)):
+        return HttpResponseBadRequest('Unsupported fmt')
+
+    negotiated = output_format is None
+    if negotiated:
+        try:
+            with Image.open(source_path) as image:
+                source_format = image.format
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+            raise Http404('Image not found')
+        output_format = negotiate_format(request, source_format)
+
+    key = f'{path}|{stat.st_mtime_ns}|{stat.st_size}|{width}|{height}|{output_format}'
+    variant_path = image_cache.get_path(key, IMAGE_FORMATS[output_format][1])
+    if not image_cache.touch(variant_path):
+        try:
+            render_variant(source_path, variant_path, width, height, output_format)
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+            raise Http404('Image not found')
+        image_cache.added(variant_path)
+
+    response = serve_file(request, variant_path, get_media_cache_control(path))
+    if negotiated:
+        patch_vary_headers(response, ('Accept',))
+    return response
@@ -0,0 +1,150 @@
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.text import slugify
+
+from .models import BlogPost, Tool
+
+
+LEADERBOARD_SIZE = getattr(settings, 'LEADERBOARD_SIZE', 50)
+LEADERBOARD_TIMEOUT = getattr(settings, 'LEADERBOARD_TIMEOUT', 24 * 3600)
+# Seconds an update waits for a list's lock, and after which a lock left by a dead holder expires
+LEADERBOARD_LOCK_WAIT = 2
+LEADERBOARD_LOCK_TIMEOUT = 10
+
+
+@contextmanager
+def list_lock(key):
+    """
+    Lock on one cached list across processes, taken with cache.add. Yields
+    whether it was acquired within LEADERBOARD_LOCK_WAIT seconds.
+    """
+    lock_key, token = f'{key}:lock', uuid.uuid4().hex
+    deadline = time.monotonic() + LEADERBOARD_LOCK_WAIT
+    acquired = cache.add(lock_key, token, LEADERBOARD_LOCK_TIMEOUT)
+    while not acquired and time.monotonic() < deadline:
+        time.sleep(0.01)
+        acquired = cache.add(lock_key, token, LEADERBOARD_LOCK_TIMEOUT)
+    try:
+        yield acquired
+    finally:
+        # Only our own lock: an expired one may have been taken by someone else since
+        if acquired and cache.get(lock_key) == token:
+            cache.delete(lock_key)
+
+
+class Leaderboard:
+    """
+    Bounded top-N of a model by one score column, optionally one list per value
+    of a partition column (e.g. per category). Lists live in the cache as
+    [(score, id), ...] best first; a missing list is built with one
+    `ORDER BY score DESC, id DESC LIMIT N` query, and after that every change
+    is applied in place. The database is only asked again when a row leaves a
+    full list and the next-best row is unknown. Writes to a list hold its
+    lock, so processes updating it at once cannot lose each other's changes;
+    an update that cannot get the lock drops the list to be rebuilt instead.
+    """
+
+    def __init__(self, name, model, score, partition=None, **filters):
+        self.name = name
+        self.model = model
+        self.score = score
+        self.partition = partition
+        self.filters = filters
+        self.size = LEADERBOARD_SIZE
+
+    def get_partitions(self):
+        if self.partition is None:
+            return [None]
+        return [value for value, _ in self.model._meta.get_field(self.partition).choices]
+
+    def get_key(self, partition):
+        return f'api:leaderboard:{self.name}:{slugify(partition) if partition else "all"}'
+
+    def get_queryset(self, partition):
+        queryset = self.model._default_manager.filter(**self.filters)
+        if self.partition is not None:
+            queryset = queryset.filter(**{self.partition: partition})
+        return queryset.order_by(f'-{self.score}', '-id')
+
+    def load(self, partition):
+        return list(self.get_queryset(partition).values_list(self.score, 'id')[:self.size])
+
+    def build(self, partition):
+        key = self.get_key(partition)
+        with list_lock(key) as locked:
+            entries = self.load(partition)
+            # Without the lock an update may be running; serve the rows but leave the list to it
+            if locked:
+                cache.set(key, entries, LEADERBOARD_TIMEOUT)
+        return entries
+
+    def top(self, partition=None, limit=None):
+        """[(score, id)] best first, at most limit (and never more than size)"""
+        entries = cache.get(self.get_key(partition))
+        if entries is None:
+            entries = self.build(partition)
+        return entries[:limit or self.size]
+
+    def record(self, pk, values):
+        """
+        Apply the current state of one row: values holds its score and
+        partition columns, or is None when the row is gone. Lists that have
+        not been built yet are left alone.
+        """
+        qualifies = values is not None and all(values[name] == value for name, value in self.filters.items())
+        home = values[self.partition] if qualifies and self.partition else None
+        keys = {self.get_key(partition): partition for partition in self.get_partitions()}
+        for key in cache.get_many(list(keys)):
+            with list_lock(key) as locked:
+                if not locked:
+                    # Cannot be applied safely; the next read rebuilds the list from the database
+                    cache.delete(key)
+                    continue
+                # Read again under the lock: another process may have changed it
+                entries = cache.get(key)
+                if entries is not None:
+                    self.apply(key, keys[key], entries, pk, values if qualifies else None, home)
+
+    def apply(self, key, partition, entries, pk, values, home):
+        """Write one list with the row's new state; called with the list's lock held"""
+        full = len(entries) >= self.size
+        remaining = [entry for entry in entries if entry[1] != pk]
+        if values is not None and partition == home:
+            entry = (values[self.score], pk)
+            # A short list holds every row; a full one only rows above its last
+            if not full or (remaining and entry > remaining[-1]):
+                remaining = sorted(remaining + [entry], reverse=True)
+        if full and len(remaining) < self.size:
+            # The row fell off a full list and the next-best one is not known here
+            cache.set(key, self.load(partition), LEADERBOARD_TIMEOUT)
+        elif remaining != entries:
+            cache.set(key, remaining[:self.size], LEADERBOARD_TIMEOUT)
+
+
+# ==================== BOARDS ====================
+
+TOOL_LEADERBOARDS = [
+    Leaderboard('tools-rating', Tool, 'rating'),
+    Leaderboard('tools-rating-category', Tool, 'rating', partition='category'),
+    Leaderboard('tools-rating-pricing', Tool, 'rating', partition='pricing'),
+]
+
+BLOG_POST_LEADERBOARDS = [
+    Leaderboard('blog-posts-views', BlogPost, 'views', published=True),
+]
+
+
+def refresh_tool_leaderboards(tool_id):
+    values = Tool.objects.filter(pk=tool_id).values('rating', 'category', 'pricing').first()
+    for board in TOOL_LEADERBOARDS:
+        board.record(tool_id, values)
+
+
+def refresh_blog_post_leaderboards(post_id):
+    values = BlogPost.objects.filter(pk=post_id).values('views', 'published').first()
+    for board in BLOG_POST_LEADERBOARDS:
+        board.record(post_id, values)
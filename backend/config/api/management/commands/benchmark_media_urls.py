@@ -0,0 +1,65 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from rest_framework.request import Request
+
+from api.models import ToolDemo
+from api.serializers import ToolDemoSerializer
+
+
+class LegacyToolDemoSerializer(ToolDemoSerializer):
+    """Media URLs resolved the way they were before the shared resolver, as the baseline"""
+
+    def _get_media_url(self, obj, url_field, file_field):
+        request = self.context.get('request')
+        url_value = getattr(obj, url_field, None)
+        if url_value:
+            return url_value
+        file_value = getattr(obj, file_field, None)
+        if file_value:
+            try:
+                if hasattr(file_value, 'url'):
+                    return request.build_absolute_uri(file_value.url) if request else file_value.url
+                return str(file_value)
+            except Exception:
+                return None
+        return None
+
+
+class Command(BaseCommand):
+    help = 'Time ToolDemoSerializer on an in-memory list of demos, against the previous media URL code'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--demos', type=int, default=1000, help='Demos in the serialized list')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per serializer')
+
+    def handle(self, *args, **options):
+        demos = self.make_demos(options['demos'])
+        request = Request(RequestFactory().get('/api/tool-demos/', SERVER_NAME=self.get_host()))
+        for name, serializer_class in [('before', LegacyToolDemoSerializer), ('after', ToolDemoSerializer)]:
+            timings = []
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                serializer_class(demos, many=True, context={'request': request}).data
+                timings.append(time.perf_counter() - start)
+            per_demo = min(timings) / len(demos) * 1e6
+            self.stdout.write(f'{name:>6}  {min(timings) * 1000:8.1f} ms  {per_demo:6.1f} us/demo')
+
+    def get_host(self):
+        hosts = [host for host in settings.ALLOWED_HOSTS if host not in ('*', '') and not host.startswith('.')]
+        return hosts[0] if hosts else 'localhost'
+
+    def make_demos(self, count):
+        """Unsaved demos sharing a handful of files, with one external URL field each"""
+        return [
+            ToolDemo(
+                id=index, tool_id=1, demo_type='image-to-image', title=f'Demo {index}', order=index,
+                input_image_file=f'demos/inputs/images/input-{index % 20}.png',
+                output_image_file=f'demos/outputs/images/output-{index % 20}.png',
+                output_audio_file=f'demos/outputs/audio/output-{index % 20}.mp3',
+                input_video_url='https://example.com/input.mp4',
+            )
+            for index in range(count)
+        ]
@@ -0,0 +1,151 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api.models import BlogPost, BlogPostImage, News, Tool, ToolDemo
+
+
+class Rollback(Exception):
+    """Abort the benchmark transaction once the report is written"""
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed synthetic rows inside a transaction, then print the SQLite query plan and '
+        'timing of every list access path with and without the Meta.indexes. '
+        'Everything is rolled back afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100_000, help='Rows seeded per table')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per query')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Query plans are only benchmarked on SQLite')
+        self.repeat = options['repeat']
+        try:
+            with transaction.atomic():
+                tool, post = self.seed(options['rows'])
+                paths = self.get_access_paths(tool, post)
+                indexed = [self.measure(queryset, 'indexed') for _, queryset in paths]
+                self.drop_indexes()
+                scanned = [self.measure(queryset, 'scanned') for _, queryset in paths]
+                self.report(options['rows'], paths, scanned, indexed)
+                raise Rollback
+        except Rollback:
+            pass
+
+    # ==================== DATA ====================
+
+    def seed(self, rows):
+        """Bulk insert rows per table (no signals fire), spread over time and categories"""
+        now = timezone.now()
+        tool_categories = [value for value, _ in Tool.CATEGORY_CHOICES]
+        pricing = [value for value, _ in Tool.PRICING_CHOICES]
+        difficulty = [value for value, _ in Tool.DIFFICULTY_CHOICES]
+        post_categories = [value for value, _ in BlogPost.CATEGORY_CHOICES]
+        news_categories = [value for value, _ in News.CATEGORY_CHOICES]
+
+        tools = Tool.objects.bulk_create([
+            Tool(
+                name=f'Tool {index}', description='', category=tool_categories[index % len(tool_categories)],
+                pricing=pricing[index % len(pricing)], difficulty=difficulty[index % len(difficulty)],
+                rating=index % 50 / 10,
+            )
+            for index in range(rows)
+        ], batch_size=1000)
+        posts = BlogPost.objects.bulk_create([
+            BlogPost(
+                title=f'Post {index}', content='', author='Benchmark',
+                category=post_categories[index % len(post_categories)],
+                views=index % 997, published=index % 10 != 0,
+            )
+            for index in range(rows)
+        ], batch_size=1000)
+        News.objects.bulk_create([
+            News(
+                title=f'News {index}', summary='', category=news_categories[index % len(news_categories)],
+                published=index % 10 != 0,
+            )
+            for index in range(rows)
+        ], batch_size=1000)
+        ToolDemo.objects.bulk_create([
+            ToolDemo(tool=tools[index % len(tools)], demo_type='text-to-text', title=f'Demo {index}', order=index % 5)
+            for index in range(rows)
+        ], batch_size=1000)
+        BlogPostImage.objects.bulk_create([
+            BlogPostImage(blog_post=posts[index % len(posts)], image='blog/content_images/benchmark.png', order=index % 5)
+            for index in range(rows)
+        ], batch_size=1000)
+
+        # auto_now_add gives every row the same timestamp; spread them out
+        for model in [Tool, BlogPost, News]:
+            table = model._meta.db_table
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'UPDATE {table} SET created_at = datetime(%s, \'-\' || (id %% %s) || \' minutes\')',
+                    [now.strftime('%Y-%m-%d %H:%M:%S'), rows],
+                )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        return tools[len(tools) // 2], posts[len(posts) // 2]
+
+    def get_access_paths(self, tool, post):
+        """The queries the list endpoints issue for their first page"""
+        page = 21
+        since = timezone.now() - timedelta(days=1)
+        return [
+            ('tools', Tool.objects.order_by('-created_at', '-id')[:page]),
+            ('tools ?category=', Tool.objects.filter(category=tool.category).order_by('-created_at', '-id')[:page]),
+            ('tools ?pricing=', Tool.objects.filter(pricing=tool.pricing).order_by('-created_at', '-id')[:page]),
+            ('tools ?difficulty=',
+             Tool.objects.filter(difficulty=tool.difficulty).order_by('-created_at', '-id')[:page]),
+            ('tools ?ordering=-rating', Tool.objects.order_by('-rating', '-id')[:page]),
+            ('tools ?ordering=name', Tool.objects.order_by('name', 'id')[:page]),
+            ('tool demos of a tool', ToolDemo.objects.filter(tool=tool).order_by('order', 'created_at', 'id')),
+            ('blog posts', BlogPost.objects.filter(published=True).order_by('-created_at', '-id')[:page]),
+            ('blog posts ?category=',
+             BlogPost.objects.filter(published=True, category=post.category).order_by('-created_at', '-id')[:page]),
+            ('blog posts ?ordering=-views', BlogPost.objects.filter(published=True).order_by('-views', '-id')[:page]),
+            ('blog posts since', BlogPost.objects.filter(published=True, created_at__gte=since).order_by(
+                '-created_at', '-id')[:page]),
+            ('blog images of a post', BlogPostImage.objects.filter(blog_post=post).order_by('order', 'created_at')),
+            ('news', News.objects.filter(published=True).order_by('-created_at', '-id')[:page]),
+            ('news ?category=',
+             News.objects.filter(published=True, category='Research').order_by('-created_at', '-id')[:page]),
+        ]
+
+    def drop_indexes(self):
+        with connection.cursor() as cursor:
+            for model in [Tool, ToolDemo, BlogPost, BlogPostImage, News]:
+                for index in model._meta.indexes:
+                    cursor.execute(f'DROP INDEX "{index.name}"')
+
+    # ==================== MEASUREMENT ====================
+
+    def measure(self, queryset, phase):
+        """(query plan, best of `repeat` wall times in ms)"""
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            # sqlite3 reuses a cached EXPLAIN statement without re-planning it
+            # after the schema changes, so each phase needs distinct SQL text
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql} /* {phase} */', params)
+            plan = '; '.join(row[-1] for row in cursor.fetchall())
+            timings = []
+            for _ in range(self.repeat):
+                start = time.perf_counter()
+                cursor.execute(sql, params)
+                cursor.fetchall()
+                timings.append((time.perf_counter() - start) * 1000)
+        return plan, min(timings)
+
+    def report(self, rows, paths, scanned, indexed):
+        self.stdout.write(f'{rows} rows per table, best of {self.repeat} runs\n')
+        for (name, _), (before_plan, before_ms), (after_plan, after_ms) in zip(paths, scanned, indexed):
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(f'  without indexes  {before_ms:9.2f} ms  {before_plan}')
+            self.stdout.write(f'  with indexes     {after_ms:9.2f} ms  {after_plan}')
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from api.models import ToolDemo
+from api.waveforms import AUDIO_FIELDS, compute_demo_waveforms
+
+
+class Command(BaseCommand):
+    help = 'Compute waveform peaks for demo audio files that have none yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('demo_ids', nargs='*', type=int, help='Only these demos')
+        parser.add_argument('--force', action='store_true', help='Decode every file again')
+
+    def handle(self, *args, **options):
+        demos = ToolDemo.objects.all()
+        if options['demo_ids']:
+            demos = demos.filter(pk__in=options['demo_ids'])
+        else:
+            has_audio = Q()
+            for name in AUDIO_FIELDS:
+                has_audio |= Q(**{f'{name}__gt': ''})
+            demos = demos.filter(has_audio)
+        count = 0
+        for demo_id in demos.order_by('pk').values_list('pk', flat=True):
+            count += compute_demo_waveforms(demo_id, force=options['force'])
+        self.stdout.write(self.style.SUCCESS(f'Computed {count} waveform(s)'))
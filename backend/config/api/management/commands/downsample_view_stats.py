@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from api.analytics import daily_views, downsample_view_stats
+from api.sketches import downsample_visitor_sketches, visitor_sketches
+
+
+class Command(BaseCommand):
+    help = 'Fold old daily view counts and visitor sketches into monthly ones and drop months past retention (run daily)'
+
+    def handle(self, *args, **options):
+        for buffer, downsample in [(daily_views, downsample_view_stats), (visitor_sketches, downsample_visitor_sketches)]:
+            buffer.flush()
+            folded, dropped = downsample()
+            self.stdout.write(self.style.SUCCESS(
+                f'{buffer.name}: folded {folded} daily row(s) into months, dropped {dropped} month row(s)'
+            ))
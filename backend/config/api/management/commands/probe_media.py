@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from api.probe import MEDIA_FIELDS, refresh_media_metadata
+
+
+class Command(BaseCommand):
+    help = 'Record size, MIME type, dimensions and duration of uploaded media that has not been probed yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Probe every file again')
+
+    def handle(self, *args, **options):
+        count = 0
+        for model in MEDIA_FIELDS:
+            for instance in model.objects.order_by('pk').iterator():
+                if options['force']:
+                    instance.media_metadata = {}
+                if refresh_media_metadata(instance):
+                    # Signals still run, so cached responses and documents follow
+                    instance.save(update_fields=['media_metadata'])
+                    count += 1
+        self.stdout.write(self.style.SUCCESS(f'Updated media metadata of {count} row(s)'))
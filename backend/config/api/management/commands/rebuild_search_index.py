@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.search import rebuild_search_index, search_index_available
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the FTS5 tool search index from the tool tables'
+
+    def handle(self, *args, **options):
+        if not search_index_available():
+            raise CommandError('The tool search index is only available on SQLite')
+        rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS('Rebuilt the tool search index'))
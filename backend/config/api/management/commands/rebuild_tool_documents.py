@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.documents import check_tool_documents, rebuild_tool_documents
+from api.models import Tool
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the materialized tool detail documents, or check them with --check'
+
+    def add_arguments(self, parser):
+        parser.add_argument('tool_ids', nargs='*', type=int, help='Only rebuild these tools')
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Compare stored documents with a fresh render instead of rebuilding',
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            problems = check_tool_documents()
+            for tool_id, language, problem in problems:
+                self.stdout.write(f'Tool {tool_id} ({language}): {problem}')
+            if problems:
+                raise CommandError(f'{len(problems)} tool document(s) out of date')
+            self.stdout.write(self.style.SUCCESS('All tool documents are up to date'))
+            return
+
+        tool_ids = options['tool_ids'] or Tool.objects.values_list('pk', flat=True)
+        count = 0
+        for tool_id in tool_ids:
+            rebuild_tool_documents(tool_id)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt documents for {count} tool(s)'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from api.models import BlogPost
+
+
+class Command(BaseCommand):
+    help = 'Render the HTML, table of contents, word counts and read times of every blog post again'
+
+    def handle(self, *args, **options):
+        count = 0
+        for post in BlogPost.objects.order_by('pk').iterator():
+            # Saving the content re-renders it; updated_at is left alone
+            post.save(update_fields=['content', 'content_ge'])
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f'Rendered {count} blog post(s)'))
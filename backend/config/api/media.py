@@ -0,0 +1,192 @@
+import mimetypes
+import os
+import re
+from functools import lru_cache
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+
+# ==================== MEDIA URLS ====================
+
+# Widths offered in srcset attributes; each snaps to a size the resizer renders
+SRCSET_WIDTHS = (320, 640, 960, 1280)
+
+@lru_cache(maxsize=4096)
+def get_storage_url(storage, name):
+    """Site-relative URL of a stored file; FileSystemStorage URLs depend on the name only"""
+    return storage.url(name)
+
+
+class MediaURLResolver:
+    """
+    Absolute URLs of stored files for one request. The origin is computed once,
+    storage URLs are memoized per file name, and an empty field resolves to
+    None instead of raising.
+    """
+
+    def __init__(self, request=None):
+        self.origin = request.build_absolute_uri('/')[:-1] if request is not None else ''
+        self.urls = {}
+        self.srcsets = {}
+
+    def resolve(self, file):
+        if not file:
+            return None
+        url = self.urls.get(file.name)
+        if url is None:
+            url = get_storage_url(file.storage, file.name)
+            if url.startswith('/') and not url.startswith('//'):
+                url = self.origin + url
+            self.urls[file.name] = url
+        return url
+
+    def srcset(self, file):
+        """srcset value offering resized variants of a stored image (see api.images)"""
+        if not file:
+            return None
+        srcset = self.srcsets.get(file.name)
+        if srcset is None:
+            url = f'{self.origin}{settings.MEDIA_URL}img/{quote(file.name)}'
+            srcset = self.srcsets[file.name] = ', '.join(f'{url}?w={width} {width}w' for width in SRCSET_WIDTHS)
+        return srcset
+
+
+# ==================== MEDIA SERVING ====================
+
+# Upload names that embed a content hash or UUID never change meaning
+HASHED_NAME = re.compile(r'(?:^|[._-])[0-9a-f]{12,}(?:[._-]|$)', re.IGNORECASE)
+RANGE_HEADER = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class FileRange:
+    """
+    Bytes [start, start + length) of an open file. It keeps fileno() and
+    tell(), so a wsgi.file_wrapper can still os.sendfile() exactly the range
+    (gunicorn bounds it by Content-Length); other servers read it in blocks.
+    """
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        data = self.file.read(self.remaining if size < 0 else min(size, self.remaining))
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def tell(self):
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """(start, end) inclusive for a single satisfiable range, None to send everything, False if unsatisfiable"""
+    match = RANGE_HEADER.match(header.strip())
+    # Multiple ranges and other units are allowed to be answered with a full 200
+    if match is None or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first:
+        start, end = int(first), int(last) if last else max(size - 1, int(first))
+        if start > end:
+            # Syntactically invalid, so the header is ignored
+            return None
+    else:
+        start, end = max(size - int(last), 0), size - 1
+        if not int(last):
+            return False
+    if start >= size:
+        return False
+    return start, min(end, size - 1)
+
+
+def get_media_cache_control(path):
+    if HASHED_NAME.search(os.path.splitext(os.path.basename(path))[0]):
+        return 'public, max-age=31536000, immutable'
+    return f'public, max-age={getattr(settings, "MEDIA_CACHE_MAX_AGE", 3600)}'
+
+
+@require_safe
+def serve_media(request, path):
+    """Serve a file from MEDIA_ROOT in production (see serve_file)"""
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404('Media file not found')
+    return serve_file(request, full_path, get_media_cache_control(path))
+
+
+def serve_file(request, full_path, cache_control):
+    """
+    Serve a file below MEDIA_ROOT. Validators (strong ETag from mtime and
+    size, Last-Modified) are checked first; the body is then handed to the
+    front server when MEDIA_X_ACCEL_REDIRECT (nginx internal location prefix
+    mapped to MEDIA_ROOT) or MEDIA_X_SENDFILE (Apache/lighttpd) is set, which
+    also handles ranges there. Otherwise single byte ranges get a 206 from
+    FileResponse.
+    """
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        raise Http404('Media file not found')
+    if not os.path.isfile(full_path):
+        raise Http404('Media file not found')
+
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    last_modified = int(stat.st_mtime)
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(last_modified),
+        'Cache-Control': cache_control,
+        'Accept-Ranges': 'bytes',
+    }
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+    accel_prefix = getattr(settings, 'MEDIA_X_ACCEL_REDIRECT', None)
+    if accel_prefix or getattr(settings, 'MEDIA_X_SENDFILE', False):
+        response = HttpResponse(content_type=content_type, headers=headers)
+        if accel_prefix:
+            path = os.path.relpath(full_path, settings.MEDIA_ROOT).replace(os.sep, '/')
+            response['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + quote(path)
+        else:
+            response['X-Sendfile'] = full_path
+        return response
+
+    byte_range = None
+    if 'HTTP_RANGE' in request.META:
+        if_range = request.META.get('HTTP_IF_RANGE')
+        # A stale If-Range validator asks for the whole new file instead
+        if if_range is None or if_range == etag or parse_http_date_safe(if_range) == last_modified:
+            byte_range = parse_range(request.META['HTTP_RANGE'], stat.st_size)
+    if byte_range is False:
+        return HttpResponse(status=416, headers={'Content-Range': f'bytes */{stat.st_size}', **headers})
+
+    file = open(full_path, 'rb')
+    if byte_range is None:
+        return FileResponse(file, content_type=content_type, headers=headers)
+    start, end = byte_range
+    length = end - start + 1
+    response = FileResponse(FileRange(file, start, length), status=206, content_type=content_type, headers=headers)
+    response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+    response['Content-Length'] = length
+    return response
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_blogpostimage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ToolDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(choices=[('all', 'Bilingual'), ('en', 'English'), ('ge', 'Georgian')], max_length=3)),
+                ('body', models.TextField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('tool', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='documents', to='api.tool')),
+            ],
+            options={
+                'verbose_name': 'Tool Document',
+                'verbose_name_plural': 'Tool Documents',
+                'constraints': [models.UniqueConstraint(fields=('tool', 'language'), name='unique_tool_document_language')],
+            },
+        ),
+    ]
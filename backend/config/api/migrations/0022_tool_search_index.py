@@ -0,0 +1,43 @@
+from django.db import migrations
+
+
+CREATE_SEARCH_TABLE = """
+    CREATE VIRTUAL TABLE api_tool_fts USING fts5(
+        name, description, overview, name_ge, description_ge, overview_ge, features,
+        tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    )
+"""
+
+INDEX_TOOLS = """
+    INSERT INTO api_tool_fts (rowid, name, description, overview, name_ge, description_ge, overview_ge, features)
+    SELECT id, name, description, overview, name_ge, description_ge, overview_ge, (
+        SELECT group_concat(feature || ' ' || feature_ge, ' ')
+        FROM api_keyfeature WHERE api_keyfeature.tool_id = api_tool.id
+    )
+    FROM api_tool
+"""
+
+
+def create_search_index(apps, schema_editor):
+    # FTS5 is SQLite only; other backends keep the LIKE based search
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_SEARCH_TABLE)
+    schema_editor.execute(INDEX_TOOLS)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS api_tool_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_tooldocument'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_tool_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(condition=models.Q(('published', True)), fields=['-created_at', '-id'], name='blogpost_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(condition=models.Q(('published', True)), fields=['category', '-created_at', '-id'], name='blogpost_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(condition=models.Q(('published', True)), fields=['-views', '-id'], name='blogpost_views_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blogpostimage',
+            index=models.Index(fields=['blog_post', 'order', 'created_at'], name='blogpostimage_post_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(condition=models.Q(('published', True)), fields=['-created_at', '-id'], name='news_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(condition=models.Q(('published', True)), fields=['category', '-created_at', '-id'], name='news_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tool',
+            index=models.Index(fields=['-created_at', '-id'], name='tool_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tool',
+            index=models.Index(fields=['category', '-created_at', '-id'], name='tool_category_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tool',
+            index=models.Index(fields=['pricing', '-created_at', '-id'], name='tool_pricing_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tool',
+            index=models.Index(fields=['difficulty', '-created_at', '-id'], name='tool_difficulty_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tool',
+            index=models.Index(fields=['-rating', '-id'], name='tool_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tool',
+            index=models.Index(fields=['name', 'id'], name='tool_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tooldemo',
+            index=models.Index(fields=['tool', 'order', 'created_at'], name='tooldemo_tool_order_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0023_access_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='author',
+            name='media_metadata',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Probed size, MIME type, dimensions and duration of each uploaded file, by field name'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='media_metadata',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Probed size, MIME type, dimensions and duration of each uploaded file, by field name'),
+        ),
+        migrations.AddField(
+            model_name='blogpostimage',
+            name='media_metadata',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Probed size, MIME type, dimensions and duration of each uploaded file, by field name'),
+        ),
+        migrations.AddField(
+            model_name='tool',
+            name='media_metadata',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Probed size, MIME type, dimensions and duration of each uploaded file, by field name'),
+        ),
+        migrations.AddField(
+            model_name='tooldemo',
+            name='media_metadata',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Probed size, MIME type, dimensions and duration of each uploaded file, by field name'),
+        ),
+    ]
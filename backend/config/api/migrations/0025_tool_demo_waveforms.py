@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0024_media_metadata'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ToolDemoWaveform',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(choices=[('input_audio_file', 'Input audio'), ('output_audio_file', 'Output audio')], max_length=20)),
+                ('source_name', models.CharField(help_text='Stored name of the file the peaks were computed from', max_length=255)),
+                ('sample_rate', models.PositiveIntegerField()),
+                ('duration', models.FloatField()),
+                ('peaks', models.BinaryField(help_text='Signed 8-bit (min, max) pairs, one per bucket')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('demo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waveforms', to='api.tooldemo')),
+            ],
+            options={
+                'verbose_name': 'Tool Demo Waveform',
+                'verbose_name_plural': 'Tool Demo Waveforms',
+                'constraints': [models.UniqueConstraint(fields=('demo', 'field'), name='unique_tool_demo_waveform_field')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0025_tool_demo_waveforms'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ViewStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('blog-post', 'Blog post'), ('tool', 'Tool')], max_length=20)),
+                ('object_id', models.PositiveIntegerField()),
+                ('period', models.CharField(choices=[('day', 'Day'), ('month', 'Month')], default='day', max_length=5)),
+                ('start', models.DateField(help_text='First day of the period')),
+                ('views', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'View Stat',
+                'verbose_name_plural': 'View Stats',
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id', 'period', 'start'), name='unique_view_stat_period')],
+            },
+        ),
+    ]
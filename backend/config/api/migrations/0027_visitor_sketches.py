@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0026_view_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VisitorSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('blog-post', 'Blog post'), ('tool', 'Tool')], max_length=20)),
+                ('object_id', models.PositiveIntegerField()),
+                ('period', models.CharField(choices=[('day', 'Day'), ('month', 'Month'), ('all', 'All time')], default='day', max_length=5)),
+                ('start', models.DateField(help_text='First day of the period (1970-01-01 for all time)')),
+                ('registers', models.BinaryField()),
+            ],
+            options={
+                'verbose_name': 'Visitor Sketch',
+                'verbose_name_plural': 'Visitor Sketches',
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id', 'period', 'start'), name='unique_visitor_sketch_period')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0027_visitor_sketches'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event', models.CharField(choices=[('tool_click', 'Tool website click'), ('demo_play', 'Demo play')], max_length=20)),
+                ('object_id', models.PositiveIntegerField(help_text='Tool id for clicks, demo id for plays')),
+                ('day', models.DateField()),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Event Count',
+                'verbose_name_plural': 'Event Counts',
+                'constraints': [models.UniqueConstraint(fields=('event', 'object_id', 'day'), name='unique_event_count_day')],
+            },
+        ),
+    ]
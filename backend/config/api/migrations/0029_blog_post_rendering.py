@@ -0,0 +1,74 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:08
+
+from django.db import migrations, models
+
+from api.rendering import count_words, get_read_time, render_markdown
+
+
+def render_blog_posts(apps, schema_editor):
+    # Historical models have no render_content(), so the fields are filled here
+    BlogPost = apps.get_model('api', 'BlogPost')
+    posts = list(BlogPost.objects.only('pk', 'content', 'content_ge'))
+    for post in posts:
+        for suffix in ['', '_ge']:
+            content, toc, text = render_markdown(getattr(post, f'content{suffix}'))
+            words = count_words(text)
+            setattr(post, f'content_html{suffix}', content)
+            setattr(post, f'toc{suffix}', toc)
+            setattr(post, f'word_count{suffix}', words)
+            setattr(post, f'read_time{suffix}', get_read_time(words))
+    BlogPost.objects.bulk_update(posts, [
+        'content_html', 'toc', 'word_count', 'read_time',
+        'content_html_ge', 'toc_ge', 'word_count_ge', 'read_time_ge',
+    ], batch_size=100)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0028_event_counts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='content_html',
+            field=models.TextField(blank=True, editable=False, help_text='Sanitized HTML of the content'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='content_html_ge',
+            field=models.TextField(blank=True, editable=False, verbose_name='Content HTML (Georgian)'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='read_time_ge',
+            field=models.IntegerField(blank=True, editable=False, null=True, verbose_name='Read Time (Georgian)'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='toc',
+            field=models.JSONField(blank=True, default=list, editable=False, help_text='Headings: level, id and title'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='toc_ge',
+            field=models.JSONField(blank=True, default=list, editable=False, verbose_name='Table of Contents (Georgian)'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='word_count_ge',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Word Count (Georgian)'),
+        ),
+        migrations.AlterField(
+            model_name='blogpost',
+            name='read_time',
+            field=models.IntegerField(blank=True, editable=False, help_text='Reading time in minutes', null=True),
+        ),
+        migrations.RunPython(render_blog_posts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0029_blog_post_rendering'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tooldocument',
+            name='schema',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Document schema the body was rendered with'),
+        ),
+    ]
@@ -2,6 +2,8 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 
+from .rendering import count_words, get_read_time, render_markdown
+
 # ==================== TOOL MODELS ====================
 
 class Tool(models.Model):
@@ -68,6 +70,10 @@ class Tool(models.Model):
     # Media (no translation needed)
     logo_url = models.URLField(blank=True, null=True)
     featured_image = models.ImageField(upload_to='tools/', blank=True, null=True)
+    media_metadata = models.JSONField(
+        default=dict, blank=True, editable=False,
+        help_text="Probed size, MIME type, dimensions and duration of each uploaded file, by field name"
+    )
 
     # Details
     pricing = models.CharField(max_length=50, choices=PRICING_CHOICES)
@@ -81,6 +87,16 @@ class Tool(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        # One index per list access path: default ordering, each filter with
+        # the default ordering, and the other sortable columns (id breaks ties)
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='tool_created_idx'),
+            models.Index(fields=['category', '-created_at', '-id'], name='tool_category_created_idx'),
+            models.Index(fields=['pricing', '-created_at', '-id'], name='tool_pricing_created_idx'),
+            models.Index(fields=['difficulty', '-created_at', '-id'], name='tool_difficulty_created_idx'),
+            models.Index(fields=['-rating', '-id'], name='tool_rating_idx'),
+            models.Index(fields=['name', 'id'], name='tool_name_idx'),
+        ]
         verbose_name = 'AI Tool'
         verbose_name_plural = 'AI Tools'
 
@@ -225,6 +241,10 @@ class ToolDemo(models.Model):
         null=True, 
         help_text="Or provide a URL to a video (YouTube, Vimeo, direct MP4, etc.)"
     )
+    media_metadata = models.JSONField(
+        default=dict, blank=True, editable=False,
+        help_text="Probed size, MIME type, dimensions and duration of each uploaded file, by field name"
+    )
 
     # Metadata
     order = models.PositiveIntegerField(default=0, help_text="Display order (0 = first)")
@@ -233,6 +253,9 @@ class ToolDemo(models.Model):
 
     class Meta:
         ordering = ['order', 'created_at']
+        indexes = [
+            models.Index(fields=['tool', 'order', 'created_at'], name='tooldemo_tool_order_idx'),
+        ]
         verbose_name = 'Tool Demo'
         verbose_name_plural = 'Tool Demos'
 
@@ -300,6 +323,61 @@ class UsageStep(models.Model):
         return self.step
 
 
+# ==================== TOOL DOCUMENTS ====================
+
+class ToolDocument(models.Model):
+    """Fully rendered tool detail JSON, rebuilt whenever the tool or its children change"""
+    LANGUAGE_CHOICES = [
+        ('all', 'Bilingual'),
+        ('en', 'English'),
+        ('ge', 'Georgian'),
+    ]
+
+    tool = models.ForeignKey(Tool, on_delete=models.CASCADE, related_name='documents')
+    language = models.CharField(max_length=3, choices=LANGUAGE_CHOICES)
+    body = models.TextField()
+    schema = models.PositiveSmallIntegerField(default=0, help_text='Document schema the body was rendered with')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['tool', 'language'], name='unique_tool_document_language'),
+        ]
+        verbose_name = 'Tool Document'
+        verbose_name_plural = 'Tool Documents'
+
+    def __str__(self):
+        return f"{self.tool_id} ({self.language})"
+
+
+# ==================== DEMO WAVEFORMS ====================
+
+class ToolDemoWaveform(models.Model):
+    """Downsampled min/max peaks of one demo audio file, for drawing its waveform"""
+    FIELD_CHOICES = [
+        ('input_audio_file', 'Input audio'),
+        ('output_audio_file', 'Output audio'),
+    ]
+
+    demo = models.ForeignKey(ToolDemo, on_delete=models.CASCADE, related_name='waveforms')
+    field = models.CharField(max_length=20, choices=FIELD_CHOICES)
+    source_name = models.CharField(max_length=255, help_text="Stored name of the file the peaks were computed from")
+    sample_rate = models.PositiveIntegerField()
+    duration = models.FloatField()
+    peaks = models.BinaryField(help_text="Signed 8-bit (min, max) pairs, one per bucket")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['demo', 'field'], name='unique_tool_demo_waveform_field'),
+        ]
+        verbose_name = 'Tool Demo Waveform'
+        verbose_name_plural = 'Tool Demo Waveforms'
+
+    def __str__(self):
+        return f"{self.demo.title} - {self.get_field_display()}"
+
+
 # ==================== BLOG POST MODELS ====================
 
 class BlogPost(models.Model):
@@ -332,21 +410,70 @@ class BlogPost(models.Model):
     tags = models.JSONField(default=list, blank=True)
     
     featured_image = models.ImageField(upload_to='blog/', blank=True, null=True)
+    media_metadata = models.JSONField(
+        default=dict, blank=True, editable=False,
+        help_text="Probed size, MIME type, dimensions and duration of each uploaded file, by field name"
+    )
     
     views = models.IntegerField(default=0)
-    read_time = models.IntegerField(blank=True, null=True, help_text='Reading time in minutes')
+    read_time = models.IntegerField(blank=True, null=True, editable=False, help_text='Reading time in minutes')
+    read_time_ge = models.IntegerField(blank=True, null=True, editable=False, verbose_name="Read Time (Georgian)")
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    word_count_ge = models.PositiveIntegerField(default=0, editable=False, verbose_name="Word Count (Georgian)")
+    
+    # Rendered from the markdown content on save
+    content_html = models.TextField(blank=True, editable=False, help_text="Sanitized HTML of the content")
+    content_html_ge = models.TextField(blank=True, editable=False, verbose_name="Content HTML (Georgian)")
+    toc = models.JSONField(default=list, blank=True, editable=False, help_text="Headings: level, id and title")
+    toc_ge = models.JSONField(default=list, blank=True, editable=False, verbose_name="Table of Contents (Georgian)")
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     published = models.BooleanField(default=True)
     
+    # Content field -> (HTML, table of contents, word count, read time) fields derived from it
+    RENDERED_FIELDS = {
+        'content': ('content_html', 'toc', 'word_count', 'read_time'),
+        'content_ge': ('content_html_ge', 'toc_ge', 'word_count_ge', 'read_time_ge'),
+    }
+    
     class Meta:
         ordering = ['-created_at']
+        # The public API only ever reads published posts
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='blogpost_published_idx',
+                         condition=models.Q(published=True)),
+            models.Index(fields=['category', '-created_at', '-id'], name='blogpost_category_idx',
+                         condition=models.Q(published=True)),
+            models.Index(fields=['-views', '-id'], name='blogpost_views_idx',
+                         condition=models.Q(published=True)),
+        ]
         verbose_name = 'Blog Post'
         verbose_name_plural = 'Blog Posts'
     
     def __str__(self):
         return self.title
+    
+    def render_content(self):
+        """Fill the rendered HTML, table of contents, word count and read time of both languages"""
+        for source, (html_field, toc_field, words_field, read_time_field) in self.RENDERED_FIELDS.items():
+            content, toc, text = render_markdown(getattr(self, source))
+            words = count_words(text)
+            setattr(self, html_field, content)
+            setattr(self, toc_field, toc)
+            setattr(self, words_field, words)
+            setattr(self, read_time_field, get_read_time(words))
+    
+    def save(self, *args, **kwargs):
+        # Rendering is paid once per edit, not per read; saves that leave the content out skip it
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or self.RENDERED_FIELDS.keys() & set(update_fields):
+            self.render_content()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, *(
+                    field for fields in self.RENDERED_FIELDS.values() for field in fields
+                )}
+        super().save(*args, **kwargs)
 
 
 # ==================== BLOG POST IMAGE MODEL ====================
@@ -354,6 +481,10 @@ class BlogPost(models.Model):
 class BlogPostImage(models.Model):
     blog_post = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name='images')
     image = models.ImageField(upload_to='blog/content_images/')
+    media_metadata = models.JSONField(
+        default=dict, blank=True, editable=False,
+        help_text="Probed size, MIME type, dimensions and duration of each uploaded file, by field name"
+    )
     caption = models.CharField(max_length=255, blank=True)
     caption_ge = models.CharField(max_length=255, blank=True, verbose_name="Caption (Georgian)")
     alt_text = models.CharField(max_length=255, blank=True, help_text="Alt text for accessibility")
@@ -362,6 +493,9 @@ class BlogPostImage(models.Model):
     
     class Meta:
         ordering = ['order', 'created_at']
+        indexes = [
+            models.Index(fields=['blog_post', 'order', 'created_at'], name='blogpostimage_post_order_idx'),
+        ]
         verbose_name = 'Blog Post Image'
         verbose_name_plural = 'Blog Post Images'
     
@@ -400,6 +534,12 @@ class News(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='news_published_idx',
+                         condition=models.Q(published=True)),
+            models.Index(fields=['category', '-created_at', '-id'], name='news_category_idx',
+                         condition=models.Q(published=True)),
+        ]
         verbose_name = 'News Item'
         verbose_name_plural = 'News Items'
     
@@ -407,6 +547,92 @@ class News(models.Model):
         return self.title
 
 
+# ==================== VIEW ANALYTICS ====================
+
+class ViewStat(models.Model):
+    """
+    Views of one blog post or tool over one day, or over one month once the
+    days have aged out of the daily retention window
+    """
+    KIND_CHOICES = [
+        ('blog-post', 'Blog post'),
+        ('tool', 'Tool'),
+    ]
+    PERIOD_CHOICES = [
+        ('day', 'Day'),
+        ('month', 'Month'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveIntegerField()
+    period = models.CharField(max_length=5, choices=PERIOD_CHOICES, default='day')
+    start = models.DateField(help_text="First day of the period")
+    views = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        # The unique index is also the range scan of /stats/ and the upsert target
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id', 'period', 'start'], name='unique_view_stat_period'),
+        ]
+        verbose_name = 'View Stat'
+        verbose_name_plural = 'View Stats'
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} {self.period} {self.start}: {self.views}"
+
+
+class VisitorSketch(models.Model):
+    """
+    HyperLogLog registers of the visitors of one blog post or tool over one
+    day, one month (aged-out days) or all time; sketches merge by taking the
+    register-wise maximum, so any range can be estimated
+    """
+    PERIOD_CHOICES = [
+        ('day', 'Day'),
+        ('month', 'Month'),
+        ('all', 'All time'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=ViewStat.KIND_CHOICES)
+    object_id = models.PositiveIntegerField()
+    period = models.CharField(max_length=5, choices=PERIOD_CHOICES, default='day')
+    start = models.DateField(help_text="First day of the period (1970-01-01 for all time)")
+    registers = models.BinaryField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id', 'period', 'start'], name='unique_visitor_sketch_period'),
+        ]
+        verbose_name = 'Visitor Sketch'
+        verbose_name_plural = 'Visitor Sketches'
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} {self.period} {self.start}"
+
+
+class EventCount(models.Model):
+    """Client events (tool website clicks, demo plays) counted per object and day"""
+    EVENT_CHOICES = [
+        ('tool_click', 'Tool website click'),
+        ('demo_play', 'Demo play'),
+    ]
+
+    event = models.CharField(max_length=20, choices=EVENT_CHOICES)
+    object_id = models.PositiveIntegerField(help_text="Tool id for clicks, demo id for plays")
+    day = models.DateField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['event', 'object_id', 'day'], name='unique_event_count_day'),
+        ]
+        verbose_name = 'Event Count'
+        verbose_name_plural = 'Event Counts'
+
+    def __str__(self):
+        return f"{self.event} {self.object_id} {self.day}: {self.count}"
+
+
 # ==================== AUTHOR MODELS ====================
 
 class Author(models.Model):
@@ -415,6 +641,10 @@ class Author(models.Model):
     bio = models.TextField(blank=True)
     bio_ge = models.TextField(blank=True, verbose_name="Bio (Georgian)")
     profile_image = models.ImageField(upload_to='authors/', blank=True, null=True)
+    media_metadata = models.JSONField(
+        default=dict, blank=True, editable=False,
+        help_text="Probed size, MIME type, dimensions and duration of each uploaded file, by field name"
+    )
     location = models.CharField(max_length=200, blank=True)
     
     linkedin_url = models.URLField(blank=True, null=True)
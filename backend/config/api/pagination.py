@@ -0,0 +1,174 @@
+import base64
+import binascii
+import hashlib
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over the full ordering of the queryset.
+
+    The cursor stores the ordering values of the boundary row, so every page is
+    a `WHERE (a, b, id) > (...) LIMIT n` seek no matter how deep it is, and no
+    COUNT(*) is issued. The primary key is appended as a tie-breaker so rows
+    sharing a timestamp are never skipped or repeated.
+
+    ?count=true adds an approximate total, cached per filter state.
+    ?page=N falls back to page-number mode (exact count) for the admin frontend.
+    """
+    page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE', 20)
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    count_cache_timeout = getattr(settings, 'APPROXIMATE_COUNT_TIMEOUT', 300)
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_number_paginator = None
+        if PageNumberPagination.page_query_param in request.query_params:
+            self.page_number_paginator = PageNumberPagination()
+            self.page_number_paginator.page_size = self.get_page_size(request)
+            return self.page_number_paginator.paginate_queryset(queryset, request, view)
+
+        self.page_size = self.get_page_size(request)
+        self.model = queryset.model
+        self.ordering = self.get_ordering(queryset)
+        self.count = self.get_approximate_count(queryset) if self.wants_count(request) else None
+        cursor = self.decode_cursor(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        reverse = False
+        if cursor is not None:
+            reverse = cursor['r']
+            queryset = queryset.filter(self.get_seek_filter(cursor['v'], reverse))
+            if reverse:
+                queryset = queryset.reverse()
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        if self.page_number_paginator is not None:
+            return self.page_number_paginator.get_paginated_response(data)
+        payload = OrderedDict()
+        if self.count is not None:
+            payload['count'] = self.count
+        payload['next'] = self.get_next_link()
+        payload['previous'] = self.get_previous_link()
+        payload['results'] = data
+        return Response(payload)
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def wants_count(self, request):
+        return request.query_params.get(self.count_query_param, '').lower() in ('1', 'true', 'yes')
+
+    # ==================== ORDERING ====================
+
+    def get_ordering(self, queryset):
+        """Ordering applied by the filters, with the primary key as a final tie-breaker"""
+        ordering = [name for name in queryset.query.order_by if isinstance(name, str)]
+        if not ordering and queryset.query.default_ordering:
+            ordering = list(queryset.model._meta.ordering)
+        names = {name.lstrip('-') for name in ordering}
+        if not names & {'id', 'pk'}:
+            descending = bool(ordering) and ordering[0].startswith('-')
+            ordering.append('-id' if descending else 'id')
+        return ordering
+
+    def get_seek_filter(self, values, reverse):
+        """(a, b, id) > (x, y, z) spelled out for each ordering direction"""
+        seek = Q()
+        equal = Q()
+        for name, value in zip(self.ordering, values):
+            descending = name.startswith('-')
+            field = name.lstrip('-')
+            lookup = 'lt' if descending != reverse else 'gt'
+            seek |= equal & Q(**{f'{field}__{lookup}': value})
+            equal &= Q(**{field: value})
+        return seek
+
+    # ==================== CURSORS ====================
+
+    def get_position(self, obj):
+        values = []
+        for name in self.ordering:
+            value = getattr(obj, name.lstrip('-'))
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        return values
+
+    def encode_cursor(self, obj, reverse):
+        data = json.dumps({'v': self.get_position(obj), 'r': reverse}, separators=(',', ':'))
+        encoded = base64.urlsafe_b64encode(data.encode()).decode()
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            values, reverse = cursor['v'], bool(cursor['r'])
+            if len(values) != len(self.ordering):
+                raise ValueError
+            values = [
+                self.to_python(name.lstrip('-'), value)
+                for name, value in zip(self.ordering, values)
+            ]
+        except (TypeError, ValueError, KeyError, binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return {'v': values, 'r': reverse}
+
+    def to_python(self, name, value):
+        try:
+            field = self.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # Annotations such as a search rank are stored as plain JSON values
+            return value
+        return field.to_python(value)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    # ==================== APPROXIMATE COUNT ====================
+
+    def get_approximate_count(self, queryset):
+        """Exact COUNT(*) at most once per filter state and timeout"""
+        sql, params = queryset.order_by().query.sql_with_params()
+        digest = hashlib.md5(f'{sql}|{params}'.encode()).hexdigest()
+        key = f'api:approx-count:{queryset.model._meta.label_lower}:{digest}'
+        return cache.get_or_set(key, queryset.order_by().count, self.count_cache_timeout)
@@ -0,0 +1,344 @@
+import mimetypes
+import struct
+
+from PIL import Image, UnidentifiedImageError
+
+from .models import Tool, ToolDemo, BlogPost, BlogPostImage, Author
+
+
+# ==================== MEDIA METADATA ====================
+
+# Upload fields whose probed metadata each model keeps in media_metadata
+MEDIA_FIELDS = {
+    Tool: ['featured_image'],
+    ToolDemo: [
+        'input_image_file', 'input_audio_file', 'input_video_file',
+        'output_image_file', 'output_audio_file', 'output_video_file',
+    ],
+    BlogPost: ['featured_image'],
+    BlogPostImage: ['image'],
+    Author: ['profile_image'],
+}
+
+
+def refresh_media_metadata(instance):
+    """
+    Bring instance.media_metadata in line with its files, probing only the
+    ones whose stored name changed; returns whether anything changed.
+    New uploads are committed to storage first, exactly as FileField.pre_save
+    would, so the recorded name is the final one.
+    """
+    metadata = dict(instance.media_metadata or {})
+    for name in MEDIA_FIELDS[type(instance)]:
+        file = getattr(instance, name)
+        if not file:
+            metadata.pop(name, None)
+            continue
+        if not file._committed:
+            file.save(file.name, file.file, save=False)
+        if metadata.get(name, {}).get('name') == file.name:
+            continue
+        try:
+            metadata[name] = {'name': file.name, **probe_file(file)}
+        except OSError:
+            # Not in storage (yet); probed on a later save or by probe_media
+            metadata.pop(name, None)
+    changed = metadata != (instance.media_metadata or {})
+    instance.media_metadata = metadata
+    return changed
+
+
+# ==================== PROBING ====================
+
+def probe_file(file):
+    """
+    Metadata of a stored or uploaded file, read from its headers only: byte
+    size and MIME type always, width/height for images and video, duration
+    in seconds for audio and video. Unknown formats get size and a MIME type
+    guessed from the name.
+    """
+    was_closed = file.closed
+    file.open('rb')
+    try:
+        file.seek(0)
+        head = file.read(64)
+        info = {'size': file.size}
+        for matches, probe in PROBES:
+            if matches(head):
+                file.seek(0)
+                try:
+                    info.update(probe(file))
+                except (struct.error, ValueError, OSError, EOFError, IndexError):
+                    pass
+                break
+        else:
+            file.seek(0)
+            info.update(probe_image(file))
+    finally:
+        if was_closed:
+            file.close()
+        else:
+            file.seek(0)
+    if 'mime' not in info:
+        info['mime'] = mimetypes.guess_type(file.name)[0] or 'application/octet-stream'
+    return info
+
+
+def probe_image(file):
+    """Pillow parses only the header until pixels are requested"""
+    try:
+        with Image.open(file) as image:
+            width, height = image.size
+            # EXIF orientations 5-8 are rotated by 90 degrees when displayed
+            if image.getexif().get(0x0112) in (5, 6, 7, 8):
+                width, height = height, width
+            info = {'width': width, 'height': height}
+            if image.format in Image.MIME:
+                info['mime'] = Image.MIME[image.format]
+            return info
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        return {}
+
+
+# ==================== AUDIO ====================
+
+def probe_wav(file):
+    """RIFF chunks: byte rate from 'fmt ', duration from the size of 'data'"""
+    file.seek(12)
+    byte_rate = None
+    while True:
+        header = file.read(8)
+        if len(header) < 8:
+            return {'mime': 'audio/wav'}
+        chunk_id, chunk_size = struct.unpack('<4sI', header)
+        if chunk_id == b'fmt ':
+            byte_rate = struct.unpack('<8xI', file.read(12))[0]
+            file.seek(chunk_size - 12 + chunk_size % 2, 1)
+        elif chunk_id == b'data':
+            info = {'mime': 'audio/wav'}
+            if byte_rate:
+                info['duration'] = round(chunk_size / byte_rate, 3)
+            return info
+        else:
+            file.seek(chunk_size + chunk_size % 2, 1)
+
+
+MP3_BITRATES = {
+    # (MPEG-1, layer III) and (MPEG-2/2.5, layer III) in kbit/s
+    1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+MP3_SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+
+def probe_mp3(file):
+    """First frame header, then the Xing/Info or VBRI frame count, else a constant bitrate estimate"""
+    head = file.read(10)
+    start = 0
+    if head[:3] == b'ID3':
+        size = head[6] << 21 | head[7] << 14 | head[8] << 7 | head[9]
+        start = 10 + size
+    file.seek(start)
+    data = file.read(4096)
+    offset = next(
+        (index for index in range(len(data) - 4) if data[index] == 0xFF and data[index + 1] & 0xE0 == 0xE0),
+        None,
+    )
+    info = {'mime': 'audio/mpeg'}
+    if offset is None:
+        return info
+    header = struct.unpack('>I', data[offset:offset + 4])[0]
+    version = header >> 19 & 3
+    bitrate_index = header >> 12 & 15
+    rate_index = header >> 10 & 3
+    mono = header >> 6 & 3 == 3
+    if version == 1 or rate_index == 3 or header >> 17 & 3 != 1:
+        # Reserved version, reserved rate, or not layer III
+        return info
+    sample_rate = MP3_SAMPLE_RATES[version][rate_index]
+    samples_per_frame = 1152 if version == 3 else 576
+
+    side_info = (17 if mono else 32) if version == 3 else (9 if mono else 17)
+    frame = data[offset:offset + 200]
+    tag = frame[4 + side_info:8 + side_info]
+    if tag in (b'Xing', b'Info'):
+        flags = struct.unpack('>I', frame[8 + side_info:12 + side_info])[0]
+        if flags & 1:
+            frames = struct.unpack('>I', frame[12 + side_info:16 + side_info])[0]
+            info['duration'] = round(frames * samples_per_frame / sample_rate, 3)
+            return info
+    if frame[36:40] == b'VBRI':
+        frames = struct.unpack('>I', frame[50:54])[0]
+        info['duration'] = round(frames * samples_per_frame / sample_rate, 3)
+        return info
+    bitrate = MP3_BITRATES[1 if version == 3 else 2][bitrate_index] * 1000
+    if bitrate:
+        info['duration'] = round((file.size - start - offset) * 8 / bitrate, 3)
+    return info
+
+
+def probe_flac(file):
+    """STREAMINFO, the mandatory first metadata block, holds rate and total samples"""
+    file.seek(8)
+    data = file.read(18)
+    sample_rate = int.from_bytes(data[10:13], 'big') >> 4
+    total_samples = int.from_bytes(data[13:18], 'big') & 0xFFFFFFFFF
+    info = {'mime': 'audio/flac'}
+    if sample_rate and total_samples:
+        info['duration'] = round(total_samples / sample_rate, 3)
+    return info
+
+
+def probe_ogg(file):
+    """Rate from the first packet (Vorbis or Opus), length from the last page's granule position"""
+    first_page = file.read(128)
+    segments = first_page[26]
+    packet = first_page[27 + segments:]
+    if packet[:7] == b'\x01vorbis':
+        mime, sample_rate, pre_skip = 'audio/ogg', struct.unpack('<I', packet[12:16])[0], 0
+    elif packet[:8] == b'OpusHead':
+        mime, sample_rate, pre_skip = 'audio/ogg', 48000, struct.unpack('<H', packet[10:12])[0]
+    else:
+        return {'mime': 'video/ogg' if packet[1:7] == b'theora' else 'audio/ogg'}
+    file.seek(max(file.size - 65536, 0))
+    tail = file.read()
+    last = tail.rfind(b'OggS')
+    info = {'mime': mime}
+    if last >= 0 and sample_rate:
+        granule = struct.unpack('<q', tail[last + 6:last + 14])[0]
+        if granule > pre_skip:
+            info['duration'] = round((granule - pre_skip) / sample_rate, 3)
+    return info
+
+
+# ==================== VIDEO ====================
+
+MP4_CONTAINERS = {b'moov', b'trak', b'mdia'}
+MP4_MAX_BOX = 16 * 1024 * 1024
+
+
+def iter_boxes(data, offset=0, end=None):
+    """(type, payload start, payload end) of the ISO-BMFF boxes in data[offset:end]"""
+    end = len(data) if end is None else end
+    while offset + 8 <= end:
+        size, kind = struct.unpack('>I4s', data[offset:offset + 8])
+        header = 8
+        if size == 1:
+            size, header = struct.unpack('>Q', data[offset + 8:offset + 16])[0], 16
+        elif size == 0:
+            size = end - offset
+        if size < header:
+            return
+        yield kind, offset + header, min(offset + size, end)
+        offset += size
+
+
+def probe_mp4(file):
+    """Seek over top-level boxes to 'moov'; mvhd gives duration, the first visual tkhd the size"""
+    brand = file.read(12)[8:12]
+    info = {'mime': 'video/quicktime' if brand == b'qt  ' else 'audio/mp4' if brand in (b'M4A ', b'M4B ') else 'video/mp4'}
+    offset = 0
+    file.seek(0)
+    while offset < file.size:
+        header = file.read(16)
+        if len(header) < 8:
+            return info
+        size, kind = struct.unpack('>I4s', header[:8])
+        if size == 1:
+            size = struct.unpack('>Q', header[8:16])[0]
+        elif size == 0:
+            size = file.size - offset
+        if size < 8:
+            return info
+        if kind == b'moov' and size <= MP4_MAX_BOX:
+            file.seek(offset)
+            info.update(parse_moov(file.read(size)))
+            return info
+        offset += size
+        file.seek(offset)
+    return info
+
+
+def parse_moov(moov):
+    info = {}
+    stack = [(8, len(moov))]
+    while stack:
+        start, end = stack.pop()
+        for kind, payload, box_end in iter_boxes(moov, start, end):
+            if kind in MP4_CONTAINERS:
+                stack.append((payload, box_end))
+            elif kind == b'mvhd':
+                version = moov[payload]
+                if version == 1:
+                    timescale, duration = struct.unpack('>IQ', moov[payload + 20:payload + 32])
+                else:
+                    timescale, duration = struct.unpack('>II', moov[payload + 12:payload + 20])
+                if timescale:
+                    info['duration'] = round(duration / timescale, 3)
+            elif kind == b'tkhd' and 'width' not in info:
+                # Width and height are the box's last two 16.16 fixed point values
+                width, height = struct.unpack('>II', moov[box_end - 8:box_end])
+                if width and height:
+                    info['width'], info['height'] = width >> 16, height >> 16
+    return info
+
+
+# Header, Segment, Info, Tracks, TrackEntry and Video hold the elements read below
+EBML_CONTAINERS = {0x1A45DFA3, 0x18538067, 0x1549A966, 0x1654AE6B, 0xAE, 0xE0}
+EBML_TIMECODE_SCALE, EBML_DURATION, EBML_DOC_TYPE = 0x2AD7B1, 0x4489, 0x4282
+EBML_PIXEL_WIDTH, EBML_PIXEL_HEIGHT = 0xB0, 0xBA
+EBML_READ_LIMIT = 1024 * 1024
+
+
+def read_vint(data, offset, keep_marker):
+    """EBML variable length integer: (value, next offset); ids keep the length marker, sizes drop it"""
+    first = data[offset]
+    length = 9 - first.bit_length()
+    value = int.from_bytes(data[offset:offset + length], 'big')
+    if not keep_marker:
+        value &= (1 << (7 * length)) - 1
+        if value == (1 << (7 * length)) - 1:
+            value = None
+    return value, offset + length
+
+
+def probe_webm(file):
+    """Walk the EBML tree in the first megabyte: Segment/Info for duration, Tracks for pixel size"""
+    data = file.read(EBML_READ_LIMIT)
+    info = {'mime': 'video/webm'}
+    values = {}
+
+    def walk(offset, end):
+        while offset < end:
+            element, offset = read_vint(data, offset, keep_marker=True)
+            size, offset = read_vint(data, offset, keep_marker=False)
+            # Live streams leave the segment size unknown
+            stop = end if size is None else min(offset + size, end)
+            payload = data[offset:stop]
+            if element in EBML_CONTAINERS:
+                walk(offset, stop)
+            elif element == EBML_DURATION:
+                values.setdefault('duration', struct.unpack('>f' if len(payload) == 4 else '>d', payload)[0])
+            elif element in (EBML_TIMECODE_SCALE, EBML_PIXEL_WIDTH, EBML_PIXEL_HEIGHT):
+                values.setdefault(element, int.from_bytes(payload, 'big'))
+            elif element == EBML_DOC_TYPE and payload == b'matroska':
+                info['mime'] = 'video/x-matroska'
+            offset = stop
+
+    walk(0, len(data))
+    if 'duration' in values:
+        info['duration'] = round(values['duration'] * values.get(EBML_TIMECODE_SCALE, 1000000) / 1e9, 3)
+    if EBML_PIXEL_WIDTH in values and EBML_PIXEL_HEIGHT in values:
+        info['width'], info['height'] = values[EBML_PIXEL_WIDTH], values[EBML_PIXEL_HEIGHT]
+    return info
+
+
+# Magic numbers checked against the first 64 bytes, in order
+PROBES = [
+    (lambda head: head[:4] == b'RIFF' and head[8:12] == b'WAVE', probe_wav),
+    (lambda head: head[:3] == b'ID3' or head[:2] in (b'\xff\xfb', b'\xff\xf3', b'\xff\xf2', b'\xff\xfa'), probe_mp3),
+    (lambda head: head[:4] == b'fLaC', probe_flac),
+    (lambda head: head[:4] == b'OggS', probe_ogg),
+    (lambda head: head[4:8] == b'ftyp' and head[8:12] not in (b'avif', b'avis', b'heic', b'mif1'), probe_mp4),
+    (lambda head: head[:4] == b'\x1a\x45\xdf\xa3', probe_webm),
+]
@@ -0,0 +1,90 @@
+import math
+import re
+
+import nh3
+from django.conf import settings
+from django.utils.text import slugify
+from markdown_it import MarkdownIt
+
+
+# ==================== MARKDOWN ====================
+
+# CommonMark as react-markdown renders it without plugins: raw HTML is shown
+# as text, and nesting deeper than maxNesting is left as text rather than
+# parsed, which bounds the work done on hostile input.
+markdown = MarkdownIt('commonmark', {'html': False, 'maxNesting': 20})
+
+# The rendered HTML goes through an allow-list sanitizer as well, so nothing
+# the parser lets through can carry scripts or event handlers
+ALLOWED_TAGS = {
+    'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'strong', 'em', 'code', 'pre',
+    'a', 'img', 'ul', 'ol', 'li', 'blockquote', 'hr', 'br',
+}
+ALLOWED_ATTRIBUTES = {
+    'a': {'href', 'title'},
+    'img': {'src', 'alt', 'title'},
+    'code': {'class'},
+    'ol': {'start'},
+    **{f'h{level}': {'id'} for level in range(1, 7)},
+}
+SAFE_SCHEMES = {'http', 'https', 'mailto', 'tel'}
+
+
+def get_inline_text(token):
+    """Plain text of an inline token: text and code, without image alt text"""
+    parts = []
+    for child in token.children or []:
+        if child.type in ('text', 'code_inline'):
+            parts.append(child.content)
+        elif child.type in ('softbreak', 'hardbreak'):
+            parts.append(' ')
+    return ''.join(parts)
+
+
+def render_markdown(source):
+    """
+    (sanitized HTML, table of contents, plain text) of a markdown document.
+    Headings get unique slug ids, listed in order with their level and title.
+    """
+    tokens = markdown.parse(source or '')
+    toc, text, slugs = [], [], set()
+    for index, token in enumerate(tokens):
+        if token.type in ('fence', 'code_block'):
+            text.append(token.content)
+        if token.type != 'inline':
+            continue
+        words = get_inline_text(token)
+        text.append(words)
+        opening = tokens[index - 1]
+        if opening.type != 'heading_open':
+            continue
+        title = ' '.join(words.split())
+        slug = base = slugify(title, allow_unicode=True) or 'section'
+        number = 1
+        while slug in slugs:
+            slug = f'{base}-{number}'
+            number += 1
+        slugs.add(slug)
+        opening.attrSet('id', slug)
+        toc.append({'level': int(opening.tag[1:]), 'id': slug, 'title': title})
+    content = nh3.clean(
+        markdown.renderer.render(tokens, markdown.options, {}),
+        tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES, url_schemes=SAFE_SCHEMES,
+    )
+    return content.strip(), toc, '\n'.join(text)
+
+
+# ==================== READING TIME ====================
+
+WORD_RE = re.compile(r"\w+(?:['’]\w+)*")
+
+
+def count_words(text):
+    return len(WORD_RE.findall(text))
+
+
+def get_read_time(words):
+    """Minutes to read a number of words at BLOG_WORDS_PER_MINUTE, None for no text"""
+    if not words:
+        return None
+    return max(1, math.ceil(words / getattr(settings, 'BLOG_WORDS_PER_MINUTE', 200)))
@@ -0,0 +1,111 @@
+import re
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import OrderingFilter, SearchFilter
+
+
+# ==================== FTS5 INDEX ====================
+
+SEARCH_TABLE = 'api_tool_fts'
+
+# Column order of the index and the BM25 weight of each column
+SEARCH_COLUMNS = [
+    ('name', 10.0),
+    ('description', 4.0),
+    ('overview', 2.0),
+    ('name_ge', 10.0),
+    ('description_ge', 4.0),
+    ('overview_ge', 2.0),
+    ('features', 3.0),
+]
+
+INDEX_TOOLS = f"""
+    INSERT INTO {SEARCH_TABLE} (rowid, {', '.join(name for name, _ in SEARCH_COLUMNS)})
+    SELECT id, name, description, overview, name_ge, description_ge, overview_ge, (
+        SELECT group_concat(feature || ' ' || feature_ge, ' ')
+        FROM api_keyfeature WHERE api_keyfeature.tool_id = api_tool.id
+    )
+    FROM api_tool
+"""
+
+RANK_EXPRESSION = f"bm25({SEARCH_TABLE}, {', '.join(str(weight) for _, weight in SEARCH_COLUMNS)})"
+
+# The table is created by migration 0022 on SQLite only
+_available = {}
+
+
+def search_index_available():
+    """True when the FTS5 table exists on the default (SQLite) database"""
+    if connection.vendor != 'sqlite':
+        return False
+    name = connection.settings_dict['NAME']
+    if not _available.get(name):
+        _available[name] = SEARCH_TABLE in connection.introspection.table_names()
+    return _available[name]
+
+
+def index_tool(tool_id):
+    """Replace the index row of one tool (removes it if the tool is gone)"""
+    if not search_index_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [tool_id])
+        cursor.execute(f"{INDEX_TOOLS} WHERE id = %s", [tool_id])
+
+
+def rebuild_search_index():
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        cursor.execute(INDEX_TOOLS)
+
+
+def build_match_query(term):
+    """Turn free text into an FTS5 query: every word must match, as a prefix"""
+    words = re.findall(r'\w+', term)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+# ==================== FILTER BACKENDS ====================
+
+class ToolSearchFilter(SearchFilter):
+    """?search= backed by the FTS5 index, annotating each row with its BM25 rank"""
+
+    def filter_queryset(self, request, queryset, view):
+        if not search_index_available():
+            return super().filter_queryset(request, queryset, view)
+        match = self.get_match_query(request)
+        if not match:
+            return queryset
+        return self.filter_matches(queryset, match).annotate(search_rank=RawSQL(RANK_EXPRESSION, ()))
+
+    def filter_matches(self, queryset, match):
+        """Join the index and keep matching tools, without ranking them"""
+        table = queryset.model._meta.db_table
+        return queryset.extra(
+            tables=[SEARCH_TABLE],
+            where=[f'{SEARCH_TABLE}.rowid = {table}.id', f'{SEARCH_TABLE} MATCH %s'],
+            params=[match],
+        )
+
+    def filter_unranked(self, request, queryset, view):
+        """Search filtering for aggregate queries, where bm25() is not allowed"""
+        if not search_index_available():
+            return super().filter_queryset(request, queryset, view)
+        match = self.get_match_query(request)
+        return self.filter_matches(queryset, match) if match else queryset
+
+    def get_match_query(self, request):
+        return build_match_query(' '.join(self.get_search_terms(request)))
+
+
+class RankedOrderingFilter(OrderingFilter):
+    """Order search results by relevance unless an explicit ?ordering= is given"""
+
+    def get_default_ordering(self, view):
+        request = getattr(view, 'request', None)
+        if request is not None and search_index_available() and build_match_query(
+            request.query_params.get(ToolSearchFilter.search_param, '')
+        ):
+            return ['search_rank', 'id']
+        return super().get_default_ordering(view)
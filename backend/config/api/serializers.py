@@ -1,4 +1,10 @@
+from django.db import models, transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Coalesce, NullIf
+from django.utils import timezone
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+from .media import MediaURLResolver
 from .models import (
     Tool, ToolDemo, KeyFeature, Pro, Con, UsageStep,
     BlogPost, BlogPostImage, News, Author
@@ -14,9 +20,204 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ('id',)
 
 
+# ==================== SPARSE FIELDSETS ====================
+
+def parse_query_list(request, name):
+    """Read a comma separated query parameter into a set (None when absent)"""
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    return {item.strip() for item in value.split(',') if item.strip()}
+
+
+# ==================== MEDIA URLS ====================
+
+def get_media_resolver(context):
+    """One resolver shared by the whole serializer tree"""
+    resolver = context.get('media_urls')
+    if resolver is None:
+        resolver = context['media_urls'] = MediaURLResolver(context.get('request'))
+    return resolver
+
+
+def get_media_url(context, file):
+    """Absolute URL of a stored file"""
+    return get_media_resolver(context).resolve(file)
+
+
+def get_media_srcset(context, file):
+    """srcset of resized variants of a stored image"""
+    return get_media_resolver(context).srcset(file)
+
+
+class MediaMetadataField(serializers.Field):
+    """
+    Probed metadata of one uploaded file (size, mime, and width/height or
+    duration where they apply), so clients can lay out media before fetching it.
+    None without a file, or when an external URL field takes precedence.
+    """
+
+    def __init__(self, file_field, url_field=None, **kwargs):
+        self.file_field = file_field
+        self.url_field = url_field
+        super().__init__(source='*', read_only=True, **kwargs)
+
+    def to_representation(self, obj):
+        if self.url_field and getattr(obj, self.url_field):
+            return None
+        info = obj.media_metadata.get(self.file_field)
+        if not info or info['name'] != getattr(obj, self.file_field).name:
+            return None
+        return {key: value for key, value in info.items() if key != 'name'}
+
+
+# ==================== LANGUAGE SCOPING ====================
+
+# Request language codes mapped to the column suffix convention ('ka' is ISO for Georgian)
+LANGUAGE_ALIASES = {'en': 'en', 'ge': 'ge', 'ka': 'ge'}
+CONTENT_LANGUAGES = {'en': 'en', 'ge': 'ka'}
+
+
+def get_request_language(request):
+    """
+    Language to scope a read to, from ?lang= only. Accept-Language is not
+    used: every browser sends it, and the frontend reads the _ge fields of
+    the bilingual payload. Returns None for bilingual output (writes, no
+    ?lang, ?lang=all, unknown languages).
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    lang = request.query_params.get('lang')
+    if lang is None:
+        return None
+    return LANGUAGE_ALIASES.get(lang.strip().lower())
+
+
+class LocalizedField(serializers.Field):
+    """
+    Read-only value of a bilingual field, Georgian falling back to English
+    when blank. With fallback_on, the Georgian value is used only when that
+    other field's Georgian text is present (values derived from it).
+    """
+
+    def __init__(self, field_name, language, fallback_on=None, **kwargs):
+        self.field_name_en = field_name
+        self.language = language
+        self.fallback_on = fallback_on
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, obj):
+        if self.language == 'en':
+            return getattr(obj, self.field_name_en)
+        annotated = f'{self.field_name_en}_localized'
+        if annotated in obj.__dict__:
+            return obj.__dict__[annotated]
+        if self.fallback_on is not None:
+            if getattr(obj, f'{self.fallback_on}_ge'):
+                return getattr(obj, f'{self.field_name_en}_ge')
+            return getattr(obj, self.field_name_en)
+        value = getattr(obj, f'{self.field_name_en}_ge')
+        return value if value not in (None, '') else getattr(obj, self.field_name_en)
+
+
+class DynamicFieldsMixin:
+    """
+    Honour ?fields= (whitelist) and ?expand= (nested relations) on reads.
+    Relations listed in Meta.expandable_fields are dropped unless expanded;
+    Meta.field_sources maps method fields to the model columns they read.
+    With a request language, bilingual fields collapse to one unified key;
+    Meta.translation_fallbacks maps fields derived from another bilingual
+    field to it, so they fall back to English together with it.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Only the root serializer gets a request; nested ones keep every field
+        request = self._context.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return
+        requested = self.get_requested_fields(request)
+        if requested is None:
+            return
+        for name in set(self.fields) - requested:
+            self.fields.pop(name)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        # Runs lazily, so nested serializers see the root request here too
+        language = get_request_language(self.context.get('request'))
+        if language is None:
+            return fields
+        fallbacks = getattr(self.Meta, 'translation_fallbacks', {})
+        for name in self.get_translated_fields():
+            fields.pop(f'{name}_ge', None)
+            if name in fields:
+                fields[name] = LocalizedField(name, language, fallbacks.get(name))
+        return fields
+
+    @classmethod
+    def get_translated_fields(cls):
+        """Serializer fields backed by an English column and a parallel _ge column"""
+        model_fields = {field.name for field in cls.Meta.model._meta.concrete_fields}
+        return [name for name in cls.Meta.fields if name in model_fields and f'{name}_ge' in model_fields]
+
+    @classmethod
+    def localize_queryset(cls, queryset, language, field_names=None):
+        """Load only one language's columns for the translated fields"""
+        names = [name for name in cls.get_translated_fields() if field_names is None or name in field_names]
+        if not names:
+            return queryset
+        if language == 'en':
+            return queryset.defer(*[f'{name}_ge' for name in names])
+        return queryset.defer(*names, *[f'{name}_ge' for name in names]).annotate(**{
+            f'{name}_localized': cls.get_localized_expression(name) for name in names
+        })
+
+    @classmethod
+    def get_localized_expression(cls, name):
+        """SQL for the Georgian value of a translated field, or the English one in its place"""
+        fallback_on = getattr(cls.Meta, 'translation_fallbacks', {}).get(name)
+        if fallback_on is not None:
+            return Case(
+                When(**{f'{fallback_on}_ge': ''}, then=F(name)),
+                default=F(f'{name}_ge'),
+                output_field=cls.Meta.model._meta.get_field(name),
+            )
+        field = cls.Meta.model._meta.get_field(name)
+        if isinstance(field, (models.CharField, models.TextField)):
+            # Blank text means untranslated; other types are NULL when unset
+            return Coalesce(NullIf(F(f'{name}_ge'), Value('', output_field=field)), F(name))
+        return Coalesce(F(f'{name}_ge'), F(name))
+
+    @classmethod
+    def get_requested_fields(cls, request):
+        """Field names to render for this request, or None for the full payload"""
+        fields = parse_query_list(request, 'fields')
+        expand = parse_query_list(request, 'expand')
+        if fields is None and expand is None:
+            return None
+        declared = set(cls.Meta.fields)
+        expandable = set(getattr(cls.Meta, 'expandable_fields', ()))
+        if fields is None:
+            return declared - (expandable - expand)
+        return (fields | (expand or set())) & declared
+
+    @classmethod
+    def get_source_columns(cls, field_names):
+        """Model columns needed to render the given fields"""
+        model_fields = {field.name for field in cls.Meta.model._meta.concrete_fields}
+        sources = getattr(cls.Meta, 'field_sources', {})
+        columns = {'id'}
+        for name in field_names:
+            columns.update(column for column in sources.get(name, (name,)) if column in model_fields)
+        return columns
+
+
 # ==================== TOOL DEMO SERIALIZERS ====================
 
-class ToolDemoSerializer(serializers.ModelSerializer):
+class ToolDemoSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     # Media fields - return URL (prefer URL over file)
     input_image = serializers.SerializerMethodField()
     input_audio = serializers.SerializerMethodField()
@@ -24,6 +225,14 @@ class ToolDemoSerializer(serializers.ModelSerializer):
     output_image = serializers.SerializerMethodField()
     output_audio = serializers.SerializerMethodField()
     output_video = serializers.SerializerMethodField()
+    input_image_srcset = serializers.SerializerMethodField()
+    output_image_srcset = serializers.SerializerMethodField()
+    input_image_meta = MediaMetadataField('input_image_file', 'input_image_url')
+    input_audio_meta = MediaMetadataField('input_audio_file', 'input_audio_url')
+    input_video_meta = MediaMetadataField('input_video_file', 'input_video_url')
+    output_image_meta = MediaMetadataField('output_image_file', 'output_image_url')
+    output_audio_meta = MediaMetadataField('output_audio_file', 'output_audio_url')
+    output_video_meta = MediaMetadataField('output_video_file', 'output_video_url')
 
     class Meta:
         model = ToolDemo
@@ -31,33 +240,40 @@ class ToolDemoSerializer(serializers.ModelSerializer):
             'id', 'tool', 'demo_type', 'title', 'title_ge', 
             'description', 'description_ge', 'order',
             'input_prompt', 'input_prompt_ge',
-            'input_image', 'input_audio', 'input_video',
+            'input_image', 'input_image_srcset', 'input_image_meta',
+            'input_audio', 'input_audio_meta', 'input_video', 'input_video_meta',
             'output_text', 'output_text_ge',
-            'output_image', 'output_audio', 'output_video',
+            'output_image', 'output_image_srcset', 'output_image_meta',
+            'output_audio', 'output_audio_meta', 'output_video', 'output_video_meta',
             'created_at', 'updated_at'
         )
         read_only_fields = ('id', 'created_at', 'updated_at')
+        field_sources = {
+            'input_image': ('input_image_url', 'input_image_file'),
+            'input_audio': ('input_audio_url', 'input_audio_file'),
+            'input_video': ('input_video_url', 'input_video_file'),
+            'output_image': ('output_image_url', 'output_image_file'),
+            'output_audio': ('output_audio_url', 'output_audio_file'),
+            'output_video': ('output_video_url', 'output_video_file'),
+            'input_image_srcset': ('input_image_url', 'input_image_file'),
+            'output_image_srcset': ('output_image_url', 'output_image_file'),
+            'input_image_meta': ('input_image_url', 'input_image_file', 'media_metadata'),
+            'input_audio_meta': ('input_audio_url', 'input_audio_file', 'media_metadata'),
+            'input_video_meta': ('input_video_url', 'input_video_file', 'media_metadata'),
+            'output_image_meta': ('output_image_url', 'output_image_file', 'media_metadata'),
+            'output_audio_meta': ('output_audio_url', 'output_audio_file', 'media_metadata'),
+            'output_video_meta': ('output_video_url', 'output_video_file', 'media_metadata'),
+        }
 
     def _get_media_url(self, obj, url_field, file_field):
         """Helper to get media URL (prefers URL over file)"""
-        request = self.context.get('request')
-        
-        # URL takes precedence
-        url_value = getattr(obj, url_field, None)
-        if url_value:
-            return url_value
-        
-        # Fall back to file
-        file_value = getattr(obj, file_field, None)
-        if file_value:
-            try:
-                if hasattr(file_value, 'url'):
-                    return request.build_absolute_uri(file_value.url) if request else file_value.url
-                return str(file_value)
-            except Exception:
-                return None
-        
-        return None
+        return getattr(obj, url_field) or get_media_url(self.context, getattr(obj, file_field))
+
+    def _get_media_srcset(self, obj, url_field, file_field):
+        """Resized variants exist only for uploaded files, not for external URLs"""
+        if getattr(obj, url_field):
+            return None
+        return get_media_srcset(self.context, getattr(obj, file_field))
 
     def get_input_image(self, obj):
         return self._get_media_url(obj, 'input_image_url', 'input_image_file')
@@ -77,47 +293,97 @@ class ToolDemoSerializer(serializers.ModelSerializer):
     def get_output_video(self, obj):
         return self._get_media_url(obj, 'output_video_url', 'output_video_file')
 
+    def get_input_image_srcset(self, obj):
+        return self._get_media_srcset(obj, 'input_image_url', 'input_image_file')
+
+    def get_output_image_srcset(self, obj):
+        return self._get_media_srcset(obj, 'output_image_url', 'output_image_file')
+
 
 # ==================== TOOL RELATED SERIALIZERS ====================
 
-class KeyFeatureSerializer(serializers.ModelSerializer):
+class KeyFeatureSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = KeyFeature
         fields = ('id', 'tool', 'feature', 'feature_ge')
         read_only_fields = ('id',)
 
 
-class ProSerializer(serializers.ModelSerializer):
+class ProSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Pro
         fields = ('id', 'tool', 'text', 'text_ge')
         read_only_fields = ('id',)
 
 
-class ConSerializer(serializers.ModelSerializer):
+class ConSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Con
         fields = ('id', 'tool', 'text', 'text_ge')
         read_only_fields = ('id',)
 
 
-class UsageStepSerializer(serializers.ModelSerializer):
+class UsageStepSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = UsageStep
         fields = ('id', 'tool', 'step', 'step_ge')
         read_only_fields = ('id',)
 
 
-class ToolSerializer(serializers.ModelSerializer):
-    # Nested related fields
-    key_features = KeyFeatureSerializer(many=True, read_only=True)
-    pros = ProSerializer(many=True, read_only=True)
-    cons = ConSerializer(many=True, read_only=True)
-    usage_steps = UsageStepSerializer(many=True, read_only=True)
-    demos = ToolDemoSerializer(many=True, read_only=True)
+# ==================== NESTED TOOL CHILD SERIALIZERS ====================
+
+# Children written inline through ToolSerializer: the parent is implied and
+# an id selects the existing row to update (rows without one are created)
+
+class NestedKeyFeatureSerializer(KeyFeatureSerializer):
+    id = serializers.IntegerField(required=False)
+
+    class Meta(KeyFeatureSerializer.Meta):
+        read_only_fields = ('tool',)
+
+
+class NestedProSerializer(ProSerializer):
+    id = serializers.IntegerField(required=False)
+
+    class Meta(ProSerializer.Meta):
+        read_only_fields = ('tool',)
+
+
+class NestedConSerializer(ConSerializer):
+    id = serializers.IntegerField(required=False)
+
+    class Meta(ConSerializer.Meta):
+        read_only_fields = ('tool',)
+
+
+class NestedUsageStepSerializer(UsageStepSerializer):
+    id = serializers.IntegerField(required=False)
+
+    class Meta(UsageStepSerializer.Meta):
+        read_only_fields = ('tool',)
+
+
+class NestedToolDemoSerializer(ToolDemoSerializer):
+    id = serializers.IntegerField(required=False)
+
+    class Meta(ToolDemoSerializer.Meta):
+        read_only_fields = ('tool', 'created_at', 'updated_at')
+
+
+# ==================== TOOL SERIALIZERS ====================
+
+class ToolSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    # Nested related fields, writable as whole lists
+    key_features = NestedKeyFeatureSerializer(many=True, required=False)
+    pros = NestedProSerializer(many=True, required=False)
+    cons = NestedConSerializer(many=True, required=False)
+    usage_steps = NestedUsageStepSerializer(many=True, required=False)
+    demos = NestedToolDemoSerializer(many=True, required=False)
 
     # Media fields
     featured_image = serializers.SerializerMethodField()
+    featured_image_srcset = serializers.SerializerMethodField()
+    featured_image_meta = MediaMetadataField('featured_image')
 
     class Meta:
         model = Tool
@@ -127,53 +393,143 @@ class ToolSerializer(serializers.ModelSerializer):
             'category',
             'pricing', 'difficulty', 'rating', 
             'overview', 'overview_ge',
-            'logo_url', 'featured_image', 'website_url',
+            'logo_url', 'featured_image', 'featured_image_srcset', 'featured_image_meta', 'website_url',
             'key_features', 'pros', 'cons', 'usage_steps',
             'demos',
             'created_at', 'updated_at'
         )
         read_only_fields = ('id', 'created_at', 'updated_at')
+        expandable_fields = ('key_features', 'pros', 'cons', 'usage_steps', 'demos')
+        field_sources = {
+            'featured_image_srcset': ('featured_image',),
+            'featured_image_meta': ('featured_image', 'media_metadata'),
+        }
 
     def get_featured_image(self, obj):
         """Convert featured image to absolute URL"""
-        request = self.context.get('request')
-        if obj.featured_image:
-            try:
-                if hasattr(obj.featured_image, 'url'):
-                    return request.build_absolute_uri(obj.featured_image.url) if request else obj.featured_image.url
-                return obj.featured_image
-            except Exception:
-                return None
-        return None
+        return get_media_url(self.context, obj.featured_image)
+
+    def get_featured_image_srcset(self, obj):
+        return get_media_srcset(self.context, obj.featured_image)
+
+    def create(self, validated_data):
+        children = self.pop_children(validated_data)
+        with transaction.atomic():
+            tool = super().create(validated_data)
+            self.save_children(tool, children)
+        return tool
+
+    def update(self, instance, validated_data):
+        children = self.pop_children(validated_data)
+        with transaction.atomic():
+            tool = super().update(instance, validated_data)
+            self.save_children(tool, children)
+        return tool
+
+    def pop_children(self, validated_data):
+        """Nested lists present in the payload; omitted lists are left untouched"""
+        return {
+            name: validated_data.pop(name)
+            for name in self.Meta.expandable_fields
+            if name in validated_data
+        }
+
+    def save_children(self, tool, children):
+        """
+        Make each submitted list the tool's full set of rows for that relation.
+        Rows are diffed against the stored ones and written with one
+        bulk_create, one bulk_update and one delete per relation; the parent
+        save already rebuilds documents and invalidates caches on commit.
+        """
+        for name, items in children.items():
+            model = self.fields[name].child.Meta.model
+            existing = {obj.pk: obj for obj in model.objects.filter(tool=tool)}
+            created, updated, changed_fields = [], [], set()
+            for item in items:
+                pk = item.pop('id', None)
+                if pk is None:
+                    created.append(model(tool=tool, **item))
+                    continue
+                obj = existing.pop(pk, None)
+                if obj is None:
+                    raise serializers.ValidationError({name: [f'{model._meta.verbose_name} {pk} does not belong to this tool.']})
+                changed = [field for field, value in item.items() if getattr(obj, field) != value]
+                if changed:
+                    for field in changed:
+                        setattr(obj, field, item[field])
+                    updated.append(obj)
+                    changed_fields.update(changed)
+            if existing:
+                model.objects.filter(pk__in=list(existing)).delete()
+            if updated:
+                if any(field.name == 'updated_at' for field in model._meta.concrete_fields):
+                    now = timezone.now()
+                    for obj in updated:
+                        obj.updated_at = now
+                    changed_fields.add('updated_at')
+                model.objects.bulk_update(updated, sorted(changed_fields))
+            if created:
+                model.objects.bulk_create(created)
+
+
+class ToolListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    """Slim catalog representation; counts come from queryset annotations"""
+    featured_image = serializers.SerializerMethodField()
+    featured_image_srcset = serializers.SerializerMethodField()
+    featured_image_meta = MediaMetadataField('featured_image')
+    demo_count = serializers.IntegerField(read_only=True)
+    feature_count = serializers.IntegerField(read_only=True)
+    pro_count = serializers.IntegerField(read_only=True)
+    con_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Tool
+        fields = (
+            'id', 'name', 'name_ge',
+            'description',
+            'category',
+            'pricing', 'difficulty', 'rating',
+            'logo_url', 'featured_image', 'featured_image_srcset', 'featured_image_meta', 'website_url',
+            'demo_count', 'feature_count', 'pro_count', 'con_count',
+            'created_at', 'updated_at'
+        )
+        read_only_fields = fields
+        field_sources = ToolSerializer.Meta.field_sources
+
+    get_featured_image = ToolSerializer.get_featured_image
+    get_featured_image_srcset = ToolSerializer.get_featured_image_srcset
 
 
 # ==================== BLOG POST IMAGE SERIALIZER ====================
 
-class BlogPostImageSerializer(serializers.ModelSerializer):
+class BlogPostImageSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
+    image_srcset = serializers.SerializerMethodField()
+    image_meta = MediaMetadataField('image')
 
     class Meta:
         model = BlogPostImage
-        fields = ('id', 'blog_post', 'image', 'caption', 'caption_ge', 'alt_text', 'order', 'created_at')
+        fields = (
+            'id', 'blog_post', 'image', 'image_srcset', 'image_meta',
+            'caption', 'caption_ge', 'alt_text', 'order', 'created_at'
+        )
         read_only_fields = ('id', 'created_at')
+        field_sources = {'image_srcset': ('image',), 'image_meta': ('image', 'media_metadata')}
 
     def get_image(self, obj):
         """Convert image to absolute URL"""
-        request = self.context.get('request')
-        if obj.image:
-            try:
-                if hasattr(obj.image, 'url'):
-                    return request.build_absolute_uri(obj.image.url) if request else obj.image.url
-                return obj.image
-            except Exception:
-                return None
-        return None
+        return get_media_url(self.context, obj.image)
+
+    def get_image_srcset(self, obj):
+        return get_media_srcset(self.context, obj.image)
 
 
 # ==================== BLOG POST SERIALIZERS ====================
 
-class BlogPostSerializer(serializers.ModelSerializer):
+class BlogPostSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     featured_image = serializers.SerializerMethodField()
+    featured_image_srcset = serializers.SerializerMethodField()
+    featured_image_meta = MediaMetadataField('featured_image')
     images = BlogPostImageSerializer(many=True, read_only=True)
 
     class Meta:
@@ -182,31 +538,36 @@ class BlogPostSerializer(serializers.ModelSerializer):
             'id', 'title', 'title_ge',
             'excerpt', 'excerpt_ge',
             'content', 'content_ge',
+            'content_html', 'content_html_ge', 'toc', 'toc_ge',
             'author', 'author_avatar',
             'author_bio', 'author_bio_ge',
-            'category', 'tags', 'featured_image',
+            'category', 'tags', 'featured_image', 'featured_image_srcset', 'featured_image_meta',
             'images',
-            'views', 'read_time',
+            'views', 'read_time', 'read_time_ge', 'word_count', 'word_count_ge',
             'created_at', 'updated_at', 'published'
         )
         read_only_fields = ('created_at', 'updated_at', 'views')
+        expandable_fields = ('images',)
+        field_sources = {
+            'featured_image_srcset': ('featured_image',),
+            'featured_image_meta': ('featured_image', 'media_metadata'),
+        }
+        # Rendered from content_ge, so they only replace the English values when it is written
+        translation_fallbacks = {
+            'content_html': 'content', 'toc': 'content', 'word_count': 'content', 'read_time': 'content',
+        }
 
     def get_featured_image(self, obj):
         """Convert featured image to absolute URL"""
-        request = self.context.get('request')
-        if obj.featured_image:
-            try:
-                if hasattr(obj.featured_image, 'url'):
-                    return request.build_absolute_uri(obj.featured_image.url) if request else obj.featured_image.url
-                return obj.featured_image
-            except Exception:
-                return None
-        return None
+        return get_media_url(self.context, obj.featured_image)
+
+    def get_featured_image_srcset(self, obj):
+        return get_media_srcset(self.context, obj.featured_image)
 
 
 # ==================== NEWS SERIALIZERS ====================
 
-class NewsSerializer(serializers.ModelSerializer):
+class NewsSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = News
         fields = (
@@ -220,32 +581,33 @@ class NewsSerializer(serializers.ModelSerializer):
 
 # ==================== AUTHOR SERIALIZERS ====================
 
-class AuthorSerializer(serializers.ModelSerializer):
+class AuthorSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     profile_image = serializers.SerializerMethodField()
+    profile_image_srcset = serializers.SerializerMethodField()
+    profile_image_meta = MediaMetadataField('profile_image')
 
     class Meta:
         model = Author
         fields = (
             'id', 'name', 'slug',
             'bio', 'bio_ge',
-            'profile_image', 'location',
+            'profile_image', 'profile_image_srcset', 'profile_image_meta', 'location',
             'linkedin_url', 'twitter_url', 'instagram_url', 
             'github_url', 'personal_website',
             'is_verified', 'created_at'
         )
         read_only_fields = ('created_at',)
+        field_sources = {
+            'profile_image_srcset': ('profile_image',),
+            'profile_image_meta': ('profile_image', 'media_metadata'),
+        }
 
     def get_profile_image(self, obj):
         """Convert profile image to absolute URL"""
-        request = self.context.get('request')
-        if obj.profile_image:
-            try:
-                if hasattr(obj.profile_image, 'url'):
-                    return request.build_absolute_uri(obj.profile_image.url) if request else obj.profile_image.url
-                return obj.profile_image
-            except Exception:
-                return None
-        return None
+        return get_media_url(self.context, obj.profile_image)
+
+    def get_profile_image_srcset(self, obj):
+        return get_media_srcset(self.context, obj.profile_image)
 
 
 # ==================== JWT SERIALIZERS ====================
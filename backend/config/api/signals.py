@@ -0,0 +1,134 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import bump_generation
+from .documents import rebuild_tool_documents
+from .leaderboards import refresh_blog_post_leaderboards, refresh_tool_leaderboards
+from .models import (
+    Tool, ToolDemo, KeyFeature, Pro, Con, UsageStep,
+    BlogPost, BlogPostImage, News, Author
+)
+from .probe import MEDIA_FIELDS, refresh_media_metadata
+from .search import index_tool
+from .waveforms import AUDIO_FIELDS, schedule_demo_waveforms
+
+
+def on_commit_once(key, func, *args):
+    """
+    Run func(*args) after the current transaction commits, at most once per key.
+    Pending callbacks live on the connection, so a rollback discards them too.
+    """
+    connection = transaction.get_connection()
+    for _, pending, *_ in connection.run_on_commit:
+        if getattr(pending, 'dedupe_key', None) == key:
+            return
+
+    def callback():
+        # Executed callbacks stop deduplicating, even if still listed
+        callback.dedupe_key = None
+        func(*args)
+
+    callback.dedupe_key = key
+    transaction.on_commit(callback)
+
+
+# ==================== GENERATIONS ====================
+
+# Every model whose rows appear in a group's responses, with the attribute
+# naming the root object whose own generation it belongs to
+GENERATION_GROUPS = {
+    Tool: ('tools', 'pk'),
+    ToolDemo: ('tools', 'tool_id'),
+    KeyFeature: ('tools', 'tool_id'),
+    Pro: ('tools', 'tool_id'),
+    Con: ('tools', 'tool_id'),
+    UsageStep: ('tools', 'tool_id'),
+    BlogPost: ('blog-posts', 'pk'),
+    BlogPostImage: ('blog-posts', 'blog_post_id'),
+    News: ('news', 'pk'),
+    Author: ('authors', 'pk'),
+}
+
+
+@receiver([post_save, post_delete])
+def response_data_changed(sender, instance, **kwargs):
+    if sender not in GENERATION_GROUPS:
+        return
+    group, attribute = GENERATION_GROUPS[sender]
+    for name in [group, f'{group}:{getattr(instance, attribute)}']:
+        on_commit_once(('generation', name), bump_generation, name)
+
+
+# ==================== PARENT TIMESTAMPS ====================
+
+# Child rows are part of their parent's payload, so a change to one is a
+# change to the parent and must move its updated_at (and with it its ETag)
+
+@receiver([post_save, post_delete], sender=BlogPostImage)
+def blog_post_image_changed(sender, instance, **kwargs):
+    BlogPost.objects.filter(pk=instance.blog_post_id).update(updated_at=timezone.now())
+
+
+# ==================== TOOL DOCUMENTS ====================
+
+def schedule_document_rebuild(tool_id):
+    """Rebuild a tool's documents once, after the surrounding transaction commits"""
+    on_commit_once(('tool-document', tool_id), rebuild_tool_documents, tool_id)
+
+
+@receiver([post_save, post_delete], sender=Tool)
+def tool_changed(sender, instance, **kwargs):
+    schedule_document_rebuild(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=ToolDemo)
+@receiver([post_save, post_delete], sender=KeyFeature)
+@receiver([post_save, post_delete], sender=Pro)
+@receiver([post_save, post_delete], sender=Con)
+@receiver([post_save, post_delete], sender=UsageStep)
+def tool_child_changed(sender, instance, **kwargs):
+    Tool.objects.filter(pk=instance.tool_id).update(updated_at=timezone.now())
+    schedule_document_rebuild(instance.tool_id)
+
+
+# ==================== SEARCH INDEX ====================
+
+@receiver([post_save, post_delete], sender=Tool)
+@receiver([post_save, post_delete], sender=KeyFeature)
+def tool_search_text_changed(sender, instance, **kwargs):
+    tool_id = instance.pk if sender is Tool else instance.tool_id
+    on_commit_once(('tool-search', tool_id), index_tool, tool_id)
+
+
+# ==================== LEADERBOARDS ====================
+
+@receiver([post_save, post_delete], sender=Tool)
+def tool_score_changed(sender, instance, **kwargs):
+    on_commit_once(('tool-leaderboards', instance.pk), refresh_tool_leaderboards, instance.pk)
+
+
+@receiver([post_save, post_delete], sender=BlogPost)
+def blog_post_score_changed(sender, instance, **kwargs):
+    on_commit_once(('blog-post-leaderboards', instance.pk), refresh_blog_post_leaderboards, instance.pk)
+
+
+# ==================== MEDIA METADATA ====================
+
+@receiver(pre_save)
+def media_files_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    if sender not in MEDIA_FIELDS or raw:
+        return
+    # A partial save that leaves media_metadata out could not store the result
+    if update_fields is not None and 'media_metadata' not in update_fields:
+        return
+    refresh_media_metadata(instance)
+
+
+# ==================== DEMO WAVEFORMS ====================
+
+@receiver(post_save, sender=ToolDemo)
+def demo_audio_saved(sender, instance, **kwargs):
+    if any(getattr(instance, name) for name in AUDIO_FIELDS):
+        on_commit_once(('demo-waveforms', instance.pk), schedule_demo_waveforms, instance.pk)
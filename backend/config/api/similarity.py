@@ -0,0 +1,332 @@
+import logging
+import math
+import re
+import threading
+from collections import Counter
+
+import numpy as np
+from django.conf import settings
+from django.db import connection
+
+from .cache import get_generation
+from .models import Tool, ToolDemo, KeyFeature, Pro, Con
+
+
+logger = logging.getLogger(__name__)
+
+
+# ==================== TOOL TERMS ====================
+
+# Text columns of a tool and of its inline children, in both languages
+TOOL_TEXT_FIELDS = ['name', 'name_ge', 'description', 'description_ge', 'overview', 'overview_ge']
+CHILD_TEXT_FIELDS = [
+    (KeyFeature, ['feature', 'feature_ge']),
+    (Pro, ['text', 'text_ge']),
+    (Con, ['text', 'text_ge']),
+]
+
+# Categorical values become single terms (e.g. 'pricing:free'), weighted above words
+FACET_FIELDS = ['category', 'pricing']
+FACET_WEIGHT = 2.0
+
+WORD_PATTERN = re.compile(r'\w{2,}')
+
+
+def load_tool_terms(tool_ids=None):
+    """
+    Term counts of each tool, keyed by id: words from its own and its
+    children's text, plus its category, pricing and demo types as facet terms.
+    Costs one query per table whatever the number of tools.
+    """
+    tools = Tool.objects.order_by()
+    if tool_ids is not None:
+        tools = tools.filter(pk__in=tool_ids)
+    terms = {}
+    for row in tools.values('id', *TOOL_TEXT_FIELDS, *FACET_FIELDS):
+        counts = Counter(tokenize(' '.join(row[name] for name in TOOL_TEXT_FIELDS)))
+        for name in FACET_FIELDS:
+            counts[f'{name}:{row[name].lower()}'] += 1
+        terms[row['id']] = counts
+
+    for model, fields in CHILD_TEXT_FIELDS:
+        rows = model.objects.filter(tool_id__in=list(terms)).values_list('tool_id', *fields)
+        for tool_id, *texts in rows:
+            terms[tool_id].update(tokenize(' '.join(texts)))
+    demo_types = ToolDemo.objects.filter(tool_id__in=list(terms)).values_list('tool_id', 'demo_type').distinct()
+    for tool_id, demo_type in demo_types:
+        terms[tool_id][f'type:{demo_type}'] += 1
+    return terms
+
+
+def tokenize(text):
+    return WORD_PATTERN.findall(text.lower())
+
+
+# ==================== SPARSE VECTORS ====================
+
+def concat_ranges(starts, lengths):
+    """Indices of the ranges [start, start + length), concatenated"""
+    offsets = np.cumsum(lengths) - lengths
+    return np.repeat(starts - offsets, lengths) + np.arange(int(lengths.sum()))
+
+
+class SparseVectors:
+    """
+    Rows of (column, weight) pairs in CSR arrays: memory proportional to the
+    non-zero weights rather than rows x vocabulary. Rows are densified a tile
+    at a time when scores are computed.
+    """
+
+    def __init__(self, rows, width):
+        self.rows = rows
+        self.count = len(rows)
+        self.width = width
+        lengths = np.array([len(columns) for columns, _ in rows], dtype=np.int64)
+        self.indptr = np.concatenate([[0], np.cumsum(lengths)])
+        self.indices = np.concatenate([columns for columns, _ in rows] or [np.zeros(0, dtype=np.int32)])
+        self.data = np.concatenate([weights for _, weights in rows] or [np.zeros(0, dtype=np.float32)])
+
+    def densify(self, rows):
+        """Dense float32 matrix of the given rows"""
+        lengths = self.indptr[rows + 1] - self.indptr[rows]
+        entries = concat_ranges(self.indptr[rows], lengths)
+        dense = np.zeros((len(rows), self.width), dtype=np.float32)
+        dense[np.repeat(np.arange(len(rows)), lengths), self.indices[entries]] = self.data[entries]
+        return dense
+
+
+# ==================== SIMILARITY INDEX ====================
+
+class IndexNotReady(Exception):
+    """The process has no build of the index yet; one is being made in the background"""
+
+
+class IndexState:
+    """One build of the index; lookups keep reading it while the next one is prepared"""
+
+    def __init__(self, vocabulary, idf, ids, vectors, active, neighbour_ids, neighbour_scores):
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.ids = ids
+        self.rows = {tool_id: row for row, tool_id in enumerate(ids.tolist())}
+        self.vectors = vectors
+        self.active = active
+        self.neighbour_ids = neighbour_ids
+        self.neighbour_scores = neighbour_scores
+        self.versions = {}
+        self.generation = None
+
+
+class SimilarityIndex:
+    """
+    Top-k most similar tools per tool, from cosine similarity of TF-IDF vectors.
+
+    Sparse vectors and the neighbour table (k ids and scores per tool) are
+    held in process memory, so a lookup is a slice of k entries. When the
+    'tools' generation moves, a background thread compares (id, updated_at)
+    pairs with the ones the index was built from and re-vectorises only
+    changed, new and deleted tools, recomputing the neighbour lists those
+    tools enter, leave or move within. The vocabulary and IDF weights are
+    frozen between full rebuilds, which happen when too much of the catalog
+    has changed. Lookups are served from the previous build until the new one
+    is swapped in. The first build starts with the process (warm()), and
+    lookups before it is done raise IndexNotReady rather than wait for it.
+    With SIMILAR_TOOLS_BACKGROUND = False syncs run inline.
+    """
+    k = getattr(settings, 'SIMILAR_TOOLS_K', 10)
+    max_terms = getattr(settings, 'SIMILAR_TOOLS_MAX_TERMS', 4096)
+    rebuild_ratio = 0.1
+    # Rows per dense tile; a block of queries against one tile holds about
+    # 3 * tile_rows * max_terms floats (100 MB at the defaults) whatever the catalog size
+    tile_rows = 2048
+
+    def __init__(self):
+        self.state = None
+        self.sync_lock = threading.Lock()
+        self.worker_lock = threading.Lock()
+        self.worker = None
+
+    # ==================== LOOKUP ====================
+
+    def similar(self, tool_id, limit=None):
+        """[(tool_id, score)] of the most similar tools, best first; None for an unknown tool"""
+        state = self.get_state()
+        row = state.rows.get(tool_id)
+        if row is None or not state.active[row]:
+            return None
+        limit = self.k if limit is None else min(limit, self.k)
+        return [
+            (int(neighbour), float(score))
+            for neighbour, score in zip(state.neighbour_ids[row], state.neighbour_scores[row])
+            if score > 0
+        ][:limit]
+
+    def get_state(self):
+        state = self.state
+        if state is not None and state.generation == get_generation('tools'):
+            return state
+        if not getattr(settings, 'SIMILAR_TOOLS_BACKGROUND', True):
+            self.sync()
+            return self.state
+        self.start_sync()
+        if state is None:
+            raise IndexNotReady()
+        return state
+
+    def warm(self):
+        """Start building at process startup, so lookups rarely find the index missing"""
+        if getattr(settings, 'SIMILAR_TOOLS_BACKGROUND', True):
+            self.start_sync()
+
+    def start_sync(self):
+        with self.worker_lock:
+            if self.worker is None or not self.worker.is_alive():
+                self.worker = threading.Thread(target=self.run_sync, name='similarity-index', daemon=True)
+                self.worker.start()
+
+    def run_sync(self):
+        try:
+            self.sync()
+        except Exception:
+            logger.exception('Syncing the similarity index failed')
+        finally:
+            # Worker threads own their connection
+            connection.close()
+
+    def sync(self):
+        with self.sync_lock:
+            # Read before the versions, so a change in between leaves the index due for another sync
+            generation = get_generation('tools')
+            state = self.state
+            if state is not None and state.generation == generation:
+                return
+            versions = dict(Tool.objects.order_by().values_list('id', 'updated_at'))
+            if state is None:
+                state = self.build()
+            else:
+                changed = [tool_id for tool_id, version in versions.items() if state.versions.get(tool_id) != version]
+                removed = [tool_id for tool_id in state.versions if tool_id not in versions]
+                if len(changed) + len(removed) > self.rebuild_ratio * max(len(versions), 1):
+                    state = self.build()
+                elif changed or removed:
+                    state = self.update(state, changed, removed)
+            state.versions = versions
+            state.generation = generation
+            self.state = state
+
+    # ==================== BUILDING ====================
+
+    def build(self):
+        """Fit the vocabulary and IDF on the whole catalog and compute every neighbour list"""
+        terms = load_tool_terms()
+        document_frequency = Counter(term for counts in terms.values() for term in counts)
+        # A term in one tool only cannot make two tools similar
+        candidates = [term for term, frequency in document_frequency.items() if frequency > 1]
+        candidates.sort(key=lambda term: -document_frequency[term])
+        vocabulary = {term: column for column, term in enumerate(candidates[:self.max_terms])}
+        idf = np.ones(len(vocabulary), dtype=np.float32)
+        for term, column in vocabulary.items():
+            # Unsmoothed, so a term every tool has (e.g. 'and') weighs nothing
+            idf[column] = math.log((1 + len(terms)) / (1 + document_frequency[term]))
+
+        ids = np.array(list(terms), dtype=np.int64)
+        rows = [self.vectorize(vocabulary, idf, counts) for counts in terms.values()]
+        state = IndexState(
+            vocabulary, idf, ids, SparseVectors(rows, len(vocabulary)), np.ones(len(ids), dtype=bool),
+            np.full((len(ids), self.k), -1, dtype=np.int64), np.zeros((len(ids), self.k), dtype=np.float32),
+        )
+        self.compute_neighbours(state, np.arange(len(ids)))
+        return state
+
+    def update(self, previous, changed, removed):
+        """A copy of the previous state with changed tools re-vectorised and only the affected neighbour lists redone"""
+        terms = load_tool_terms(changed)
+        new = [tool_id for tool_id in terms if tool_id not in previous.rows]
+        empty = (np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32))
+        ids = np.concatenate([previous.ids, np.array(new, dtype=np.int64)])
+        active = np.concatenate([previous.active, np.ones(len(new), dtype=bool)])
+        row_vectors = previous.vectors.rows + [empty] * len(new)
+        state = IndexState(
+            previous.vocabulary, previous.idf, ids, None, active,
+            np.vstack([previous.neighbour_ids, np.full((len(new), self.k), -1, dtype=np.int64)]),
+            np.vstack([previous.neighbour_scores, np.zeros((len(new), self.k), dtype=np.float32)]),
+        )
+        for tool_id in removed:
+            row = state.rows[tool_id]
+            active[row] = False
+            row_vectors[row] = empty
+        rows = np.array([state.rows[tool_id] for tool_id in terms], dtype=np.int64)
+        for tool_id, row in zip(terms, rows):
+            row_vectors[row] = self.vectorize(state.vocabulary, state.idf, terms[tool_id])
+        state.vectors = SparseVectors(row_vectors, len(state.vocabulary))
+
+        # Rows that listed a touched tool, or that a changed tool now outranks
+        touched = np.array(list(terms) + removed, dtype=np.int64)
+        affected = np.isin(state.neighbour_ids, touched).any(axis=1)
+        for _, tiles in self.iter_blocks(state, rows):
+            for tile, scores in tiles:
+                affected[tile] |= (scores.T > state.neighbour_scores[tile, -1:]).any(axis=1)
+        affected[rows] = True
+        self.compute_neighbours(state, np.flatnonzero(affected & active))
+        return state
+
+    def vectorize(self, vocabulary, idf, counts):
+        """(columns, weights) of an L2-normalised TF-IDF row with sublinear term frequency"""
+        columns, weights = [], []
+        for term, count in counts.items():
+            column = vocabulary.get(term)
+            # Terms in every tool have no weight and are left out of the sparse row
+            if column is not None and idf[column]:
+                weight = FACET_WEIGHT if ':' in term else 1.0
+                columns.append(column)
+                weights.append(weight * (1 + math.log(count)) * idf[column])
+        weights = np.array(weights, dtype=np.float32)
+        norm = np.linalg.norm(weights)
+        return np.array(columns, dtype=np.int32), weights / norm if norm else weights
+
+    def iter_blocks(self, state, rows):
+        """
+        (block, tiles) for blocks of the given rows, tiles yielding (tile rows,
+        cosine scores of the block against them) over every row. Only one
+        block and one tile are dense at a time.
+        """
+        vectors = state.vectors
+        for start in range(0, len(rows), self.tile_rows):
+            block = rows[start:start + self.tile_rows]
+            yield block, self.iter_tiles(vectors, vectors.densify(block))
+
+    def iter_tiles(self, vectors, queries):
+        for start in range(0, vectors.count, self.tile_rows):
+            tile = np.arange(start, min(start + self.tile_rows, vectors.count))
+            yield tile, queries @ vectors.densify(tile).T
+
+    def compute_neighbours(self, state, rows):
+        """Top-k by cosine for the given rows, merged tile by tile"""
+        k = min(self.k, max(int(state.active.sum()) - 1, 0))
+        for block, tiles in self.iter_blocks(state, rows):
+            state.neighbour_ids[block] = -1
+            state.neighbour_scores[block] = 0
+            if not k:
+                continue
+            best_scores = np.full((len(block), k), -np.inf, dtype=np.float32)
+            best_rows = np.full((len(block), k), -1, dtype=np.int64)
+            for tile, scores in tiles:
+                scores[:, ~state.active[tile]] = -np.inf
+                # A tool is not its own neighbour
+                own = block - tile[0]
+                inside = (own >= 0) & (own < len(tile))
+                scores[np.flatnonzero(inside), own[inside]] = -np.inf
+                candidates = np.concatenate([best_scores, scores], axis=1)
+                candidate_rows = np.concatenate([best_rows, np.broadcast_to(tile, scores.shape)], axis=1)
+                top = np.argpartition(-candidates, k - 1, axis=1)[:, :k]
+                best_scores = np.take_along_axis(candidates, top, axis=1)
+                best_rows = np.take_along_axis(candidate_rows, top, axis=1)
+            order = np.argsort(-best_scores, axis=1)
+            best_scores = np.take_along_axis(best_scores, order, axis=1)
+            best_rows = np.take_along_axis(best_rows, order, axis=1)
+            found = best_scores > -np.inf
+            state.neighbour_ids[block, :k] = np.where(found, state.ids[best_rows], -1)
+            state.neighbour_scores[block, :k] = np.where(found, best_scores, 0)
+
+
+similarity_index = SimilarityIndex()
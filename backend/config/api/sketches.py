@@ -0,0 +1,200 @@
+import hashlib
+import math
+from datetime import date, timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .counters import WriteBehindBuffer
+from .models import VisitorSketch
+
+
+ALL_TIME = date(1970, 1, 1)
+
+
+# ==================== HYPERLOGLOG ====================
+
+class HyperLogLog:
+    """
+    Distinct count estimator over 64-bit hashes: 2**precision one-byte
+    registers (4 KB, about 1.6% standard error) holding the longest run of
+    leading zeros seen per bucket. Merging is a register-wise maximum, so
+    merged sketches estimate the union of what each one saw.
+    """
+    precision = 12
+    size = 1 << precision
+
+    def __init__(self, registers=None):
+        if registers is None:
+            self.registers = np.zeros(self.size, dtype=np.uint8)
+        else:
+            self.registers = np.frombuffer(bytes(registers), dtype=np.uint8).copy()
+
+    def add_hashes(self, hashes):
+        width = 64 - self.precision
+        mask = (1 << width) - 1
+        buckets = [value >> width for value in hashes]
+        ranks = [width - (value & mask).bit_length() + 1 for value in hashes]
+        np.maximum.at(self.registers, buckets, np.array(ranks, dtype=np.uint8))
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        size = self.size
+        estimate = 0.7213 / (1 + 1.079 / size) * size * size / np.sum(np.ldexp(1.0, -self.registers.astype(np.int32)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * size and zeros:
+            # Linear counting is more accurate while many registers are empty
+            estimate = size * math.log(size / zeros)
+        return int(round(estimate))
+
+    def tobytes(self):
+        return self.registers.tobytes()
+
+
+def hash_visitor(visitor):
+    return int.from_bytes(hashlib.blake2b(str(visitor).encode(), digest_size=8).digest(), 'big')
+
+
+def get_visitor_id(request):
+    """The signed-in user, else the client address and user agent"""
+    if request.user and request.user.is_authenticated:
+        return f'user:{request.user.pk}'
+    # Behind a proxy REMOTE_ADDR is the proxy; a forged header only skews estimates
+    address = request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')[0].strip() or request.META.get('REMOTE_ADDR', '')
+    return f"{address}|{request.META.get('HTTP_USER_AGENT', '')}"
+
+
+# ==================== RECORDING ====================
+
+class SketchBuffer(WriteBehindBuffer):
+    """Write-behind visitor hashes, kept as a set per (kind, id, day) until merged into stored sketches"""
+
+    def combine(self, key, value):
+        self.pending.setdefault(key, set()).update(value)
+
+    def add(self, key, visitor):
+        super().add(key, {hash_visitor(visitor)})
+
+
+def write_visitor_sketches(batch):
+    """
+    Fold the hashes of each (kind, id, day) into that day's sketch and the
+    object's all-time sketch: one claim, one read and one upsert per kind.
+
+    Registers are merged in Python, so two processes flushing the same object
+    must not interleave. Missing rows are inserted empty first: that write
+    takes SQLite's database write lock until commit, and gives the rows that
+    select_for_update() then locks on databases with row locks.
+    """
+    kinds = {kind for kind, _, _ in batch}
+    with transaction.atomic():
+        for kind in kinds:
+            keys = {(object_id, day): hashes for (key_kind, object_id, day), hashes in batch.items() if key_kind == kind}
+            targets = {(object_id, 'day', day) for object_id, day in keys} | {
+                (object_id, 'all', ALL_TIME) for object_id, _ in keys
+            }
+            empty = HyperLogLog().tobytes()
+            VisitorSketch.objects.bulk_create(
+                [
+                    VisitorSketch(kind=kind, object_id=object_id, period=period, start=start, registers=empty)
+                    for object_id, period, start in targets
+                ],
+                ignore_conflicts=True,
+            )
+            stored = VisitorSketch.objects.select_for_update().filter(
+                kind=kind, object_id__in={object_id for object_id, _ in keys},
+                period__in=['day', 'all'], start__in={day for _, day in keys} | {ALL_TIME},
+            )
+            sketches = {
+                (sketch.object_id, sketch.period, sketch.start): HyperLogLog(sketch.registers)
+                for sketch in stored
+            }
+            touched = {}
+            for (object_id, day), hashes in keys.items():
+                for target in [(object_id, 'day', day), (object_id, 'all', ALL_TIME)]:
+                    sketch = touched.get(target) or sketches.get(target) or HyperLogLog()
+                    sketch.add_hashes(hashes)
+                    touched[target] = sketch
+            VisitorSketch.objects.bulk_create(
+                [
+                    VisitorSketch(kind=kind, object_id=object_id, period=period, start=start, registers=sketch.tobytes())
+                    for (object_id, period, start), sketch in touched.items()
+                ],
+                update_conflicts=True,
+                unique_fields=['kind', 'object_id', 'period', 'start'],
+                update_fields=['registers'],
+            )
+
+
+visitor_sketches = SketchBuffer('visitor-sketches', write_visitor_sketches)
+
+
+def record_visitor(kind, object_id, visitor):
+    visitor_sketches.add((kind, object_id, timezone.localdate()), visitor)
+
+
+# ==================== ESTIMATES ====================
+
+def estimate_visitors(kind, object_id, start=None, end=None):
+    """
+    Approximate distinct visitors of an object, all time or between two
+    dates. Days past the daily retention only exist as month sketches, which
+    count whole when they overlap the range.
+    """
+    sketches = VisitorSketch.objects.filter(kind=kind, object_id=object_id)
+    if start is None:
+        sketches = sketches.filter(period='all')
+    else:
+        sketches = sketches.filter(period__in=['day', 'month'], start__gte=start.replace(day=1), start__lte=end)
+    merged = HyperLogLog()
+    for period, day, registers in sketches.values_list('period', 'start', 'registers'):
+        if period == 'day' and day < start:
+            continue
+        merged.merge(HyperLogLog(registers))
+    return merged.count()
+
+
+# ==================== RETENTION ====================
+
+def downsample_visitor_sketches(today=None):
+    """
+    Merge day sketches older than VIEW_STATS_DAILY_DAYS into month sketches
+    and drop month sketches older than VIEW_STATS_MONTHLY_MONTHS, like the
+    view counts. Returns (days folded, months dropped). Meant for one process
+    at a time (the downsample_view_stats command); flushes never write months.
+    """
+    today = today or timezone.localdate()
+    day_cutoff = today - timedelta(days=getattr(settings, 'VIEW_STATS_DAILY_DAYS', 180))
+    month_index = today.year * 12 + today.month - 1 - getattr(settings, 'VIEW_STATS_MONTHLY_MONTHS', 60)
+    month_cutoff = date(month_index // 12, month_index % 12 + 1, 1)
+
+    with transaction.atomic():
+        old_days = VisitorSketch.objects.filter(period='day', start__lt=day_cutoff)
+        months = {}
+        for kind, object_id, day, registers in old_days.values_list('kind', 'object_id', 'start', 'registers').iterator():
+            months.setdefault((kind, object_id, day.replace(day=1)), HyperLogLog()).merge(HyperLogLog(registers))
+        stored = VisitorSketch.objects.filter(
+            period='month', object_id__in={object_id for _, object_id, _ in months},
+            start__in={month for _, _, month in months},
+        )
+        for sketch in stored:
+            key = (sketch.kind, sketch.object_id, sketch.start)
+            if key in months:
+                months[key].merge(HyperLogLog(sketch.registers))
+        VisitorSketch.objects.bulk_create(
+            [
+                VisitorSketch(kind=kind, object_id=object_id, period='month', start=month, registers=sketch.tobytes())
+                for (kind, object_id, month), sketch in months.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['kind', 'object_id', 'period', 'start'],
+            update_fields=['registers'],
+        )
+        folded, _ = old_days.delete()
+        dropped, _ = VisitorSketch.objects.filter(period='month', start__lt=month_cutoff).delete()
+    return folded, dropped
@@ -1,3 +1,1768 @@
-from django.test import TestCase
+import json
+import math
+import os
+import shutil
+import struct
+import tempfile
+import time
+import warnings
+import wave
+from datetime import date
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.cache.backends.base import CacheKeyWarning
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import OperationalError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient
+
+from .analytics import daily_views, downsample_view_stats
+from .cache import get_generation
+from .checks import check_shared_cache
+from .counters import BufferedCounter, WriteBehindBuffer, blog_post_views, flush_counters, flush_due
+from .documents import DOCUMENT_SCHEMA
+from .events import event_counts
+from .images import image_cache
+from .leaderboards import Leaderboard
+from .media import MediaURLResolver
+from .probe import probe_file
+from .models import (
+    Tool, ToolDemo, KeyFeature, Pro, Con, UsageStep,
+    BlogPost, BlogPostImage, News, Author, ToolDocument, ToolDemoWaveform, ViewStat, VisitorSketch, EventCount
+)
+from .serializers import ToolDemoSerializer
+from .similarity import IndexNotReady, SimilarityIndex, similarity_index
+from .sketches import HyperLogLog, downsample_visitor_sketches, hash_visitor
+from .waveforms import compute_demo_waveforms, wav_peaks
+
+
+def make_tool(index, demos=2):
+    """Create a tool with one row in every nested relation"""
+    tool = Tool.objects.create(
+        name=f'Tool {index}',
+        description=f'Description {index}',
+        category='Writing',
+        pricing='Free',
+        difficulty='Beginner',
+        rating=4.0,
+    )
+    KeyFeature.objects.create(tool=tool, feature=f'Feature {index}')
+    Pro.objects.create(tool=tool, text=f'Pro {index}')
+    Con.objects.create(tool=tool, text=f'Con {index}')
+    UsageStep.objects.create(tool=tool, step=f'Step {index}')
+    for order in range(demos):
+        ToolDemo.objects.create(
+            tool=tool, demo_type='text-to-text', title=f'Demo {index}.{order}', order=order
+        )
+    return tool
+
+
+def make_blog_post(index):
+    """Create a published blog post"""
+    return BlogPost.objects.create(
+        title=f'Post {index}',
+        content=f'Content {index}',
+        author='Author',
+        category='Tutorials',
+    )
+
+
+# Tests never touch the shared cache the settings configure
+TEST_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=TEST_CACHES, COUNTER_FLUSH_BACKGROUND=False, COUNTER_FLUSH_INTERVAL=3600)
+class ApiTestCase(TestCase):
+    """
+    Fresh API client, an empty process-local cache (generations, responses)
+    and no pending counts for every test; buffered counters only flush when
+    a test asks
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+        flush_counters()
+
+
+# ==================== QUERY COUNT TESTS ====================
+
+class QueryCountTests(ApiTestCase):
+    """Endpoint query counts must not grow with page size"""
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def assertConstantQueries(self, url, create, small=2, large=20):
+        # Executing the commit hooks invalidates the response cache as in production
+        with self.captureOnCommitCallbacks(execute=True):
+            for index in range(small):
+                create(index)
+        small_count = self.count_queries(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            for index in range(small, large):
+                create(index)
+        large_count = self.count_queries(url)
+        self.assertEqual(small_count, large_count)
+        return large_count
+
+    def test_tool_list(self):
+        count = self.assertConstantQueries('/api/tools/', make_tool)
+        # a single annotated keyset page, no COUNT(*)
+        self.assertEqual(count, 1)
+
+    def test_tool_detail(self):
+        # Expanding explicitly bypasses the materialized document
+        url = '/api/tools/{}/?expand=key_features,pros,cons,usage_steps,demos'
+        with self.captureOnCommitCallbacks(execute=True):
+            tool = make_tool(0, demos=1)
+        small_count = self.count_queries(url.format(tool.pk))
+        with self.captureOnCommitCallbacks(execute=True):
+            for order in range(1, 10):
+                ToolDemo.objects.create(tool=tool, demo_type='text-to-text', title='Demo', order=order)
+                KeyFeature.objects.create(tool=tool, feature='Feature')
+        self.assertEqual(small_count, self.count_queries(url.format(tool.pk)))
+
+    def test_tool_demo_list(self):
+        tool = make_tool(0, demos=0)
+
+        def create(index):
+            ToolDemo.objects.create(tool=tool, demo_type='text-to-text', title=f'Demo {index}')
+
+        self.assertConstantQueries('/api/tool-demos/', create)
+
+    def test_blog_post_list(self):
+        def create(index):
+            post = make_blog_post(index)
+            BlogPostImage.objects.create(blog_post=post, image='blog/content_images/example.png')
+
+        self.assertConstantQueries('/api/blog-posts/', create)
+
+    def test_news_list(self):
+        def create(index):
+            News.objects.create(title=f'News {index}', summary='Summary', category='Research')
+
+        self.assertConstantQueries('/api/news/', create)
+
+    def test_author_list(self):
+        def create(index):
+            Author.objects.create(name=f'Author {index}', slug=f'author-{index}')
+
+        self.assertConstantQueries('/api/authors/', create)
+
+    def test_demo_ordering_kept(self):
+        tool = make_tool(0, demos=0)
+        for order in [2, 0, 1]:
+            ToolDemo.objects.create(tool=tool, demo_type='text-to-text', title=f'Demo {order}', order=order)
+        response = self.client.get(f'/api/tools/{tool.pk}/')
+        self.assertEqual([demo['order'] for demo in response.json()['demos']], [0, 1, 2])
+
+
+# ==================== TOOL LIST TESTS ====================
+
+class ToolListTests(ApiTestCase):
+    def test_list_uses_slim_representation(self):
+        tool = make_tool(0, demos=3)
+        Pro.objects.create(tool=tool, text='Another pro')
+        response = self.client.get('/api/tools/')
+        item = response.data['results'][0]
+        self.assertEqual(item['demo_count'], 3)
+        self.assertEqual(item['feature_count'], 1)
+        self.assertEqual(item['pro_count'], 2)
+        self.assertEqual(item['con_count'], 1)
+        for field in ['demos', 'key_features', 'overview', 'overview_ge', 'description_ge']:
+            self.assertNotIn(field, item)
+
+    def test_retrieve_keeps_nested_payload(self):
+        tool = make_tool(0)
+        response = self.client.get(f'/api/tools/{tool.pk}/')
+        self.assertEqual(len(response.json()['demos']), 2)
+        self.assertIn('overview', response.json())
+
+
+# ==================== SPARSE FIELDSET TESTS ====================
+
+class SparseFieldsetTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tool = make_tool(0)
+
+    def test_fields_whitelist(self):
+        response = self.client.get(f'/api/tools/{self.tool.pk}/?fields=id,name')
+        self.assertEqual(set(response.data), {'id', 'name'})
+
+    def test_unrequested_relations_are_not_queried(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(f'/api/tools/{self.tool.pk}/?fields=id,name')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertNotIn('overview', context.captured_queries[0]['sql'])
+
+    def test_expand_limits_nested_relations(self):
+        response = self.client.get(f'/api/tools/{self.tool.pk}/?expand=demos')
+        self.assertIn('demos', response.data)
+        self.assertIn('description', response.data)
+        self.assertNotIn('key_features', response.data)
+        self.assertNotIn('pros', response.data)
+
+    def test_fields_with_expand(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(f'/api/tools/{self.tool.pk}/?fields=name&expand=key_features')
+        self.assertEqual(set(response.data), {'name', 'key_features'})
+        # tool + key features
+        self.assertEqual(len(context.captured_queries), 2)
+
+    def test_method_fields_load_their_source_columns(self):
+        demo = self.tool.demos.first()
+        demo.input_image_url = 'https://example.com/image.png'
+        demo.save()
+        response = self.client.get(f'/api/tool-demos/{demo.pk}/?fields=id,input_image')
+        self.assertEqual(response.data['input_image'], 'https://example.com/image.png')
+
+    def test_list_skips_unrequested_annotations(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/tools/?fields=id,name')
+        self.assertEqual(set(response.data['results'][0]), {'id', 'name'})
+        self.assertNotIn('COUNT("api_tooldemo"', context.captured_queries[-1]['sql'])
+
+    def test_blog_post_images_expandable(self):
+        make_blog_post(0)
+        response = self.client.get('/api/blog-posts/?fields=id,title')
+        self.assertEqual(set(response.data['results'][0]), {'id', 'title'})
+        response = self.client.get('/api/blog-posts/?expand=images')
+        self.assertIn('images', response.data['results'][0])
+
+
+# ==================== LANGUAGE TESTS ====================
+
+class LanguageScopeTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tool = make_tool(0, demos=1)
+        self.tool.name_ge = 'ხელსაწყო'
+        self.tool.save()
+        self.tool.key_features.update(feature_ge='ფუნქცია')
+
+    def test_bilingual_by_default(self):
+        data = self.client.get(f'/api/tools/{self.tool.pk}/').json()
+        self.assertEqual(data['name'], 'Tool 0')
+        self.assertEqual(data['name_ge'], 'ხელსაწყო')
+
+    def test_georgian_with_english_fallback(self):
+        for url in [
+            f'/api/tools/{self.tool.pk}/?lang=ge',
+            f'/api/tools/{self.tool.pk}/?lang=ge&expand=key_features,pros,demos',
+        ]:
+            response = self.client.get(url)
+            data = response.json()
+            self.assertEqual(data['name'], 'ხელსაწყო')
+            self.assertEqual(data['description'], 'Description 0')
+            self.assertNotIn('name_ge', data)
+            self.assertEqual(data['key_features'][0]['feature'], 'ფუნქცია')
+            self.assertEqual(data['pros'][0]['text'], 'Pro 0')
+            self.assertEqual(data['demos'][0]['title'], 'Demo 0.0')
+            self.assertEqual(response['Content-Language'], 'ka')
+
+    def test_english_loads_only_english_columns(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(f'/api/tools/{self.tool.pk}/?lang=en&expand=key_features,demos')
+        self.assertEqual(response.data['name'], 'Tool 0')
+        self.assertNotIn('name_ge', response.data)
+        for query in context.captured_queries:
+            self.assertNotIn('_ge"', query['sql'])
+
+    def test_bilingual_without_lang(self):
+        # Browsers always send Accept-Language; the frontend relies on the _ge fields
+        response = self.client.get('/api/tools/', HTTP_ACCEPT_LANGUAGE='ka-GE,ka;q=0.9,en;q=0.8')
+        self.assertEqual(response.data['results'][0]['name'], 'Tool 0')
+        self.assertEqual(response.data['results'][0]['name_ge'], 'ხელსაწყო')
+        self.assertNotIn('Content-Language', response)
+        response = self.client.get('/api/tools/?lang=ka')
+        self.assertEqual(response.data['results'][0]['name'], 'ხელსაწყო')
+
+    def test_language_keeps_query_count(self):
+        url = f'/api/tools/{self.tool.pk}/?expand=key_features,pros,cons,usage_steps,demos'
+        with CaptureQueriesContext(connection) as bilingual:
+            self.client.get(url)
+        with CaptureQueriesContext(connection) as georgian:
+            self.client.get(f'{url}&lang=ge')
+        self.assertEqual(len(bilingual.captured_queries), len(georgian.captured_queries))
+
+
+# ==================== PAGINATION TESTS ====================
+
+class KeysetPaginationTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        for index in range(25):
+            News.objects.create(title=f'News {index}', summary='Summary', category='Research')
+        # Identical timestamps force the id tie-breaker
+        News.objects.update(created_at=timezone.now())
+
+    def walk(self, url, key='next'):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(item['id'] for item in response.data['results'])
+            url = response.data[key]
+        return ids, response
+
+    def test_cursor_walk_is_complete_and_stable(self):
+        ids, _ = self.walk('/api/news/?page_size=10')
+        self.assertEqual(ids, list(News.objects.order_by('-created_at', '-id').values_list('id', flat=True)))
+
+    def test_previous_links_walk_back(self):
+        ids, last = self.walk('/api/news/?page_size=10')
+        back, _ = self.walk(last.data['previous'], key='previous')
+        self.assertEqual(back, ids[10:20] + ids[:10])
+
+    def test_no_count_query(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/news/')
+        self.assertNotIn('count', response.data)
+        self.assertEqual(len(context.captured_queries), 1)
+
+    def test_approximate_count_is_cached(self):
+        response = self.client.get('/api/news/?count=true')
+        self.assertEqual(response.data['count'], 25)
+        with CaptureQueriesContext(connection) as context:
+            self.client.get('/api/news/?count=true&page_size=5')
+        self.assertEqual(len(context.captured_queries), 1)
+
+    def test_user_ordering(self):
+        for index in range(5):
+            make_tool(index, demos=0)
+        Tool.objects.update(rating=3.5)
+        ids, _ = self.walk('/api/tools/?ordering=rating&page_size=2')
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(ids), 5)
+
+    def test_page_number_mode(self):
+        response = self.client.get('/api/news/?page=2')
+        self.assertEqual(response.data['count'], 25)
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/news/?cursor=garbage')
+        self.assertEqual(response.status_code, 404)
+
+
+# ==================== TOOL DOCUMENT TESTS ====================
+
+class ToolDocumentTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tool = make_tool(0)
+
+    def test_documents_built_on_write(self):
+        self.assertEqual(
+            set(ToolDocument.objects.filter(tool=self.tool).values_list('language', flat=True)),
+            {'all', 'en', 'ge'},
+        )
+
+    def test_retrieve_serves_stored_document(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(f'/api/tools/{self.tool.pk}/')
+        # stored body only; validators come from the tool's generation
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertEqual(response.json()['name'], 'Tool 0')
+        self.assertEqual(len(response.json()['demos']), 2)
+
+    def test_child_change_rebuilds_document(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            Pro.objects.create(tool=self.tool, text='New pro')
+            Pro.objects.create(tool=self.tool, text='Another pro')
+        # One document rebuild and two generation bumps (tools, this tool) for both rows
+        self.assertEqual(len(callbacks), 3)
+        pros = self.client.get(f'/api/tools/{self.tool.pk}/').json()['pros']
+        self.assertEqual(len(pros), 3)
+
+    @override_settings(ALLOWED_HOSTS=['api.example.com'])
+    def test_media_origin_is_request_origin(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tool.featured_image = 'tools/logo.png'
+            self.tool.save()
+        response = self.client.get(f'/api/tools/{self.tool.pk}/', HTTP_HOST='api.example.com')
+        self.assertEqual(response.json()['featured_image'], 'http://api.example.com/media/tools/logo.png')
+
+    def test_older_schema_is_rebuilt_on_read(self):
+        # As left by a release whose serializer had a different shape
+        ToolDocument.objects.filter(tool=self.tool).update(body='{"name": "Old shape"}', schema=0)
+        response = self.client.get(f'/api/tools/{self.tool.pk}/')
+        self.assertEqual(response.json()['name'], 'Tool 0')
+        self.assertIn('demos', response.json())
+        self.assertTrue(ToolDocument.objects.filter(tool=self.tool, schema=DOCUMENT_SCHEMA).exists())
+
+    def test_delete_removes_documents(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tool.delete()
+        self.assertFalse(ToolDocument.objects.exists())
+        self.assertEqual(self.client.get(f'/api/tools/{self.tool.pk}/').status_code, 404)
+
+    def test_consistency_check(self):
+        call_command('rebuild_tool_documents', '--check', stdout=StringIO())
+        Pro.objects.filter(tool=self.tool).update(text='Changed behind the signals')
+        with self.assertRaises(CommandError):
+            call_command('rebuild_tool_documents', '--check', stdout=StringIO())
+        call_command('rebuild_tool_documents', stdout=StringIO())
+        call_command('rebuild_tool_documents', '--check', stdout=StringIO())
+
+
+# ==================== SEARCH TESTS ====================
+
+class ToolSearchTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.writer = make_tool(0, demos=0)
+            self.writer.name = 'Story Writer'
+            self.writer.name_ge = 'მწერალი'
+            self.writer.save()
+            self.mention = make_tool(1, demos=0)
+            self.mention.overview = 'Exports to any writer app'
+            self.mention.save()
+            make_tool(2, demos=0)
+
+    def search(self, term, extra=''):
+        response = self.client.get(f'/api/tools/?search={term}{extra}')
+        self.assertEqual(response.status_code, 200)
+        return [item['id'] for item in response.data['results']]
+
+    def test_ranked_by_bm25(self):
+        self.assertEqual(self.search('writer'), [self.writer.pk, self.mention.pk])
+
+    def test_prefix_and_georgian(self):
+        self.assertEqual(self.search('writ'), [self.writer.pk, self.mention.pk])
+        self.assertEqual(self.search('მწერ'), [self.writer.pk])
+
+    def test_key_features_indexed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            KeyFeature.objects.create(tool=self.mention, feature='Transcription')
+        self.assertEqual(self.search('transcription'), [self.mention.pk])
+
+    def test_deleted_tool_leaves_index(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.writer.delete()
+        self.assertEqual(self.search('writer'), [self.mention.pk])
+
+    def test_explicit_ordering_wins(self):
+        self.assertEqual(self.search('writer', '&ordering=-name'), [self.mention.pk, self.writer.pk])
+
+    def test_cursor_over_ranked_results(self):
+        response = self.client.get('/api/tools/?search=writer&page_size=1')
+        self.assertEqual(response.data['results'][0]['id'], self.writer.pk)
+        response = self.client.get(response.data['next'])
+        self.assertEqual([item['id'] for item in response.data['results']], [self.mention.pk])
+
+    def test_punctuation_only(self):
+        self.assertEqual(len(self.search('%22*')), 3)
+
+
+# ==================== FACET TESTS ====================
+
+class ToolFacetTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        with self.captureOnCommitCallbacks(execute=True):
+            for index, (category, pricing) in enumerate([
+                ('Writing', 'Free'), ('Writing', 'Paid'), ('Design', 'Free'),
+            ]):
+                tool = make_tool(index, demos=0)
+                tool.category, tool.pricing = category, pricing
+                tool.save()
+
+    def facet(self, data, name):
+        return {item['value']: item['count'] for item in data[name]}
+
+    def test_counts_for_every_choice(self):
+        data = self.client.get('/api/tools/facets/').data
+        category = self.facet(data, 'category')
+        self.assertEqual(len(category), len(Tool.CATEGORY_CHOICES))
+        self.assertEqual(category['Writing'], 2)
+        self.assertEqual(category['Design'], 1)
+        self.assertEqual(category['Marketing'], 0)
+        self.assertEqual(self.facet(data, 'difficulty')['Beginner'], 3)
+
+    def test_filters_apply_to_other_facets(self):
+        data = self.client.get('/api/tools/facets/?category=Writing').data
+        self.assertEqual(self.facet(data, 'pricing'), {'Free': 1, 'Freemium': 0, 'Paid': 1, 'Enterprise': 0})
+        # A facet ignores its own filter
+        self.assertEqual(self.facet(data, 'category')['Design'], 1)
+
+    def test_search_applies(self):
+        data = self.client.get('/api/tools/facets/?search=Tool 2').data
+        self.assertEqual(self.facet(data, 'category')['Writing'], 0)
+
+    def test_long_search_gets_a_valid_cache_key(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', CacheKeyWarning)
+            for search in ['Tool 2', 'tool ' * 100]:
+                self.assertEqual(self.client.get('/api/tools/facets/', {'search': search}).status_code, 200)
+
+    def test_single_query_then_cached(self):
+        with CaptureQueriesContext(connection) as context:
+            self.client.get('/api/tools/facets/?pricing=Free')
+        self.assertEqual(len(context.captured_queries), 1)
+        with CaptureQueriesContext(connection) as context:
+            self.client.get('/api/tools/facets/?pricing=Free')
+        self.assertEqual(len(context.captured_queries), 0)
+
+    def test_invalidated_on_change(self):
+        self.client.get('/api/tools/facets/')
+        with self.captureOnCommitCallbacks(execute=True):
+            Tool.objects.filter(category='Design').get().delete()
+        data = self.client.get('/api/tools/facets/').data
+        self.assertEqual(self.facet(data, 'category')['Design'], 0)
+
+
+# ==================== CONDITIONAL GET TESTS ====================
+
+class ConditionalGetTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tool = make_tool(0)
+            self.news = News.objects.create(title='News', summary='Summary', category='Research')
+
+    def test_detail_not_modified(self):
+        response = self.client.get(f'/api/tools/{self.tool.pk}/')
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(f'/api/tools/{self.tool.pk}/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(context.captured_queries), 0)
+
+    def test_missing_objects_create_no_generations(self):
+        for lookup in [self.tool.pk + 1000, 'not-an-id']:
+            response = self.client.get(f'/api/tools/{lookup}/')
+            self.assertEqual(response.status_code, 404)
+            self.assertIsNone(get_generation(f'tools:{lookup}', create=False))
+
+    def test_generation_started_by_first_found_retrieve(self):
+        cache.clear()
+        response = self.client.get(f'/api/news/{self.news.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+        self.assertIsNotNone(get_generation(f'news:{self.news.pk}', create=False))
+        self.assertIn('ETag', self.client.get(f'/api/news/{self.news.pk}/'))
+
+    def test_if_modified_since(self):
+        response = self.client.get(f'/api/news/{self.news.pk}/')
+        response = self.client.get(
+            f'/api/news/{self.news.pk}/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_child_change_changes_parent_etag(self):
+        etag = self.client.get(f'/api/tools/{self.tool.pk}/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Pro.objects.filter(tool=self.tool).first().delete()
+        response = self.client.get(f'/api/tools/{self.tool.pk}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['pros']), 0)
+
+    def test_etag_depends_on_query(self):
+        etag = self.client.get(f'/api/tools/{self.tool.pk}/')['ETag']
+        response = self.client.get(f'/api/tools/{self.tool.pk}/?lang=ge', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_not_modified_without_queries(self):
+        etag = self.client.get('/api/tools/')['ETag']
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/tools/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(context.captured_queries), 0)
+
+    def test_list_etag_changes_on_write(self):
+        etag = self.client.get('/api/news/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            News.objects.create(title='Later', summary='Summary', category='Research')
+        response = self.client.get('/api/news/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_process_local_cache_is_flagged(self):
+        self.assertEqual([warning.id for warning in check_shared_cache(None)], ['api.W001'])
+        with tempfile.TemporaryDirectory() as location:
+            shared = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location}}
+            with override_settings(CACHES=shared):
+                self.assertEqual(check_shared_cache(None), [])
+
+
+# ==================== RESPONSE CACHE TESTS ====================
+
+class ResponseCacheTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tool = make_tool(0)
+            self.other = make_tool(1)
+            self.post = make_blog_post(0)
+
+    def assertCached(self, url, **headers):
+        self.client.get(url, **headers)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, **headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(context.captured_queries), 0)
+        return response
+
+    def test_lists_and_details_are_cached(self):
+        for url in ['/api/tools/', f'/api/tools/{self.tool.pk}/', '/api/blog-posts/', '/api/news/', '/api/authors/']:
+            self.assertCached(url)
+
+    def test_query_normalized(self):
+        self.client.get('/api/tools/?category=Writing&pricing=Free')
+        with CaptureQueriesContext(connection) as context:
+            self.client.get('/api/tools/?pricing=Free&category=Writing')
+        self.assertEqual(len(context.captured_queries), 0)
+
+    def test_language_in_key(self):
+        self.assertCached('/api/tools/?lang=en')
+        response = self.client.get('/api/tools/?lang=ka')
+        self.assertEqual(response['Content-Language'], 'ka')
+
+    def test_child_change_invalidates_only_its_tool(self):
+        self.client.get(f'/api/tools/{self.other.pk}/')
+        self.client.get(f'/api/tools/{self.tool.pk}/')
+        with self.captureOnCommitCallbacks(execute=True):
+            KeyFeature.objects.create(tool=self.tool, feature='Fresh feature')
+        features = self.client.get(f'/api/tools/{self.tool.pk}/').json()['key_features']
+        self.assertEqual(len(features), 2)
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(f'/api/tools/{self.other.pk}/')
+        self.assertEqual(len(context.captured_queries), 0)
+
+    def test_blog_image_invalidates_post(self):
+        self.client.get(f'/api/blog-posts/{self.post.pk}/')
+        with self.captureOnCommitCallbacks(execute=True):
+            BlogPostImage.objects.create(blog_post=self.post, image='blog/content_images/new.png')
+        response = self.client.get(f'/api/blog-posts/{self.post.pk}/')
+        self.assertEqual(len(response.data['images']), 1)
+
+    def test_staff_bypass_cache(self):
+        staff = User.objects.create_user('editor', password='secret', is_staff=True)
+        self.client.get('/api/tools/')
+        self.client.force_authenticate(staff)
+        with CaptureQueriesContext(connection) as context:
+            self.client.get('/api/tools/')
+        self.assertGreater(len(context.captured_queries), 0)
+
+
+# ==================== NESTED WRITE TESTS ====================
+
+class NestedToolWriteTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create_user('admin', password='secret', is_staff=True)
+        self.client.force_authenticate(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tool = make_tool(0)
+
+    def test_create_with_children(self):
+        payload = {
+            'name': 'Nested', 'description': 'Description', 'category': 'Writing',
+            'pricing': 'Free', 'difficulty': 'Beginner', 'rating': 4.5,
+            'key_features': [{'feature': 'Fast'}, {'feature': 'Cheap'}],
+            'pros': [{'text': 'Good'}],
+            'demos': [{'demo_type': 'text-to-text', 'title': 'Demo', 'order': 0}],
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/tools/', payload, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        tool = Tool.objects.get(pk=response.data['id'])
+        self.assertEqual(tool.key_features.count(), 2)
+        self.assertEqual(tool.demos.get().title, 'Demo')
+        self.assertEqual(len(response.data['key_features']), 2)
+
+    def test_diff_upsert(self):
+        feature = self.tool.key_features.get()
+        pro = self.tool.pros.get()
+        payload = {
+            'key_features': [{'id': feature.pk, 'feature': 'Renamed'}, {'feature': 'Added'}],
+            'pros': [{'id': pro.pk, 'text': pro.text}],
+            'cons': [],
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(f'/api/tools/{self.tool.pk}/', payload, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(
+            sorted(self.tool.key_features.values_list('feature', flat=True)), ['Added', 'Renamed']
+        )
+        self.assertEqual(self.tool.key_features.get(feature='Renamed').pk, feature.pk)
+        self.assertEqual(self.tool.pros.get().pk, pro.pk)
+        self.assertFalse(self.tool.cons.exists())
+        # Omitted relations are left alone
+        self.assertEqual(self.tool.usage_steps.count(), 1)
+        self.assertEqual(self.tool.demos.count(), 2)
+        # Documents and cached responses follow the write
+        response = self.client.get(f'/api/tools/{self.tool.pk}/')
+        self.assertEqual(len(response.json()['key_features']), 2)
+
+    def test_unchanged_rows_are_not_written(self):
+        feature = self.tool.key_features.get()
+        payload = {'key_features': [{'id': feature.pk, 'feature': feature.feature}]}
+        with CaptureQueriesContext(connection) as context:
+            self.client.patch(f'/api/tools/{self.tool.pk}/', payload, format='json')
+        statements = [query['sql'] for query in context.captured_queries if 'api_keyfeature' in query['sql']]
+        self.assertTrue(all(sql.startswith('SELECT') for sql in statements), statements)
+
+    def test_foreign_child_id_rejected(self):
+        other = make_tool(1)
+        foreign = other.pros.get()
+        payload = {'name': 'Changed', 'pros': [{'id': foreign.pk, 'text': 'Stolen'}]}
+        response = self.client.patch(f'/api/tools/{self.tool.pk}/', payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.tool.refresh_from_db()
+        self.assertEqual(self.tool.name, 'Tool 0')
+        self.assertEqual(Pro.objects.get(pk=foreign.pk).text, 'Pro 1')
+
+
+# ==================== BATCH RETRIEVE TESTS ====================
+
+class BatchRetrieveTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tools = [make_tool(index) for index in range(3)]
+            self.post = make_blog_post(0)
+            self.authors = [
+                Author.objects.create(name=f'Author {index}', slug=f'author-{index}')
+                for index in range(2)
+            ]
+
+    def test_tools_keyed_in_request_order(self):
+        ids = [self.tools[2].pk, self.tools[0].pk]
+        response = self.client.get(f'/api/tools/batch/?ids={ids[0]},{ids[1]},999999')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(list(data['results']), [str(pk) for pk in ids])
+        self.assertEqual(data['results'][str(ids[0])]['name'], 'Tool 2')
+        self.assertEqual(len(data['results'][str(ids[0])]['demos']), 2)
+        self.assertEqual(data['missing'], ['999999'])
+
+    def test_fixed_query_count(self):
+        ids = ','.join(str(tool.pk) for tool in self.tools)
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(f'/api/tools/batch/?ids={ids}')
+        # tools + five prefetched relations, however many ids
+        self.assertEqual(len(context.captured_queries), 6)
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(f'/api/tools/batch/?ids={ids}')
+        self.assertEqual(len(context.captured_queries), 0)
+
+    def test_sparse_fields(self):
+        response = self.client.get(f'/api/tools/batch/?ids={self.tools[0].pk}&fields=id,name')
+        self.assertEqual(set(response.json()['results'][str(self.tools[0].pk)]), {'id', 'name'})
+
+    def test_blog_posts_and_authors(self):
+        response = self.client.get(f'/api/blog-posts/batch/?ids={self.post.pk}')
+        self.assertEqual(response.json()['results'][str(self.post.pk)]['title'], 'Post 0')
+        response = self.client.get('/api/authors/batch/?slugs=author-1,author-0,nobody')
+        data = response.json()
+        self.assertEqual(list(data['results']), ['author-1', 'author-0'])
+        self.assertEqual(data['missing'], ['nobody'])
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.client.get('/api/tools/batch/').status_code, 400)
+        self.assertEqual(self.client.get('/api/tools/batch/?ids=1,x').status_code, 400)
+        ids = ','.join(str(index) for index in range(1, 52))
+        self.assertEqual(self.client.get(f'/api/tools/batch/?ids={ids}').status_code, 400)
+
+
+# ==================== INDEX TESTS ====================
+
+class QueryPlanBenchmarkTests(TestCase):
+    def test_list_paths_use_indexes_and_roll_back(self):
+        out = StringIO()
+        call_command('benchmark_query_plans', rows=200, repeat=1, stdout=out)
+        report = out.getvalue()
+        for name in ['tool_created_idx', 'tool_category_created_idx', 'blogpost_published_idx',
+                     'blogpost_views_idx', 'news_published_idx', 'tooldemo_tool_order_idx']:
+            self.assertIn(f'USING INDEX {name}', report)
+        self.assertIn('SCAN api_tool; USE TEMP B-TREE FOR ORDER BY', report)
+        self.assertFalse(Tool.objects.exists())
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE name = 'tool_created_idx'")
+            self.assertIsNotNone(cursor.fetchone())
+
+
+# ==================== SIMILAR TOOLS TESTS ====================
+
+@override_settings(SIMILAR_TOOLS_BACKGROUND=False)
+class SimilarToolsTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.writer = self.create('Essay writer', 'Writes essays and blog articles', 'Writing', 'Free')
+            self.editor = self.create('Article editor', 'Edits essays and articles for grammar', 'Writing', 'Free')
+            self.painter = self.create('Painter', 'Generates paintings and illustrations', 'Image Generation', 'Paid')
+            self.sketcher = self.create('Sketcher', 'Generates sketches and illustrations', 'Image Generation', 'Paid')
+
+    def create(self, name, description, category, pricing):
+        return Tool.objects.create(
+            name=name, description=description, category=category,
+            pricing=pricing, difficulty='Beginner', rating=4.0,
+        )
+
+    def similar(self, tool, query=''):
+        response = self.client.get(f'/api/tools/{tool.pk}/similar/{query}')
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results']
+
+    def test_most_similar_first(self):
+        results = self.similar(self.writer)
+        self.assertEqual(results[0]['id'], self.editor.pk)
+        self.assertGreater(results[0]['similarity'], 0)
+        self.assertNotIn(self.writer.pk, [result['id'] for result in results])
+        self.assertIn('demo_count', results[0])
+        self.assertEqual(len(self.similar(self.painter, '?limit=1')), 1)
+
+    def test_follows_changes(self):
+        self.assertEqual(self.similar(self.painter)[0]['id'], self.sketcher.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sketcher.delete()
+            clone = self.create('Clone', 'Generates paintings and illustrations', 'Image Generation', 'Paid')
+        self.assertEqual(self.similar(self.painter)[0]['id'], clone.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            KeyFeature.objects.create(tool=self.writer, feature='Paintings and illustrations')
+        self.assertIn(self.writer.pk, [result['id'] for result in self.similar(self.painter)])
+
+    def test_unknown_tool(self):
+        self.assertEqual(self.client.get('/api/tools/999999/similar/').status_code, 404)
+
+    def test_incremental_update(self):
+        index = SimilarityIndex()
+        index.rebuild_ratio = 1.0
+        self.assertEqual(index.similar(self.painter.pk)[0][0], self.sketcher.pk)
+        vocabulary = index.state.vocabulary
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sketcher.delete()
+            KeyFeature.objects.create(tool=self.writer, feature='Paintings and illustrations')
+        neighbours = [tool_id for tool_id, _ in index.similar(self.painter.pk)]
+        self.assertIs(index.state.vocabulary, vocabulary)
+        self.assertEqual(neighbours[0], self.writer.pk)
+        self.assertNotIn(self.sketcher.pk, neighbours)
+        self.assertIsNone(index.similar(self.sketcher.pk))
+
+    @override_settings(SIMILAR_TOOLS_BACKGROUND=True)
+    def test_previous_index_served_while_syncing(self):
+        index = SimilarityIndex()
+        # Nothing to serve until the first build is in
+        with mock.patch.object(index, 'start_sync') as start_sync:
+            with self.assertRaises(IndexNotReady):
+                index.similar(self.painter.pk)
+        start_sync.assert_called_once_with()
+        index.sync()
+        sketcher_id = self.sketcher.pk
+        self.assertEqual(index.similar(self.painter.pk)[0][0], sketcher_id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sketcher.delete()
+        with mock.patch.object(index, 'start_sync') as start_sync:
+            self.assertEqual(index.similar(self.painter.pk)[0][0], sketcher_id)
+        start_sync.assert_called_once_with()
+        index.sync()
+        self.assertNotIn(sketcher_id, [tool_id for tool_id, _ in index.similar(self.painter.pk)])
+
+    @override_settings(SIMILAR_TOOLS_BACKGROUND=True)
+    def test_unavailable_until_first_build(self):
+        with mock.patch.object(similarity_index, 'state', None):
+            with mock.patch.object(similarity_index, 'start_sync') as start_sync:
+                response = self.client.get(f'/api/tools/{self.writer.pk}/similar/')
+        start_sync.assert_called_once_with()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '5')
+
+    def test_same_neighbours_with_any_tile_size(self):
+        index = SimilarityIndex()
+        expected = {tool.pk: index.similar(tool.pk) for tool in [self.writer, self.editor, self.painter]}
+        index.tile_rows = 1
+        index.state = None
+        for tool_id, neighbours in expected.items():
+            self.assertEqual(index.similar(tool_id), neighbours)
+
+
+# ==================== LEADERBOARD TESTS ====================
+
+class LeaderboardTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tools = [
+                Tool.objects.create(
+                    name=f'Tool {index}', description='', category=category, pricing=pricing,
+                    difficulty='Beginner', rating=rating,
+                )
+                for index, (category, pricing, rating) in enumerate([
+                    ('Writing', 'Free', 4.0),
+                    ('Writing', 'Paid', 3.0),
+                    ('Image Generation', 'Free', 5.0),
+                    ('Image Generation', 'Paid', 2.0),
+                ])
+            ]
+            self.posts = [make_blog_post(index) for index in range(3)]
+            for post, views in zip(self.posts, [10, 30, 20]):
+                BlogPost.objects.filter(pk=post.pk).update(views=views)
+
+    def top(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [item['id'] for item in response.json()['results']]
+
+    def test_boards(self):
+        tools = self.tools
+        self.assertEqual(self.top('/api/tools/top/'), [tools[2].pk, tools[0].pk, tools[1].pk, tools[3].pk])
+        self.assertEqual(self.top('/api/tools/top/?category=Image Generation'), [tools[2].pk, tools[3].pk])
+        self.assertEqual(self.top('/api/tools/top/?pricing=Paid&limit=1'), [tools[1].pk])
+        posts = self.posts
+        self.assertEqual(self.top('/api/blog-posts/top/'), [posts[1].pk, posts[2].pk, posts[0].pk])
+
+    def test_invalid_filters(self):
+        self.assertEqual(self.client.get('/api/tools/top/?category=Nope').status_code, 400)
+        self.assertEqual(self.client.get('/api/tools/top/?category=Writing&pricing=Free').status_code, 400)
+
+    def test_served_without_sorting(self):
+        self.top('/api/tools/top/?category=Writing')
+        with CaptureQueriesContext(connection) as context:
+            self.top('/api/tools/top/?category=Writing')
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertNotIn('ORDER BY', context.captured_queries[0]['sql'])
+
+    def test_incremental_updates(self):
+        tools = self.tools
+        self.top('/api/tools/top/?category=Writing')
+        self.top('/api/tools/top/?category=Image Generation')
+        with self.captureOnCommitCallbacks(execute=True):
+            tools[3].rating = 4.5
+            tools[3].category = 'Writing'
+            tools[3].save()
+            tools[0].delete()
+        self.assertEqual(self.top('/api/tools/top/?category=Writing'), [tools[3].pk, tools[1].pk])
+        self.assertEqual(self.top('/api/tools/top/?category=Image Generation'), [tools[2].pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.posts[0].views = 50
+            self.posts[0].save()
+            self.posts[1].published = False
+            self.posts[1].save()
+        self.assertEqual(self.top('/api/blog-posts/top/'), [self.posts[0].pk, self.posts[2].pk])
+
+    def test_refill_when_row_leaves_full_board(self):
+        board = Leaderboard('test-rating', Tool, 'rating')
+        board.size = 2
+        self.assertEqual(board.top(), [(5.0, self.tools[2].pk), (4.0, self.tools[0].pk)])
+        Tool.objects.filter(pk=self.tools[2].pk).update(rating=1.0)
+        board.record(self.tools[2].pk, {'rating': 1.0})
+        self.assertEqual(board.top(), [(4.0, self.tools[0].pk), (3.0, self.tools[1].pk)])
+        Tool.objects.filter(pk=self.tools[3].pk).update(rating=4.5)
+        board.record(self.tools[3].pk, {'rating': 4.5})
+        self.assertEqual(board.top(), [(4.5, self.tools[3].pk), (4.0, self.tools[0].pk)])
+
+    def test_updates_hold_the_list_lock(self):
+        board = Leaderboard('test-rating', Tool, 'rating')
+        board.top()
+        key = board.get_key(None)
+        held = []
+        real_set = cache.set
+
+        def record_lock(name, *args, **kwargs):
+            if name == key:
+                held.append(cache.get(f'{key}:lock') is not None)
+            return real_set(name, *args, **kwargs)
+
+        Tool.objects.filter(pk=self.tools[3].pk).update(rating=4.5)
+        with mock.patch.object(cache, 'set', side_effect=record_lock):
+            board.record(self.tools[3].pk, {'rating': 4.5})
+        self.assertEqual(held, [True])
+        self.assertIsNone(cache.get(f'{key}:lock'))
+        self.assertEqual(board.top()[1], (4.5, self.tools[3].pk))
+
+    @mock.patch('api.leaderboards.LEADERBOARD_LOCK_WAIT', 0)
+    def test_update_without_lock_drops_the_list(self):
+        board = Leaderboard('test-rating', Tool, 'rating')
+        board.top()
+        key = board.get_key(None)
+        # Another process is updating the list
+        cache.add(f'{key}:lock', 'other')
+        Tool.objects.filter(pk=self.tools[3].pk).update(rating=4.5)
+        board.record(self.tools[3].pk, {'rating': 4.5})
+        self.assertIsNone(cache.get(key))
+        self.assertEqual(cache.get(f'{key}:lock'), 'other')
+        # Served from the database meanwhile, and cached again once the lock is free
+        self.assertEqual(board.top()[1], (4.5, self.tools[3].pk))
+        self.assertIsNone(cache.get(key))
+        cache.delete(f'{key}:lock')
+        self.assertEqual(board.top()[1], (4.5, self.tools[3].pk))
+        self.assertIsNotNone(cache.get(key))
+
+
+# ==================== MEDIA URL TESTS ====================
+
+class MediaURLTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tool = make_tool(0, demos=0)
+            self.demo = ToolDemo.objects.create(
+                tool=self.tool, demo_type='image-to-image', title='Demo',
+                input_image_file='demos/inputs/images/in put.png',
+                output_image_url='https://cdn.example.com/out.png',
+            )
+
+    def test_absolute_urls(self):
+        data = self.client.get(f'/api/tool-demos/{self.demo.pk}/').json()
+        self.assertEqual(data['input_image'], 'http://testserver/media/demos/inputs/images/in%20put.png')
+        self.assertEqual(data['output_image'], 'https://cdn.example.com/out.png')
+        self.assertIsNone(data['output_video'])
+        self.assertEqual(
+            data['input_image_srcset'].split(', ')[0],
+            'http://testserver/media/img/demos/inputs/images/in%20put.png?w=320 320w',
+        )
+        self.assertIsNone(data['output_image_srcset'])
+
+    def test_without_request(self):
+        data = ToolDemoSerializer(self.demo).data
+        self.assertEqual(data['input_image'], '/media/demos/inputs/images/in%20put.png')
+
+    def test_resolver_shared_and_memoized(self):
+        resolver = MediaURLResolver()
+        file = self.demo.input_image_file
+        self.assertIs(resolver.resolve(file), resolver.resolve(file))
+        self.assertIsNone(resolver.resolve(self.demo.output_video_file))
+        context = {}
+        ToolDemoSerializer([self.demo, self.demo], many=True, context=context).data
+        self.assertEqual(list(context['media_urls'].urls), [file.name])
+
+
+# ==================== MEDIA SERVING TESTS ====================
+
+class MediaServingTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        os.makedirs(os.path.join(self.media_root, 'demos'))
+        self.content = bytes(range(100))
+        for name in ['demos/clip.mp3', 'demos/0d1bacfe5257f2a2b9d1d6f4b1d33903.mp3']:
+            with open(os.path.join(self.media_root, name), 'wb') as file:
+                file.write(self.content)
+
+    def get(self, path='demos/clip.mp3', **headers):
+        response = self.client.get(f'/media/{path}', **headers)
+        self.addCleanup(response.close)
+        return response
+
+    def body(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_full_file(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), self.content)
+        self.assertEqual(response['Content-Type'], 'audio/mpeg')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=3600')
+        self.assertFalse(response['ETag'].startswith('W/'))
+
+    def test_byte_ranges(self):
+        for header, expected in [('bytes=10-19', (10, 19)), ('bytes=90-', (90, 99)), ('bytes=-5', (95, 99)),
+                                 ('bytes=95-500', (95, 99))]:
+            response = self.get(HTTP_RANGE=header)
+            self.assertEqual(response.status_code, 206, header)
+            start, end = expected
+            self.assertEqual(self.body(response), self.content[start:end + 1])
+            self.assertEqual(response['Content-Range'], f'bytes {start}-{end}/100')
+            self.assertEqual(response['Content-Length'], str(end - start + 1))
+
+    def test_unsatisfiable_and_ignored_ranges(self):
+        response = self.get(HTTP_RANGE='bytes=100-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */100')
+        self.assertEqual(self.get(HTTP_RANGE='bytes=0-1,5-6').status_code, 200)
+        self.assertEqual(self.get(HTTP_RANGE='bytes=9-2').status_code, 200)
+        self.assertEqual(self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"').status_code, 200)
+        etag = self.get()['ETag']
+        self.assertEqual(self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=etag).status_code, 206)
+
+    def test_conditional_and_immutable(self):
+        etag = self.get()['ETag']
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        response = self.get('demos/0d1bacfe5257f2a2b9d1d6f4b1d33903.mp3')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+
+    def test_missing_and_traversal(self):
+        self.assertEqual(self.get('demos/missing.mp3').status_code, 404)
+        self.assertEqual(self.get('demos').status_code, 404)
+        self.assertEqual(self.get('../settings.py').status_code, 404)
+        self.assertEqual(self.client.post('/media/demos/clip.mp3').status_code, 405)
+
+    def test_front_server_handoff(self):
+        with self.settings(MEDIA_X_ACCEL_REDIRECT='/protected-media/'):
+            response = self.get(HTTP_RANGE='bytes=0-9')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['X-Accel-Redirect'], '/protected-media/demos/clip.mp3')
+            self.assertEqual(response.content, b'')
+        with self.settings(MEDIA_X_SENDFILE=True):
+            response = self.get()
+            self.assertEqual(response['X-Sendfile'], os.path.join(self.media_root, 'demos/clip.mp3'))
+
+
+class ImageResizeTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        os.makedirs(os.path.join(self.media_root, 'blog'))
+        Image.new('RGB', (1000, 500), 'red').save(os.path.join(self.media_root, 'blog', 'cover.png'))
+
+    def get(self, query='', path='blog/cover.png', **headers):
+        response = self.client.get(f'/media/img/{path}{query}', **headers)
+        self.addCleanup(response.close)
+        return response
+
+    def open(self, response):
+        return Image.open(BytesIO(b''.join(response.streaming_content)))
+
+    def cached_files(self):
+        return sorted(path for _, _, path in image_cache.scan())
+
+    def test_resize_snaps_and_never_upscales(self):
+        response = self.get('?w=300&fmt=png')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(self.open(response).size, (320, 160))
+        self.assertEqual(self.open(self.get('?w=5000&h=100&fmt=jpeg')).size, (320, 160))
+        self.assertEqual(self.open(self.get('?fmt=png')).size, (1000, 500))
+        self.assertNotIn('Accept', response.get('Vary', ''))
+
+    def test_negotiates_format_from_accept(self):
+        response = self.get('?w=640', HTTP_ACCEPT='image/webp,image/*')
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertEqual(self.open(response).format, 'WEBP')
+        self.assertIn('Accept', response['Vary'])
+        response = self.get('?w=640', HTTP_ACCEPT='image/*')
+        self.assertEqual(self.open(response).format, 'PNG')
+
+    def test_variants_cached_and_validated(self):
+        response = self.get('?w=640&fmt=webp')
+        self.assertEqual(len(self.cached_files()), 1)
+        self.assertEqual(self.get('?w=600&fmt=webp')['ETag'], response['ETag'])
+        self.assertEqual(len(self.cached_files()), 1)
+        self.assertEqual(self.get('?w=640&fmt=webp', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_cache_evicts_least_recently_used(self):
+        paths = {}
+        for width in [160, 320, 480, 640]:
+            before = set(self.cached_files())
+            self.get(f'?w={width}&fmt=png')
+            [paths[width]] = set(self.cached_files()) - before
+            os.utime(paths[width], ns=(width * 10 ** 9, os.stat(paths[width]).st_mtime_ns))
+        # A hit makes 160 the most recently used, so 320 is the oldest
+        self.get('?w=160&fmt=png')
+        sizes = {width: os.path.getsize(path) for width, path in paths.items()}
+        limit = int((sum(sizes.values()) - sizes[320]) / 0.9) + 1
+        with self.settings(IMAGE_CACHE_MAX_BYTES=limit):
+            image_cache.added(paths[640])
+        self.assertEqual(self.cached_files(), sorted(paths[width] for width in [160, 480, 640]))
+
+    def test_bad_requests(self):
+        self.assertEqual(self.get('?w=abc').status_code, 400)
+        self.assertEqual(self.get('?w=0').status_code, 400)
+        self.assertEqual(self.get('?fmt=gif').status_code, 400)
+        self.assertEqual(self.get(path='blog/missing.png').status_code, 404)
+        self.assertEqual(self.get(path='../settings.py').status_code, 404)
+        with open(os.path.join(self.media_root, 'blog', 'notes.png'), 'wb') as file:
+            file.write(b'not an image')
+        self.assertEqual(self.get('?fmt=png', path='blog/notes.png').status_code, 404)
+
+    def test_oversized_source_is_not_found(self):
+        with mock.patch.object(Image, 'MAX_IMAGE_PIXELS', 1000):
+            self.assertEqual(self.get('?w=100').status_code, 404)
+            self.assertEqual(self.get('?w=100&fmt=png').status_code, 404)
+
+
+def ebml(element, payload):
+    """One EBML element with a one byte size (payloads under 127 bytes)"""
+    return element.to_bytes((element.bit_length() + 7) // 8, 'big') + bytes([0x80 | len(payload)]) + payload
+
+
+def mp4_box(kind, payload):
+    return struct.pack('>I4s', 8 + len(payload), kind) + payload
+
+
+@override_settings(WAVEFORM_BACKGROUND=False)
+class MediaProbeTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tool = make_tool(0, demos=0)
+
+    def upload(self, name, content):
+        return SimpleUploadedFile(name, content)
+
+    def png(self, size=(300, 200)):
+        buffer = BytesIO()
+        Image.new('RGB', size).save(buffer, 'PNG')
+        return buffer.getvalue()
+
+    def wav(self, seconds=1.5, rate=8000):
+        buffer = BytesIO()
+        with wave.open(buffer, 'wb') as writer:
+            writer.setnchannels(1)
+            writer.setsampwidth(2)
+            writer.setframerate(rate)
+            writer.writeframes(b'\0\0' * int(seconds * rate))
+        return buffer.getvalue()
+
+    def probe(self, name, content):
+        return probe_file(self.upload(name, content))
+
+    def test_probes_headers(self):
+        self.assertEqual(self.probe('a.png', self.png()), {'size': len(self.png()), 'width': 300, 'height': 200, 'mime': 'image/png'})
+        self.assertEqual(self.probe('a.wav', self.wav())['duration'], 1.5)
+        # MPEG-1 layer III, 128 kbit/s, 44.1 kHz: one second is 16000 bytes
+        mp3 = b'\xff\xfb\x90\x64' + bytes(15996)
+        self.assertEqual(self.probe('a.mp3', mp3), {'size': 16000, 'mime': 'audio/mpeg', 'duration': 1.0})
+        streaminfo = bytes(10) + ((44100 << 44) | (1 << 41) | (15 << 36) | 88200).to_bytes(8, 'big') + bytes(16)
+        self.assertEqual(self.probe('a.flac', b'fLaC\x80\x00\x00\x22' + streaminfo)['duration'], 2.0)
+
+        mvhd = mp4_box(b'mvhd', bytes(12) + struct.pack('>II', 1000, 2500) + bytes(80))
+        tkhd = mp4_box(b'tkhd', bytes(76) + struct.pack('>II', 1280 << 16, 720 << 16))
+        mp4 = mp4_box(b'ftyp', b'isom' + bytes(4)) + mp4_box(b'mdat', bytes(100)) + mp4_box(b'moov', mvhd + mp4_box(b'trak', tkhd))
+        self.assertEqual(self.probe('a.mp4', mp4), {'size': len(mp4), 'mime': 'video/mp4', 'duration': 2.5, 'width': 1280, 'height': 720})
+
+        info = ebml(0x2AD7B1, (1000000).to_bytes(3, 'big')) + ebml(0x4489, struct.pack('>f', 3500.0))
+        video = ebml(0xE0, ebml(0xB0, (640).to_bytes(2, 'big')) + ebml(0xBA, (360).to_bytes(2, 'big')))
+        segment = ebml(0x1549A966, info) + ebml(0x1654AE6B, ebml(0xAE, video))
+        webm = ebml(0x1A45DFA3, ebml(0x4282, b'webm')) + b'\x18\x53\x80\x67\x01\xff\xff\xff\xff\xff\xff\xff' + segment
+        self.assertEqual(self.probe('a.webm', webm), {'size': len(webm), 'mime': 'video/webm', 'duration': 3.5, 'width': 640, 'height': 360})
+
+        self.assertEqual(self.probe('notes.txt', b'hello'), {'size': 5, 'mime': 'text/plain'})
+
+    def test_probed_on_save_and_serialized(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            demo = ToolDemo.objects.create(
+                tool=self.tool, demo_type='text-to-audio', title='Demo',
+                input_image_file=self.upload('in.png', self.png()),
+                output_audio_file=self.upload('out.wav', self.wav()),
+                output_image_url='https://cdn.example.com/out.png',
+            )
+        self.assertEqual(set(demo.media_metadata), {'input_image_file', 'output_audio_file'})
+        self.assertEqual(demo.media_metadata['output_audio_file']['name'], demo.output_audio_file.name)
+        data = self.client.get(f'/api/tool-demos/{demo.pk}/').json()
+        self.assertEqual(data['input_image_meta'], {'size': len(self.png()), 'width': 300, 'height': 200, 'mime': 'image/png'})
+        self.assertEqual(data['output_audio_meta']['duration'], 1.5)
+        self.assertEqual(data['output_audio_meta']['mime'], 'audio/wav')
+        self.assertIsNone(data['output_image_meta'])
+        self.assertIsNone(data['input_video_meta'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            demo.input_image_file = None
+            demo.save()
+        self.assertEqual(set(demo.media_metadata), {'output_audio_file'})
+
+    def test_probe_media_backfills(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            post = BlogPost.objects.create(title='Post', content='Body', author='A', category='Tutorials')
+            BlogPost.objects.filter(pk=post.pk).update(featured_image='blog/cover.png')
+        os.makedirs(os.path.join(self.media_root, 'blog'))
+        with open(os.path.join(self.media_root, 'blog', 'cover.png'), 'wb') as file:
+            file.write(self.png((64, 32)))
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('probe_media', stdout=StringIO())
+        post.refresh_from_db()
+        self.assertEqual(post.media_metadata['featured_image']['width'], 64)
+        data = self.client.get(f'/api/blog-posts/{post.pk}/').json()
+        self.assertEqual(data['featured_image_meta']['height'], 32)
+
+
+@override_settings(WAVEFORM_BACKGROUND=False, WAVEFORM_BUCKETS=4)
+class WaveformTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tool = make_tool(0, demos=0)
+
+    def wav(self, samples, channels=1, width=2, rate=8):
+        buffer = BytesIO()
+        with wave.open(buffer, 'wb') as writer:
+            writer.setnchannels(channels)
+            writer.setsampwidth(width)
+            writer.setframerate(rate)
+            writer.writeframes(samples)
+        return buffer.getvalue()
+
+    def test_peaks_per_bucket(self):
+        # Eight frames in four buckets of two; the second channel only adds a trough
+        left = [0, 16384, -32768, 0, 8192, 8192, 0, 32767]
+        right = [0, 0, 0, 0, -16384, 0, 0, 0]
+        frames = struct.pack('<16h', *[sample for pair in zip(left, right) for sample in pair])
+        peaks, rate, duration = wav_peaks(BytesIO(self.wav(frames, channels=2)), 4)
+        self.assertEqual(peaks.tolist(), [0, 64, -127, 0, -64, 32, 0, 127])
+        self.assertEqual((rate, duration), (8, 1.0))
+        peaks, _, _ = wav_peaks(BytesIO(self.wav(bytes([128, 255, 0, 128]), width=1)), 2)
+        self.assertEqual(peaks.tolist(), [0, 126, -127, 0])
+
+    def test_blocks_smaller_than_buckets(self):
+        samples = [int(32767 * math.sin(index / 3)) for index in range(1001)]
+        data = self.wav(struct.pack(f'<{len(samples)}h', *samples))
+        whole, _, _ = wav_peaks(BytesIO(data), 7, block_frames=2000)
+        self.assertEqual(len(whole), 14)
+        for block_frames in [1, 13, 143, 144, 500]:
+            peaks, _, _ = wav_peaks(BytesIO(data), 7, block_frames=block_frames)
+            self.assertEqual(peaks.tolist(), whole.tolist(), block_frames)
+
+    def test_computed_after_upload_and_served(self):
+        frames = struct.pack('<8h', 0, 16384, -32768, 0, 8192, 8192, 0, 32767)
+        with self.captureOnCommitCallbacks(execute=True):
+            demo = ToolDemo.objects.create(
+                tool=self.tool, demo_type='text-to-audio', title='Demo',
+                output_audio_file=SimpleUploadedFile('out.wav', self.wav(frames)),
+                input_audio_file=SimpleUploadedFile('in.mp3', b'ID3'),
+            )
+        response = self.client.get(f'/api/tool-demos/{demo.pk}/peaks/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            'field': 'output_audio', 'sample_rate': 8, 'duration': 1.0,
+            'buckets': 4, 'peaks': [0, 64, -127, 0, 32, 32, 0, 127],
+        })
+        self.assertEqual(self.client.get(
+            f'/api/tool-demos/{demo.pk}/peaks/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.assertEqual(self.client.get(f'/api/tool-demos/{demo.pk}/peaks/?field=input_audio').status_code, 404)
+        self.assertEqual(self.client.get(f'/api/tool-demos/{demo.pk}/peaks/?field=video').status_code, 400)
+
+        # Unchanged files are not decoded again; a removed one loses its peaks
+        self.assertEqual(compute_demo_waveforms(demo.pk), 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            demo.output_audio_file = None
+            demo.save()
+        compute_demo_waveforms(demo.pk)
+        self.assertFalse(ToolDemoWaveform.objects.filter(demo=demo).exists())
+
+
+class ViewCounterTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.posts = [make_blog_post(index) for index in range(2)]
+
+    def view(self, post):
+        return self.client.post(f'/api/blog-posts/{post.pk}/increment_views/')
+
+    def test_buffered_then_flushed_in_one_update_per_post(self):
+        post = self.posts[0]
+        updated_at = post.updated_at
+        with self.assertNumQueries(1):
+            response = self.view(post)
+        self.assertEqual(response.json(), {'id': post.pk, 'views': 1})
+        self.view(post)
+        self.assertEqual(self.view(post).json()['views'], 3)
+        self.view(self.posts[1])
+        self.assertEqual(BlogPost.objects.get(pk=post.pk).views, 0)
+
+        etag = self.client.get(f'/api/blog-posts/{post.pk}/')['ETag']
+        list_etag = self.client.get('/api/blog-posts/')['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(blog_post_views.flush(), {post.pk: 3, self.posts[1].pk: 1})
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 2)
+        self.assertNotIn('updated_at', updates[0])
+        post.refresh_from_db()
+        self.assertEqual((post.views, post.updated_at), (3, updated_at))
+        self.assertNotEqual(self.client.get(f'/api/blog-posts/{post.pk}/')['ETag'], etag)
+        # View counts alone do not invalidate the list
+        self.assertEqual(self.client.get('/api/blog-posts/')['ETag'], list_etag)
+        self.assertEqual(self.client.get('/api/blog-posts/top/').json()['results'][0]['id'], post.pk)
+        self.assertEqual(blog_post_views.flush(), {})
+
+    def test_unknown_and_unpublished(self):
+        self.assertEqual(self.client.post('/api/blog-posts/999999/increment_views/').status_code, 404)
+        BlogPost.objects.filter(pk=self.posts[0].pk).update(published=False)
+        self.assertEqual(self.view(self.posts[0]).status_code, 404)
+        self.assertEqual(blog_post_views.get_pending(self.posts[0].pk), 0)
+
+    def test_failed_write_is_retried(self):
+        writes = []
+
+        def write(deltas):
+            writes.append(deltas)
+            if len(writes) == 1:
+                raise RuntimeError('database is locked')
+
+        counter = BufferedCounter('test', write)
+        counter.add('a', 2)
+        with self.assertRaises(RuntimeError):
+            counter.flush()
+        counter.add('a')
+        counter.flush()
+        self.assertEqual(writes, [{'a': 2}, {'a': 3}])
+
+    def test_buffers_must_say_how_values_combine(self):
+        with self.assertRaises(TypeError):
+            WriteBehindBuffer('test', print)
+
+    @override_settings(COUNTER_FLUSH_BACKGROUND=True, COUNTER_FLUSH_INTERVAL=0)
+    def test_due_flush_is_handed_to_the_flusher(self):
+        post = self.posts[0]
+        with mock.patch('api.counters.start_flusher') as start, mock.patch.object(blog_post_views, 'flush') as flush:
+            with self.assertNumQueries(1):
+                self.view(post)
+        start.assert_called()
+        flush.assert_not_called()
+        self.assertTrue(flush_due.is_set())
+        flush_due.clear()
+        self.assertEqual(blog_post_views.get_pending(post.pk), 1)
+
+    @override_settings(COUNTER_FLUSH_INTERVAL=0)
+    def test_failed_inline_flush_does_not_fail_the_request(self):
+        post = self.posts[0]
+        with mock.patch.object(blog_post_views, 'write', side_effect=OperationalError('database is locked')):
+            with self.assertLogs('api.counters', 'ERROR'):
+                response = self.view(post)
+        self.assertEqual(response.json(), {'id': post.pk, 'views': 1})
+        self.assertEqual(blog_post_views.get_pending(post.pk), 1)
+        blog_post_views.flush()
+        self.assertEqual(BlogPost.objects.get(pk=post.pk).views, 1)
+
+
+class ViewStatsTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post = make_blog_post(0)
+            self.tool = make_tool(0, demos=0)
+
+    def stats(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def add(self, day, views, period='day', kind='blog-post'):
+        ViewStat.objects.create(kind=kind, object_id=self.post.pk, period=period, start=date.fromisoformat(day), views=views)
+
+    def test_views_counted_by_day(self):
+        for _ in range(2):
+            self.client.post(f'/api/blog-posts/{self.post.pk}/increment_views/')
+        etag = self.client.get(f'/api/tools/{self.tool.pk}/')['ETag']
+        self.client.get(f'/api/tools/{self.tool.pk}/', HTTP_IF_NONE_MATCH=etag)
+        self.client.get('/api/tools/999999/')
+        self.assertFalse(ViewStat.objects.exists())
+        daily_views.flush()
+
+        today = timezone.localdate().isoformat()
+        data = self.stats(f'/api/blog-posts/{self.post.pk}/stats/')
+        self.assertEqual((data['total'], len(data['series'])), (2, 30))
+        self.assertEqual(data['series'][-1], {'start': today, 'views': 2})
+        data = self.stats(f'/api/tools/{self.tool.pk}/stats/', start=today)
+        self.assertEqual(data['series'], [{'start': today, 'views': 2}])
+        self.assertEqual(ViewStat.objects.count(), 2)
+
+        # Later flushes add onto the same row
+        self.client.post(f'/api/blog-posts/{self.post.pk}/increment_views/')
+        daily_views.flush()
+        self.assertEqual(ViewStat.objects.get(kind='blog-post').views, 3)
+
+    @override_settings(COUNTER_FLUSH_INTERVAL=0)
+    def test_failed_view_recording_does_not_fail_the_read(self):
+        with mock.patch.object(daily_views, 'write', side_effect=OperationalError('database is locked')):
+            with self.assertLogs('api.counters', 'ERROR'):
+                response = self.client.get(f'/api/tools/{self.tool.pk}/')
+        self.assertEqual((response.status_code, response.json()['id']), (200, self.tool.pk))
+        with mock.patch('api.views.record_view', side_effect=RuntimeError('broken')):
+            with self.assertLogs('api.views', 'ERROR'):
+                self.assertEqual(self.client.get(f'/api/tools/{self.tool.pk}/').status_code, 200)
+        # The failed batch is still pending
+        flush_counters()
+        self.assertEqual(ViewStat.objects.get(kind='tool', object_id=self.tool.pk).views, 1)
+
+    def test_weekly_and_monthly_rollups(self):
+        for day, views in [('2026-03-01', 1), ('2026-03-02', 2), ('2026-03-08', 4), ('2026-03-09', 8), ('2026-04-01', 16)]:
+            self.add(day, views)
+        self.add('2026-02-01', 32, period='month')
+        url = f'/api/blog-posts/{self.post.pk}/stats/'
+        data = self.stats(url, start='2026-03-02', end='2026-03-15', interval='week')
+        self.assertEqual(data['series'], [{'start': '2026-03-02', 'views': 6}, {'start': '2026-03-09', 'views': 8}])
+        data = self.stats(url, start='2026-02-01', end='2026-04-30', interval='month')
+        self.assertEqual([bucket['views'] for bucket in data['series']], [32, 15, 16])
+        self.assertEqual(data['total'], 63)
+
+    def test_downsampling_keeps_monthly_totals(self):
+        for day, views in [('2025-01-05', 1), ('2025-01-20', 2), ('2025-02-03', 4), ('2026-10-01', 8)]:
+            self.add(day, views)
+        self.add('2025-01-01', 16, period='month')
+        self.add('2020-01-01', 32, period='month')
+        with self.settings(VIEW_STATS_DAILY_DAYS=180, VIEW_STATS_MONTHLY_MONTHS=60):
+            self.assertEqual(downsample_view_stats(today=date(2026, 10, 18)), (3, 1))
+        rows = ViewStat.objects.order_by('start').values_list('period', 'start', 'views')
+        self.assertEqual([(period, start.isoformat(), views) for period, start, views in rows], [
+            ('month', '2025-01-01', 19), ('month', '2025-02-01', 4), ('day', '2026-10-01', 8),
+        ])
+
+    def test_bad_requests(self):
+        url = f'/api/blog-posts/{self.post.pk}/stats/'
+        self.assertEqual(self.client.get(url, {'start': 'yesterday'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'interval': 'hour'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'start': '2026-02-01', 'end': '2026-01-01'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/blog-posts/999999/stats/').status_code, 404)
+
+
+class VisitorSketchTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post = make_blog_post(0)
+
+    def sketch(self, visitors):
+        sketch = HyperLogLog()
+        sketch.add_hashes([hash_visitor(visitor) for visitor in visitors])
+        return sketch
+
+    def test_estimates_and_merges(self):
+        self.assertEqual(HyperLogLog().count(), 0)
+        self.assertEqual(self.sketch(['a', 'b', 'a']).count(), 2)
+        for size in [1000, 50000]:
+            estimate = self.sketch(range(size)).count()
+            self.assertLess(abs(estimate - size) / size, 0.05, (size, estimate))
+        first, second = self.sketch(range(0, 3000)), self.sketch(range(2000, 5000))
+        restored = HyperLogLog(first.tobytes())
+        self.assertEqual(len(first.tobytes()), 4096)
+        self.assertLess(abs(restored.merge(second).count() - 5000) / 5000, 0.05)
+
+    def test_unique_visitors_from_views(self):
+        url = f'/api/blog-posts/{self.post.pk}/increment_views/'
+        for address, agent in [('10.0.0.1', 'a'), ('10.0.0.1', 'a'), ('10.0.0.1', 'b'), ('10.0.0.2', 'a')]:
+            self.client.post(url, REMOTE_ADDR=address, HTTP_USER_AGENT=agent)
+        flush_counters()
+        self.client.post(url, REMOTE_ADDR='10.0.0.2', HTTP_USER_AGENT='a')
+        flush_counters()
+        self.assertEqual(VisitorSketch.objects.filter(object_id=self.post.pk).count(), 2)
+        data = self.client.get(f'/api/blog-posts/{self.post.pk}/stats/').json()
+        self.assertEqual((data['total'], data['unique_visitors'], data['unique_visitors_all_time']), (5, 3, 3))
+
+    def test_downsampling_merges_days_into_months(self):
+        for day, visitors in [('2025-01-05', ['a', 'b']), ('2025-01-20', ['b', 'c']), ('2026-10-01', ['d'])]:
+            VisitorSketch.objects.create(
+                kind='blog-post', object_id=self.post.pk, start=date.fromisoformat(day),
+                registers=self.sketch(visitors).tobytes(),
+            )
+        self.assertEqual(downsample_visitor_sketches(today=date(2026, 10, 18)), (2, 0))
+        month = VisitorSketch.objects.get(period='month')
+        self.assertEqual((month.start, HyperLogLog(month.registers).count()), (date(2025, 1, 1), 3))
+        data = self.client.get(f'/api/blog-posts/{self.post.pk}/stats/', {'start': '2025-01-10', 'end': '2026-10-18'}).json()
+        self.assertEqual(data['unique_visitors'], 4)
+
+
+class EventTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.log_dir = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.log_dir, 'events.log')
+        self.settings = override_settings(EVENT_LOG_PATH=self.log_path, EVENTS_BACKGROUND=False)
+        self.settings.enable()
+        self.tool = make_tool(1, demos=1)
+        self.demo = self.tool.demos.get()
+
+    def tearDown(self):
+        self.settings.disable()
+        shutil.rmtree(self.log_dir)
+
+    def read_log(self):
+        with open(self.log_path) as log:
+            return [json.loads(line) for line in log]
+
+    def test_batch_logged_and_counted_without_database_writes(self):
+        events = [
+            {'type': 'tool_click', 'id': self.tool.pk, 'ts': 1700000000000},
+            {'type': 'demo_play', 'id': self.demo.pk},
+            {'type': 'demo_play', 'id': str(self.demo.pk)},
+            {'type': 'unknown', 'id': 1},
+            {'type': 'tool_click', 'id': -1},
+            {'type': 'tool_click', 'id': 99999},
+            'junk',
+        ]
+        with self.assertNumQueries(0):
+            response = self.client.post('/api/events/', events, format='json')
+        self.assertEqual((response.status_code, response.json()), (202, {'accepted': 4}))
+        log = self.read_log()
+        self.assertEqual([(entry['type'], entry['id']) for entry in log], [
+            ('tool_click', self.tool.pk), ('demo_play', self.demo.pk),
+            ('demo_play', self.demo.pk), ('tool_click', 99999),
+        ])
+        self.assertEqual(log[0]['ts'], 1700000000000)
+        self.assertFalse(EventCount.objects.exists())
+
+        today = timezone.localdate()
+        self.assertEqual(event_counts.flush(), {
+            ('tool_click', self.tool.pk, today): 1, ('demo_play', self.demo.pk, today): 2, ('tool_click', 99999, today): 1,
+        })
+        self.client.post('/api/events/', {'events': [{'type': 'demo_play', 'id': self.demo.pk}]}, format='json')
+        event_counts.flush()
+        counts = {(row.event, row.object_id): row.count for row in EventCount.objects.all()}
+        self.assertEqual(counts, {('tool_click', self.tool.pk): 1, ('demo_play', self.demo.pk): 3})
+
+    def test_send_beacon_payload(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer not-a-token')
+        response = self.client.post(
+            '/api/events/', json.dumps([{'type': 'tool_click', 'id': self.tool.pk}]), content_type='text/plain;charset=UTF-8',
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(len(self.read_log()), 1)
+
+    def test_rejects_non_batches(self):
+        for body in [{'type': 'tool_click', 'id': 1}, 'text']:
+            response = self.client.post('/api/events/', body, format='json')
+            self.assertEqual(response.status_code, 400)
+        self.assertFalse(os.path.exists(self.log_path))
+
+    @override_settings(COUNTER_FLUSH_INTERVAL=0)
+    def test_failed_flush_keeps_the_rest_of_the_batch(self):
+        events = [{'type': 'tool_click', 'id': self.tool.pk}, {'type': 'demo_play', 'id': self.demo.pk}] * 2
+        with mock.patch.object(event_counts, 'write', side_effect=OperationalError('database is locked')):
+            with self.assertLogs('api.counters', 'ERROR'):
+                response = self.client.post('/api/events/', events, format='json')
+        self.assertEqual(response.json(), {'accepted': 4})
+        today = timezone.localdate()
+        self.assertEqual(event_counts.get_pending(('tool_click', self.tool.pk, today)), 2)
+        self.assertEqual(event_counts.get_pending(('demo_play', self.demo.pk, today)), 2)
+        event_counts.flush()
+        self.assertEqual(sorted(EventCount.objects.values_list('count', flat=True)), [2, 2])
+
+    @override_settings(EVENTS_MAX_BATCH=2)
+    def test_batch_size_capped(self):
+        events = [{'type': 'tool_click', 'id': self.tool.pk}] * 5
+        self.assertEqual(self.client.post('/api/events/', events, format='json').json(), {'accepted': 2})
+
+
+class BlogPostRenderingTests(ApiTestCase):
+    content = (
+        '# Getting started\n\n'
+        'Install the **tool** and read [the docs](https://example.com "Docs").\n\n'
+        '## Getting started\n\n'
+        '- one\n- two\n\n'
+        '```python\nprint("<hi>")\n```\n'
+    )
+
+    def test_rendered_on_save(self):
+        post = make_blog_post(1)
+        post.content = self.content
+        post.content_ge = '## შესავალი\n\n' + 'სიტყვა ' * 450
+        post.save()
+        post.refresh_from_db()
+        self.assertEqual(post.content_html, (
+            '<h1 id="getting-started">Getting started</h1>\n'
+            '<p>Install the <strong>tool</strong> and read <a href="https://example.com" title="Docs" rel="noopener noreferrer">the docs</a>.</p>\n'
+            '<h2 id="getting-started-1">Getting started</h2>\n'
+            '<ul>\n<li>one</li>\n<li>two</li>\n</ul>\n'
+            '<pre><code class="language-python">print("&lt;hi&gt;")\n</code></pre>'
+        ))
+        self.assertEqual(post.toc, [
+            {'level': 1, 'id': 'getting-started', 'title': 'Getting started'},
+            {'level': 2, 'id': 'getting-started-1', 'title': 'Getting started'},
+        ])
+        self.assertEqual((post.word_count, post.read_time), (15, 1))
+        self.assertEqual(post.toc_ge, [{'level': 2, 'id': 'შესავალი', 'title': 'შესავალი'}])
+        self.assertEqual((post.word_count_ge, post.read_time_ge), (451, 3))
+
+    def test_html_is_sanitized(self):
+        post = make_blog_post(1)
+        post.content = (
+            '<script>alert(1)</script> <img src=x onerror=alert(1)>\n\n'
+            '[a](javascript:alert%281%29) [b](&#106;avascript:x) ![c](data:text/html,x) [d](/ok "x\\" onclick=\\"y")'
+        )
+        post.save()
+        self.assertNotIn('<script', post.content_html)
+        self.assertNotIn('<img', post.content_html)
+        self.assertNotIn('onclick="', post.content_html)
+        # Links with unsafe targets stay plain text
+        self.assertNotIn('href="javascript', post.content_html)
+        self.assertNotIn('src="data', post.content_html)
+        self.assertIn('&lt;script&gt;', post.content_html)
+
+    def test_hostile_input_is_bounded(self):
+        post = make_blog_post(1)
+        for content in [
+            '>' * 3000 + ' x',
+            ''.join('  ' * depth + '- x\n' for depth in range(500)),
+            '_a ' * 20000,
+            '*a **b' * 10000,
+            '[a](' * 20000,
+        ]:
+            started = time.monotonic()
+            post.content = content
+            post.save()
+            self.assertLess(time.monotonic() - started, 5, content[:20])
+
+    def test_saves_without_content_skip_rendering(self):
+        post = make_blog_post(1)
+        self.assertEqual((post.content_html, post.word_count, post.read_time_ge), ('<p>Content 1</p>', 2, None))
+        BlogPost.objects.filter(pk=post.pk).update(content='# Changed')
+        post.refresh_from_db()
+        post.published = False
+        post.save(update_fields=['published'])
+        post.refresh_from_db()
+        self.assertEqual(post.content_html, '<p>Content 1</p>')
+        call_command('render_blog_posts', stdout=StringIO())
+        post.refresh_from_db()
+        self.assertEqual(post.content_html, '<h1 id="changed">Changed</h1>')
+
+    def test_served_read_only(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            post = make_blog_post(1)
+        data = self.client.get(f'/api/blog-posts/{post.pk}/').json()
+        self.assertEqual((data['content_html'], data['toc'], data['word_count'], data['read_time']), ('<p>Content 1</p>', [], 2, 1))
+        user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_authenticate(user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                f'/api/blog-posts/{post.pk}/', {'content': '## New', 'read_time': 99, 'content_html': '<script>'}, format='json',
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()['content_html'], response.json()['read_time']), ('<h2 id="new">New</h2>', 1))
+
+    def test_georgian_scope_falls_back_with_content(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            english = make_blog_post(1)
+            georgian = make_blog_post(2)
+            georgian.content_ge = '## სათაური\n\nერთი ორი სამი'
+            georgian.save()
+        for lang in ['ge', 'en']:
+            response = self.client.get('/api/blog-posts/', {'lang': lang})
+            self.assertEqual(response.status_code, 200)
+        rows = {row['id']: row for row in self.client.get('/api/blog-posts/', {'lang': 'ge'}).json()['results']}
+        fields = ['content_html', 'toc', 'word_count', 'read_time']
+        self.assertEqual([rows[english.pk][name] for name in fields], ['<p>Content 1</p>', [], 2, 1])
+        self.assertEqual([rows[georgian.pk][name] for name in fields], [
+            '<h2 id="სათაური">სათაური</h2>\n<p>ერთი ორი სამი</p>',
+            [{'level': 2, 'id': 'სათაური', 'title': 'სათაური'}], 4, 1,
+        ])
+        for post in [english, georgian]:
+            data = self.client.get(f'/api/blog-posts/{post.pk}/', {'lang': 'ka'}).json()
+            self.assertEqual([data[name] for name in fields], [rows[post.pk][name] for name in fields])
+            self.assertNotIn('toc_ge', data)
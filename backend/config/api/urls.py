@@ -2,7 +2,7 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     ToolViewSet, ToolDemoViewSet, KeyFeatureViewSet, ProViewSet, ConViewSet, UsageStepViewSet,
-    BlogPostViewSet, BlogPostImageViewSet, NewsViewSet, AuthorViewSet, LoginView
+    BlogPostViewSet, BlogPostImageViewSet, NewsViewSet, AuthorViewSet, EventView, LoginView
 )
 
 router = DefaultRouter()
@@ -24,4 +24,5 @@ router.register(r'authors', AuthorViewSet, basename='author')
 urlpatterns = [
     path('', include(router.urls)),
     path('auth/login/', LoginView.as_view(), name='login'),
+    path('events/', EventView.as_view(), name='events'),
 ]
\ No newline at end of file
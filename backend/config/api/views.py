@@ -1,78 +1,623 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticatedOrReadOnly, AllowAny
+from rest_framework.permissions import IsAuthenticatedOrReadOnly, AllowAny, SAFE_METHODS
 from rest_framework.filters import SearchFilter, OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.views import APIView
+from rest_framework.parsers import JSONParser
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
+import hashlib
+import json
+import logging
+from datetime import date, timedelta
+
+import numpy as np
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, F, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 
 from .models import (
     Tool, ToolDemo, KeyFeature, Pro, Con, UsageStep,
-    BlogPost, BlogPostImage, News, Author
+    BlogPost, BlogPostImage, News, Author, ToolDemoWaveform
 )
 from .serializers import (
-    ToolSerializer, ToolDemoSerializer, KeyFeatureSerializer,
+    ToolSerializer, ToolListSerializer, ToolDemoSerializer, KeyFeatureSerializer,
     ProSerializer, ConSerializer, UsageStepSerializer,
-    BlogPostSerializer, BlogPostImageSerializer, NewsSerializer, AuthorSerializer
+    BlogPostSerializer, BlogPostImageSerializer, NewsSerializer, AuthorSerializer,
+    CONTENT_LANGUAGES, get_request_language
 )
+from .analytics import INTERVALS, MAX_RANGE_DAYS, get_view_series, record_view
+from .cache import generation_datetime, get_generation, normalized_query_string
+from .counters import blog_post_views
+from .documents import get_tool_document
+from .events import parse_events, record_events
+from .leaderboards import BLOG_POST_LEADERBOARDS, TOOL_LEADERBOARDS
+from .pagination import KeysetPagination
+from .search import RankedOrderingFilter, ToolSearchFilter
+from .similarity import IndexNotReady, similarity_index
+from .sketches import estimate_visitors, get_visitor_id
+from .waveforms import AUDIO_FIELDS
 from .permissions import IsAdminOrReadOnly, IsAuthorOrAdmin
 
 
+logger = logging.getLogger(__name__)
+
+
+# ==================== SPARSE FIELDSET MIXIN ====================
+
+class SparseFieldsetMixin:
+    """
+    Shape the queryset to the serializer fields requested with ?fields= / ?expand=
+    and ?lang=. Only the needed columns (of one language) are loaded, and
+    prefetches and annotations are applied only for fields that will be rendered.
+    """
+    prefetch_fields = {}
+    annotate_fields = {}
+
+    def get_prefetch_fields(self):
+        return self.prefetch_fields
+
+    def get_annotate_fields(self):
+        return self.annotate_fields
+
+    def get_requested_fields(self):
+        if self.request is None or self.request.method not in SAFE_METHODS:
+            return None
+        serializer_class = self.get_serializer_class()
+        if not hasattr(serializer_class, 'get_requested_fields'):
+            return None
+        return serializer_class.get_requested_fields(self.request)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        serializer_class = self.get_serializer_class()
+        prefetches = self.get_prefetch_fields()
+        annotations = self.get_annotate_fields()
+        requested = self.get_requested_fields()
+        language = get_request_language(self.request)
+        if requested is not None:
+            prefetches = {name: lookup for name, lookup in prefetches.items() if name in requested}
+            annotations = {name: expr for name, expr in annotations.items() if name in requested}
+            queryset = queryset.only(*serializer_class.get_source_columns(requested))
+        if language is not None and hasattr(serializer_class, 'localize_queryset'):
+            queryset = serializer_class.localize_queryset(queryset, language, requested)
+            prefetches = {
+                name: self.localize_prefetch(serializer_class, name, lookup, language)
+                for name, lookup in prefetches.items()
+            }
+        if prefetches:
+            queryset = queryset.prefetch_related(*prefetches.values())
+        if annotations:
+            queryset = queryset.annotate(**annotations)
+        return queryset
+
+    def localize_prefetch(self, serializer_class, name, lookup, language):
+        """Rebuild a prefetch so the nested rows load one language too"""
+        if isinstance(lookup, str):
+            lookup = Prefetch(lookup)
+        child_class = type(serializer_class._declared_fields[name].child)
+        queryset = lookup.queryset
+        if queryset is None:
+            queryset = child_class.Meta.model._default_manager.all()
+        return Prefetch(
+            lookup.prefetch_through,
+            queryset=child_class.localize_queryset(queryset, language),
+            to_attr=lookup.to_attr,
+        )
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        language = get_request_language(request)
+        if language is not None:
+            response['Content-Language'] = CONTENT_LANGUAGES[language]
+        return response
+
+
+# ==================== CONDITIONAL GET MIXIN ====================
+
+class EarlyResponse(Exception):
+    """Carries a finished response (304, cache hit) out of initial() before the handler runs"""
+
+    def __init__(self, response):
+        self.response = response
+
+
+def get_representation_key(request):
+    """Everything besides the data that a read response depends on"""
+    return '|'.join(str(part) for part in [
+        request.path, normalized_query_string(request),
+        request.build_absolute_uri('/'), get_request_language(request),
+        request.accepted_renderer.format,
+    ])
+
+
+class ConditionalGetMixin:
+    """
+    ETag and Last-Modified validators for list and retrieve. They are checked
+    before the handler runs, so a matching If-None-Match / If-Modified-Since
+    gets a 304 without touching the serializer. Detail validators come from the
+    object's own generation when the viewset keeps object_generations, else
+    from the row's validator_field (one indexed lookup); lists, batches, and
+    models without a timestamp, use the change generation of generation_group.
+    An object generation is only started once a retrieve has found the object,
+    so lookups of ids that do not exist never create cache keys; that first
+    response goes without validators.
+    """
+    generation_group = None
+    object_generations = False
+    validator_field = 'updated_at'
+
+    def get_object_generation_name(self):
+        return f'{self.generation_group}:{self.kwargs[self.lookup_url_kwarg or self.lookup_field]}'
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.validators = None
+        if request.method not in ('GET', 'HEAD') or self.action not in ['list', 'retrieve', 'batch']:
+            return
+        self.validators = self.get_validators(request)
+        if self.validators is None:
+            return
+        etag, last_modified = self.validators
+        response = get_conditional_response(request, etag=etag, last_modified=int(last_modified.timestamp()))
+        if response is not None:
+            raise EarlyResponse(response)
+
+    def get_validators(self, request):
+        if self.action == 'retrieve' and self.object_generations:
+            version = get_generation(self.get_object_generation_name(), create=False)
+            if version is None:
+                return None
+            last_modified = generation_datetime(version)
+        elif self.action == 'retrieve' and self.validator_field:
+            lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+            try:
+                last_modified = self.queryset.filter(**{self.lookup_field: lookup}).values_list(
+                    self.validator_field, flat=True
+                ).first()
+            except (ValueError, ValidationError):
+                return None
+            if last_modified is None:
+                return None
+            version = last_modified.isoformat()
+        elif self.generation_group is not None:
+            version = get_generation(self.generation_group)
+            last_modified = generation_datetime(version)
+        else:
+            return None
+        key = f'{version}|{get_representation_key(request)}'
+        return quote_etag(hashlib.md5(key.encode()).hexdigest()), last_modified
+
+    def handle_exception(self, exc):
+        if isinstance(exc, EarlyResponse):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        validators = getattr(self, 'validators', None)
+        if validators is not None and response.status_code in (200, 304):
+            etag, last_modified = validators
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        elif self.object_generations and self.action == 'retrieve' and response.status_code == 200:
+            get_generation(self.get_object_generation_name())
+        return response
+
+
+# ==================== RESPONSE CACHE MIXIN ====================
+
+class ResponseCacheMixin:
+    """
+    Cache rendered list, batch and retrieve responses. Keys embed the generation
+    of generation_group (lists, batches) or of the object itself (detail, which
+    requires object_generations); signals bump
+    both after every write to the model or its inline children, so a cached
+    entry is never served stale. Staff requests bypass the cache entirely so
+    editors always see their changes.
+    """
+    cache_responses = False
+    response_cache_timeout = getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 3600)
+    cached_headers = ('Content-Type', 'Content-Language')
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.response_cache_key = self.get_response_cache_key(request)
+        self.response_cache_hit = False
+        if self.response_cache_key is None:
+            return
+        cached = cache.get(self.response_cache_key)
+        if cached is not None:
+            content, headers = cached
+            self.response_cache_hit = True
+            raise EarlyResponse(HttpResponse(content, headers=headers))
+
+    def get_response_cache_key(self, request):
+        if not self.cache_responses or request.method not in ('GET', 'HEAD'):
+            return None
+        if self.action not in ['list', 'retrieve', 'batch'] or request.user.is_staff:
+            return None
+        if self.action == 'retrieve':
+            # Started by ConditionalGetMixin once the object has been found
+            generation = self.get_object_generation_name()
+            version = get_generation(generation, create=False)
+            if version is None:
+                return None
+        else:
+            generation = self.generation_group
+            version = get_generation(generation)
+        digest = hashlib.md5(get_representation_key(request).encode()).hexdigest()
+        return f'api:response:{generation}:{version}:{digest}'
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        key = getattr(self, 'response_cache_key', None)
+        if key and not self.response_cache_hit and request.method == 'GET' and response.status_code == 200:
+            if hasattr(response, 'render'):
+                response.render()
+            headers = {name: response[name] for name in self.cached_headers if name in response}
+            cache.set(key, (response.content, headers), self.response_cache_timeout)
+        return response
+
+
+# ==================== BATCH RETRIEVE MIXIN ====================
+
+class BatchRetrieveMixin:
+    """
+    GET .../batch/?ids=1,2,3 returns many detail representations in one
+    response, keyed by lookup value in request order. The detail queryset
+    (prefetches, ?fields=, ?expand=, ?lang=) is shared, so a batch costs the
+    same fixed number of queries as a single retrieve.
+    """
+    batch_lookup_field = 'pk'
+    batch_query_param = 'ids'
+    max_batch_size = getattr(settings, 'MAX_BATCH_SIZE', 50)
+
+    @action(detail=False, methods=['get'])
+    def batch(self, request):
+        values = request.query_params.get(self.batch_query_param, '')
+        values = list(dict.fromkeys(value.strip() for value in values.split(',') if value.strip()))
+        if not values:
+            return Response(
+                {'error': f'{self.batch_query_param} parameter required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(values) > self.max_batch_size:
+            return Response(
+                {'error': f'At most {self.max_batch_size} {self.batch_query_param} per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        opts = self.queryset.model._meta
+        field = opts.pk if self.batch_lookup_field == 'pk' else opts.get_field(self.batch_lookup_field)
+        try:
+            lookups = {value: field.to_python(value) for value in values}
+        except ValidationError:
+            return Response(
+                {'error': f'Invalid {self.batch_query_param}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        queryset = self.get_queryset().filter(**{f'{field.attname}__in': list(lookups.values())})
+        found = {getattr(obj, field.attname): obj for obj in queryset}
+        objects = [(value, found[lookup]) for value, lookup in lookups.items() if lookup in found]
+        serializer = self.get_serializer([obj for _, obj in objects], many=True)
+        return Response({
+            'results': {value: data for (value, _), data in zip(objects, serializer.data)},
+            'missing': [value for value, lookup in lookups.items() if lookup not in found],
+        })
+
+
+# ==================== LEADERBOARD MIXIN ====================
+
+def get_limit(request, default=10):
+    try:
+        return max(int(request.query_params.get('limit', default)), 1)
+    except ValueError:
+        return default
+
+
+class LeaderboardMixin:
+    """Render a leaderboard slice: its ids are loaded in one query, in board order"""
+
+    def get_leaderboard_response(self, entries):
+        objects = self.get_queryset().order_by().in_bulk([pk for _, pk in entries])
+        serializer = self.get_serializer([objects[pk] for _, pk in entries if pk in objects], many=True)
+        return Response({'results': serializer.data})
+
+
+class ViewStatsMixin:
+    """
+    /{id}/stats/ time series from the view analytics table, with unique
+    visitor estimates from the HyperLogLog sketches. With count_retrieve_views,
+    every successful detail GET (including 304s) is counted as a view of the
+    object.
+    """
+    stats_kind = None
+    count_retrieve_views = False
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if (self.count_retrieve_views and getattr(self, 'action', None) == 'retrieve'
+                and request.method == 'GET' and response.status_code in (200, 304)):
+            try:
+                record_view(self.stats_kind, int(self.kwargs['pk']), get_visitor_id(request))
+            except Exception:
+                # Past handle_exception here; analytics must never fail the read it counts
+                logger.exception('Recording a %s view failed', self.stats_kind)
+        return response
+
+    @action(detail=True, methods=['get'])
+    def stats(self, request, pk=None):
+        """Views per ?interval=day|week|month between ?start= and ?end= (ISO dates, default the last 30 days)"""
+        if not pk.isdigit() or not self.queryset.filter(pk=pk).exists():
+            raise NotFound()
+        interval = request.query_params.get('interval', 'day')
+        try:
+            end = date.fromisoformat(request.query_params['end']) if 'end' in request.query_params else timezone.localdate()
+            start = date.fromisoformat(request.query_params['start']) if 'start' in request.query_params else end - timedelta(days=29)
+        except ValueError:
+            return Response({'error': 'start and end must be YYYY-MM-DD dates'}, status=status.HTTP_400_BAD_REQUEST)
+        if interval not in INTERVALS:
+            return Response({'error': f'interval must be one of {", ".join(INTERVALS)}'}, status=status.HTTP_400_BAD_REQUEST)
+        if not 0 <= (end - start).days < MAX_RANGE_DAYS:
+            return Response({'error': f'start must be before end, at most {MAX_RANGE_DAYS} days apart'}, status=status.HTTP_400_BAD_REQUEST)
+        series = get_view_series(self.stats_kind, int(pk), start, end, interval)
+        return Response({
+            'id': int(pk), 'interval': interval, 'start': start, 'end': end,
+            'total': sum(bucket['views'] for bucket in series),
+            'unique_visitors': estimate_visitors(self.stats_kind, int(pk), start, end),
+            'unique_visitors_all_time': estimate_visitors(self.stats_kind, int(pk)),
+            'series': series,
+        })
+
+
 # ==================== TOOL VIEWSETS ====================
 
-class ToolViewSet(viewsets.ModelViewSet):
+def count_tool_children(model):
+    """
+    Correlated COUNT of a tool's child rows. Unlike joined Count() annotations
+    this needs no GROUP BY, so it composes with the FTS5 rank in search results.
+    """
+    children = model.objects.filter(tool=OuterRef('pk')).order_by().values('tool')
+    return Coalesce(Subquery(children.annotate(count=Count('pk')).values('count')), 0)
+
+
+class ToolViewSet(ViewStatsMixin, LeaderboardMixin, BatchRetrieveMixin, ResponseCacheMixin, ConditionalGetMixin,
+                  SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = Tool.objects.all()
     serializer_class = ToolSerializer
+    generation_group = 'tools'
+    object_generations = True
+    stats_kind = 'tool'
+    count_retrieve_views = True
+    cache_responses = True
     permission_classes = [IsAdminOrReadOnly]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, ToolSearchFilter, RankedOrderingFilter]
     filterset_fields = ['category', 'pricing', 'difficulty']
+    # LIKE fallback when the FTS5 index is unavailable
     search_fields = ['name', 'description', 'category']
     ordering_fields = ['created_at', 'rating', 'name']
-    ordering = ['-created_at']
+    ordering = ['-created_at', '-id']
+    pagination_class = KeysetPagination
+    # Actions rendered with the slim ToolListSerializer
+    list_actions = ['list', 'similar', 'top']
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in self.list_actions and self.get_requested_fields() is None:
+            queryset = queryset.defer('overview', 'overview_ge', 'description_ge')
+        return queryset
+
+    def get_prefetch_fields(self):
+        """Prefetch nested relations for detail so it costs a fixed number of queries"""
+        if self.action not in ['retrieve', 'batch']:
+            return {}
+        return {
+            'key_features': 'key_features',
+            'pros': 'pros',
+            'cons': 'cons',
+            'usage_steps': 'usage_steps',
+            'demos': Prefetch('demos', queryset=ToolDemo.objects.order_by('order', 'created_at')),
+        }
+
+    def get_annotate_fields(self):
+        """Counts for the slim list representation"""
+        if self.action not in self.list_actions:
+            return {}
+        return {
+            'demo_count': count_tool_children(ToolDemo),
+            'feature_count': count_tool_children(KeyFeature),
+            'pro_count': count_tool_children(Pro),
+            'con_count': count_tool_children(Con),
+        }
+
+    def get_serializer_class(self):
+        if self.action in self.list_actions:
+            return ToolListSerializer
+        return super().get_serializer_class()
+
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """
+        Counts for every category, pricing and difficulty value under the current
+        search and filters. Each facet ignores its own filter so the sidebar can
+        offer alternatives; all three come from one GROUP BY query.
+        """
+        facet_fields = ['category', 'pricing', 'difficulty']
+        selected = {name: request.query_params.get(name) for name in facet_fields}
+        search = request.query_params.get(ToolSearchFilter.search_param, '')
+        # Search text is unbounded and free-form, so it only enters the key hashed
+        digest = hashlib.md5(json.dumps([search] + [selected[name] for name in facet_fields]).encode()).hexdigest()
+        key = f"api:tool-facets:{get_generation('tools')}:{digest}"
+        data = cache.get(key)
+        if data is None:
+            queryset = ToolSearchFilter().filter_unranked(request, Tool.objects.all(), self)
+            rows = queryset.order_by().values(*facet_fields).annotate(count=Count('id'))
+            data = {}
+            for name in facet_fields:
+                counts = {}
+                for row in rows:
+                    if all(not selected[other] or row[other] == selected[other]
+                           for other in facet_fields if other != name):
+                        counts[row[name]] = counts.get(row[name], 0) + row['count']
+                choices = Tool._meta.get_field(name).choices
+                data[name] = [
+                    {'value': value, 'label': label, 'count': counts.get(value, 0)}
+                    for value, label in choices
+                ]
+            cache.set(key, data, getattr(settings, 'FACET_CACHE_TIMEOUT', 3600))
+        return Response(data)
+
+    @action(detail=True, methods=['get'])
+    def similar(self, request, pk=None):
+        """
+        Most similar tools by text, category, pricing and demo types, best
+        first, from the in-memory neighbour index (?limit= up to its k).
+        503 while a newly started process is still building the index.
+        """
+        limit = get_limit(request, similarity_index.k)
+        try:
+            neighbours = similarity_index.similar(int(pk), limit) if pk.isdigit() else None
+        except IndexNotReady:
+            return Response(
+                {'error': 'Similar tools are still being computed'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={'Retry-After': '5'},
+            )
+        if neighbours is None:
+            raise NotFound()
+        tools = self.get_queryset().order_by().in_bulk([tool_id for tool_id, _ in neighbours])
+        neighbours = [(tools[tool_id], score) for tool_id, score in neighbours if tool_id in tools]
+        serializer = self.get_serializer([tool for tool, _ in neighbours], many=True)
+        results = []
+        for data, (_, score) in zip(serializer.data, neighbours):
+            data['similarity'] = round(score, 4)
+            results.append(data)
+        return Response({'results': results})
+
+    @action(detail=False, methods=['get'])
+    def top(self, request):
+        """Highest rated tools overall, or within one ?category= or ?pricing=, from the leaderboards"""
+        partitions = {name: request.query_params.get(name) for name in ['category', 'pricing']}
+        partitions = {name: value for name, value in partitions.items() if value}
+        if len(partitions) > 1:
+            return Response(
+                {'error': 'Filter by category or pricing, not both'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        board = {board.partition: board for board in TOOL_LEADERBOARDS}[next(iter(partitions), None)]
+        partition = partitions.get(board.partition)
+        if partition not in board.get_partitions():
+            return Response(
+                {'error': f'Unknown {board.partition}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return self.get_leaderboard_response(board.top(partition, get_limit(request)))
+
+    def retrieve(self, request, *args, **kwargs):
+        """Serve the materialized document when the full default shape is requested"""
+        pk = str(kwargs.get(self.lookup_field, ''))
+        if pk.isdigit() and self.get_requested_fields() is None and request.accepted_renderer.format == 'json':
+            language = get_request_language(request) or 'all'
+            origin = request.build_absolute_uri('/').rstrip('/')
+            body = get_tool_document(int(pk), language, origin)
+            if body is not None:
+                return HttpResponse(body, content_type='application/json')
+        return super().retrieve(request, *args, **kwargs)
 
 
 # ==================== TOOL DEMO VIEWSETS ====================
 
-class ToolDemoViewSet(viewsets.ModelViewSet):
+class ToolDemoViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = ToolDemo.objects.all()
     serializer_class = ToolDemoSerializer
+    generation_group = 'tools'
     permission_classes = [IsAdminOrReadOnly]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['tool', 'demo_type']
     search_fields = ['title', 'description', 'tool__name']
     ordering_fields = ['order', 'created_at']
-    ordering = ['order', 'created_at']
-
-
-class KeyFeatureViewSet(viewsets.ModelViewSet):
+    ordering = ['order', 'created_at', 'id']
+    pagination_class = KeysetPagination
+
+    @action(detail=True, methods=['get'])
+    def peaks(self, request, pk=None):
+        """
+        Waveform of one audio file (?field=input_audio or output_audio, the
+        default): (min, max) pairs per bucket as signed 8-bit values, computed
+        once after upload. 404 until they exist for the current file.
+        """
+        field = f"{request.query_params.get('field', 'output_audio')}_file"
+        if field not in AUDIO_FIELDS:
+            return Response(
+                {'error': 'field must be input_audio or output_audio'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        # Peaks of a replaced file are not served while the new ones are computed
+        waveform = ToolDemoWaveform.objects.filter(
+            demo_id=pk if pk.isdigit() else None, field=field, source_name=F(f'demo__{field}'),
+        ).first()
+        if waveform is None:
+            raise NotFound('No waveform for this file yet.')
+        peaks = bytes(waveform.peaks)
+        etag = quote_etag(hashlib.md5(peaks + str(waveform.sample_rate).encode()).hexdigest())
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = Response({
+                'field': field[:-len('_file')],
+                'sample_rate': waveform.sample_rate,
+                'duration': waveform.duration,
+                'buckets': len(peaks) // 2,
+                'peaks': np.frombuffer(peaks, dtype=np.int8).tolist(),
+            })
+        response['ETag'] = etag
+        response['Cache-Control'] = f'public, max-age={getattr(settings, "WAVEFORM_MAX_AGE", 86400)}'
+        return response
+
+
+class KeyFeatureViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = KeyFeature.objects.all()
     serializer_class = KeyFeatureSerializer
+    generation_group = 'tools'
+    validator_field = None
     permission_classes = [IsAdminOrReadOnly]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['tool']
 
 
-class ProViewSet(viewsets.ModelViewSet):
+class ProViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = Pro.objects.all()
     serializer_class = ProSerializer
+    generation_group = 'tools'
+    validator_field = None
     permission_classes = [IsAdminOrReadOnly]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['tool']
 
 
-class ConViewSet(viewsets.ModelViewSet):
+class ConViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = Con.objects.all()
     serializer_class = ConSerializer
+    generation_group = 'tools'
+    validator_field = None
     permission_classes = [IsAdminOrReadOnly]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['tool']
 
 
-class UsageStepViewSet(viewsets.ModelViewSet):
+class UsageStepViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = UsageStep.objects.all()
     serializer_class = UsageStepSerializer
+    generation_group = 'tools'
+    validator_field = None
     permission_classes = [IsAdminOrReadOnly]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['tool']
@@ -80,15 +625,28 @@ class UsageStepViewSet(viewsets.ModelViewSet):
 
 # ==================== BLOG POST VIEWSETS ====================
 
-class BlogPostViewSet(viewsets.ModelViewSet):
+class BlogPostViewSet(ViewStatsMixin, LeaderboardMixin, BatchRetrieveMixin, ResponseCacheMixin, ConditionalGetMixin,
+                      SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = BlogPost.objects.filter(published=True)
     serializer_class = BlogPostSerializer
+    generation_group = 'blog-posts'
+    object_generations = True
+    stats_kind = 'blog-post'
+    cache_responses = True
     permission_classes = [IsAuthenticatedOrReadOnly]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['category', 'author', 'published']
     search_fields = ['title', 'author', 'content', 'tags']
     ordering_fields = ['created_at', 'views']
-    ordering = ['-created_at']
+    ordering = ['-created_at', '-id']
+    pagination_class = KeysetPagination
+
+    def get_prefetch_fields(self):
+        if self.action not in ['list', 'retrieve', 'batch', 'top']:
+            return {}
+        return {
+            'images': Prefetch('images', queryset=BlogPostImage.objects.order_by('order', 'created_at')),
+        }
 
     def get_permissions(self):
         if self.action in ['update', 'partial_update', 'destroy']:
@@ -97,19 +655,31 @@ class BlogPostViewSet(viewsets.ModelViewSet):
             return [AllowAny()]
         return super().get_permissions()
 
+    @action(detail=False, methods=['get'])
+    def top(self, request):
+        """Most viewed published posts, from the leaderboard"""
+        return self.get_leaderboard_response(BLOG_POST_LEADERBOARDS[0].top(limit=get_limit(request)))
+
     @action(detail=True, methods=['post'])
     def increment_views(self, request, pk=None):
-        """Increment view count for a blog post"""
-        post = self.get_object()
-        post.views += 1
-        post.save()
-        serializer = self.get_serializer(post)
-        return Response(serializer.data)
-
-
-class BlogPostImageViewSet(viewsets.ModelViewSet):
+        """
+        Count a view of a blog post. The increment is buffered in memory and
+        written later in a batch (see api.counters), so the response is just
+        the post's count as this process knows it.
+        """
+        views = self.queryset.filter(pk=pk).values_list('views', flat=True).first() if pk.isdigit() else None
+        if views is None:
+            raise NotFound()
+        blog_post_views.add(int(pk))
+        record_view(self.stats_kind, int(pk), get_visitor_id(request))
+        return Response({'id': int(pk), 'views': views + blog_post_views.get_pending(int(pk))})
+
+
+class BlogPostImageViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = BlogPostImage.objects.all()
     serializer_class = BlogPostImageSerializer
+    generation_group = 'blog-posts'
+    validator_field = None
     permission_classes = [IsAdminOrReadOnly]
     filter_backends = [DjangoFilterBackend, OrderingFilter]
     filterset_fields = ['blog_post']
@@ -119,22 +689,33 @@ class BlogPostImageViewSet(viewsets.ModelViewSet):
 
 # ==================== NEWS VIEWSETS ====================
 
-class NewsViewSet(viewsets.ModelViewSet):
+class NewsViewSet(ResponseCacheMixin, ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = News.objects.filter(published=True)
     serializer_class = NewsSerializer
+    generation_group = 'news'
+    object_generations = True
+    cache_responses = True
     permission_classes = [IsAdminOrReadOnly]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['category', 'published']
     search_fields = ['title', 'summary', 'source', 'tags']
     ordering_fields = ['created_at']
-    ordering = ['-created_at']
+    ordering = ['-created_at', '-id']
+    pagination_class = KeysetPagination
 
 
 # ==================== AUTHOR VIEWSETS ====================
 
-class AuthorViewSet(viewsets.ModelViewSet):
+class AuthorViewSet(BatchRetrieveMixin, ResponseCacheMixin, ConditionalGetMixin, SparseFieldsetMixin,
+                    viewsets.ModelViewSet):
     queryset = Author.objects.all()
     serializer_class = AuthorSerializer
+    batch_lookup_field = 'slug'
+    batch_query_param = 'slugs'
+    generation_group = 'authors'
+    object_generations = True
+    cache_responses = True
+    validator_field = None
     permission_classes = [IsAdminOrReadOnly]
     filter_backends = [SearchFilter, OrderingFilter]
     search_fields = ['name', 'bio']
@@ -161,6 +742,37 @@ class AuthorViewSet(viewsets.ModelViewSet):
             )
 
 
+# ==================== CLIENT EVENTS ====================
+
+class PlainTextJSONParser(JSONParser):
+    """JSON sent as text/plain, what navigator.sendBeacon() posts for a string without a CORS preflight"""
+    media_type = 'text/plain'
+
+
+class EventView(APIView):
+    """
+    POST /api/events/ - a batch of client events, e.g.
+    [{"type": "tool_click", "id": 3, "ts": 1700000000000}, {"type": "demo_play", "id": 7}]
+    or {"events": [...]}. Anonymous and unauthenticated so beacons need no
+    token; invalid entries are dropped. The events are appended to the event
+    log and counted in the background, the response never waits on the
+    database.
+    """
+    authentication_classes = []
+    permission_classes = []
+    parser_classes = [JSONParser, PlainTextJSONParser]
+
+    def post(self, request):
+        events = parse_events(request.data)
+        if events is None:
+            return Response(
+                {'error': 'Expected a list of events or {"events": [...]}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        record_events(events)
+        return Response({'accepted': len(events)}, status=status.HTTP_202_ACCEPTED)
+
+
 # ==================== CUSTOM LOGIN ENDPOINT ====================
 
 class LoginView(APIView):
@@ -0,0 +1,143 @@
+import os
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from django.conf import settings
+from django.db import connection
+
+from .models import ToolDemo, ToolDemoWaveform
+
+
+AUDIO_FIELDS = [name for name, _ in ToolDemoWaveform.FIELD_CHOICES]
+
+# Frames decoded per read: about 1.5 MB of float32 for 48 kHz stereo
+BLOCK_FRAMES = 1 << 16
+
+
+# ==================== DECODING ====================
+
+def pcm_to_float(data, sample_width):
+    """Interleaved little-endian PCM bytes as floats in [-1, 1]"""
+    if sample_width == 1:
+        return (np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128) / 128
+    if sample_width == 3:
+        raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        samples = raw[:, 0] | raw[:, 1] << 8 | raw[:, 2] << 16
+        samples = np.where(samples >= 1 << 23, samples - (1 << 24), samples)
+        return samples.astype(np.float32) / (1 << 23)
+    dtype = {2: '<i2', 4: '<i4'}[sample_width]
+    return np.frombuffer(data, dtype=dtype).astype(np.float32) / (1 << (8 * sample_width - 1))
+
+
+def wav_peaks(file, buckets, block_frames=BLOCK_FRAMES):
+    """
+    (peaks, sample_rate, duration) of a PCM WAV file. Frames are read in
+    blocks of at most block_frames whatever the file length, so memory stays
+    bounded; a bucket cut by a block boundary carries its min/max over to the
+    next block. Channels are folded into one envelope.
+    """
+    with wave.open(file) as reader:
+        channels, width = reader.getnchannels(), reader.getsampwidth()
+        rate, frames = reader.getframerate(), reader.getnframes()
+        per_bucket = max(-(-frames // buckets), 1)
+        mins, maxs = [], []
+        # (min, max) of the bucket still being filled, and the frame index the block starts at
+        carry, offset = None, 0
+        while True:
+            data = reader.readframes(block_frames)
+            if not data:
+                break
+            samples = pcm_to_float(data, width).reshape(-1, channels)
+            low, high = samples.min(axis=1), samples.max(axis=1)
+            # Bucket boundaries inside this block; a block starting mid-bucket continues the carried one
+            first = -offset % per_bucket
+            starts = np.arange(first, len(low), per_bucket)
+            if first:
+                starts = np.concatenate([[0], starts])
+            block_mins = np.minimum.reduceat(low, starts)
+            block_maxs = np.maximum.reduceat(high, starts)
+            if carry is not None:
+                if first:
+                    block_mins[0] = min(block_mins[0], carry[0])
+                    block_maxs[0] = max(block_maxs[0], carry[1])
+                else:
+                    mins.append([carry[0]])
+                    maxs.append([carry[1]])
+            mins.append(block_mins[:-1])
+            maxs.append(block_maxs[:-1])
+            carry = (block_mins[-1], block_maxs[-1])
+            offset += len(low)
+    if carry is None:
+        return np.zeros(0, dtype=np.int8), rate, 0.0
+    mins.append([carry[0]])
+    maxs.append([carry[1]])
+    pairs = np.stack([np.concatenate(mins), np.concatenate(maxs)], axis=1)
+    peaks = np.clip(np.round(pairs * 127), -127, 127).astype(np.int8).ravel()
+    return peaks, rate, frames / rate
+
+
+# Decoders by file extension; only formats with a pure-Python decoder are listed
+DECODERS = {
+    '.wav': wav_peaks,
+    '.wave': wav_peaks,
+}
+
+
+# ==================== DEMO WAVEFORMS ====================
+
+def compute_demo_waveforms(demo_id, force=False):
+    """
+    Store peaks for each audio file of a demo that has none for its current
+    file yet, and drop the ones of files that are gone. Undecodable formats
+    are skipped. Returns the number of waveforms written.
+    """
+    demo = ToolDemo.objects.filter(pk=demo_id).only('pk', *AUDIO_FIELDS).first()
+    if demo is None:
+        return 0
+    stored = {waveform.field: waveform for waveform in ToolDemoWaveform.objects.filter(demo=demo).defer('peaks')}
+    written = 0
+    for field in AUDIO_FIELDS:
+        file = getattr(demo, field)
+        waveform = stored.get(field)
+        decoder = DECODERS.get(os.path.splitext(file.name)[1].lower()) if file else None
+        if decoder is None:
+            if waveform is not None:
+                waveform.delete()
+            continue
+        if waveform is not None and waveform.source_name == file.name and not force:
+            continue
+        try:
+            with file.open('rb'):
+                peaks, sample_rate, duration = decoder(file, getattr(settings, 'WAVEFORM_BUCKETS', 1000))
+        except (OSError, EOFError, wave.Error, ValueError, KeyError):
+            continue
+        ToolDemoWaveform.objects.update_or_create(
+            demo=demo, field=field,
+            defaults={
+                'source_name': file.name, 'sample_rate': sample_rate,
+                'duration': round(duration, 3), 'peaks': peaks.tobytes(),
+            },
+        )
+        written += 1
+    return written
+
+
+# One worker: decoding is CPU bound and a queue keeps uploads from piling up threads
+executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='waveforms')
+
+
+def compute_in_background(demo_id):
+    try:
+        compute_demo_waveforms(demo_id)
+    finally:
+        # Worker threads own their connection, Django's request cycle never closes it
+        connection.close()
+
+
+def schedule_demo_waveforms(demo_id):
+    """Compute a demo's peaks off the request thread (inline with WAVEFORM_BACKGROUND = False)"""
+    if getattr(settings, 'WAVEFORM_BACKGROUND', True):
+        executor.submit(compute_in_background, demo_id)
+    else:
+        compute_demo_waveforms(demo_id)
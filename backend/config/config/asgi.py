@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_asgi_application()
+
+# Build the similarity index while the process starts rather than on its first lookup
+from api.similarity import similarity_index  # noqa: E402
+
+similarity_index.warm()
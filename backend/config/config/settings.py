@@ -108,6 +108,19 @@ DATABASES = {
     }
 }
 
+# Change generations, cached responses, leaderboards and counts are read by
+# every worker, so the cache must be shared between processes: the file cache
+# covers workers on one host, use Redis or Memcached across hosts.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 20000,
+        },
+    }
+}
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=24),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
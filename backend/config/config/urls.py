@@ -1,9 +1,12 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
+from api.images import serve_image
+from api.media import serve_media
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     
@@ -13,9 +16,12 @@ urlpatterns = [
     
     # API Routes
     path('api/', include('api.urls')),
+
+    # Resized images, then media files with byte ranges and front-server handoff
+    re_path(r'^{}img/(?P<path>.+)$'.format(settings.MEDIA_URL.lstrip('/')), serve_image, name='media-image'),
+    re_path(r'^{}(?P<path>.+)$'.format(settings.MEDIA_URL.lstrip('/')), serve_media, name='media'),
 ]
 
-# Serve media files in development
+# Serve static files in development
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
\ No newline at end of file
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
+
+# Build the similarity index while the process starts rather than on its first lookup
+from api.similarity import similarity_index  # noqa: E402
+
+similarity_index.warm()